@@ -5,15 +5,22 @@ def main():
     try:
         print("🔬 Advanced Food Search System")
         print("=" * 50)
-        print("Loading food database with advanced filtering capabilities...")
-
-        food_items = load_food_data("files/FoodDataSet.json")
-        print(f"✅ Loaded {len(food_items)} food items successfully")
-        collection = create_similarity_search_collection(
-            "advanced_food_search",
-            {"description": "A collection for advanced search demos"},
-        )
-        populate_similarity_collection(collection, food_items)
+        # Use the shared search service when one is running
+        collection = connect_search_service()
+        if collection is None:
+            print("Loading food database with advanced filtering capabilities...")
+
+            # Load the embedding model in the background while the dataset loads
+            registry.warmup(EMBEDDING_MODEL_NAME)
+
+            food_items = load_food_data("files/FoodDataSet.json")
+            print(f"✅ Loaded {len(food_items)} food items successfully")
+            collection = prepare_food_collection(
+                "advanced_food_search",
+                {"description": "A collection for advanced search demos"},
+                food_items,
+                data_path="files/FoodDataSet.json",
+            )
         interactive_advanced_search(collection)
 
     except Exception as err:
@@ -52,6 +59,20 @@ def interactive_advanced_search(collection):
             elif choice == "6":
                 show_advanced_help()
             elif choice == "7":
+                # In thin-client mode the searches ran in the search service
+                search_stats = get_collection_search_stats(collection)
+                if search_stats is not None:
+                    source = (
+                        " (search service)"
+                        if isinstance(collection, RemoteCollection)
+                        else ""
+                    )
+                    cache_stats = search_stats["result_cache"]
+                    print(
+                        f"📈 Result cache hit rate{source}: "
+                        f"{cache_stats['hit_rate']*100:.1f}% "
+                        f"({cache_stats['hits']} hits, {cache_stats['misses']} misses)"
+                    )
                 print("👋 Exiting Advanced Search System. Goodbye!")
                 break
             else:
@@ -161,22 +182,34 @@ def perform_combined_filtered_search(collection):
     print("-" * 30)
 
     query = input("Enter search query: ").strip()
-    cuisine = input("Enter cuisine type (optional): ").strip()
+    cuisine = input("Enter cuisine types, comma-separated (optional): ").strip()
+    min_calories_input = input("Enter minimum calories (optional): ").strip()
     max_calories_input = input("Enter maximum calories (optional): ").strip()
+    include_input = input("Ingredients to include, comma-separated (optional): ")
+    exclude_input = input("Ingredients to exclude, comma-separated (optional): ")
 
     if not query:
         print("❌ Please enter a search term")
         return
 
-    cuisine_filter = cuisine if cuisine else None
+    cuisine_filter = split_list_input(cuisine) or None
+    min_calories = int(min_calories_input) if min_calories_input.isdigit() else None
     max_calories = int(max_calories_input) if max_calories_input.isdigit() else None
+    include_ingredients = split_list_input(include_input)
+    exclude_ingredients = split_list_input(exclude_input)
 
     # Build description of applied filters
     filter_description = []
     if cuisine_filter:
-        filter_description.append(f"cuisine: {cuisine_filter}")
+        filter_description.append(f"cuisine: {' or '.join(cuisine_filter)}")
+    if min_calories:
+        filter_description.append(f"min calories: {min_calories}")
     if max_calories:
         filter_description.append(f"max calories: {max_calories}")
+    if include_ingredients:
+        filter_description.append(f"with: {', '.join(include_ingredients)}")
+    if exclude_ingredients:
+        filter_description.append(f"without: {', '.join(exclude_ingredients)}")
 
     filter_text = ", ".join(filter_description) if filter_description else "no filters"
 
@@ -188,11 +221,19 @@ def perform_combined_filtered_search(collection):
         cuisine_filter=cuisine_filter,
         max_calories=max_calories,
         n_results=5,
+        min_calories=min_calories,
+        include_ingredients=include_ingredients,
+        exclude_ingredients=exclude_ingredients,
     )
 
     display_search_results(results, f"Combined Filtered Results ({filter_text})")
 
 
+def split_list_input(text):
+    """Split comma-separated user input into a list of non-empty values"""
+    return [value.strip() for value in text.split(",") if value.strip()]
+
+
 def run_search_demonstrations(collection):
     """Run predetermined demonstrations of different search types"""
     print("\n📊 SEARCH DEMONSTRATIONS")
@@ -219,7 +260,23 @@ def run_search_demonstrations(collection):
         },
     ]
 
-    for i, demo in enumerate(demonstrations, 1):
+    # Run every demonstration search up front in a single batch
+    demo_results = perform_batch_similarity_search(
+        collection,
+        [
+            (
+                demo["query"],
+                {
+                    "cuisine_filter": demo["cuisine_filter"],
+                    "max_calories": demo["max_calories"],
+                },
+                3,
+            )
+            for demo in demonstrations
+        ],
+    )
+
+    for i, (demo, results) in enumerate(zip(demonstrations, demo_results), 1):
         print(f"\n{i}. {demo['title']}")
         print(f"   Query: '{demo['query']}'")
 
@@ -232,14 +289,6 @@ def run_search_demonstrations(collection):
         if filters:
             print(f"   Filters: {', '.join(filters)}")
 
-        results = perform_filtered_similarity_search(
-            collection,
-            demo["query"],
-            cuisine_filter=demo["cuisine_filter"],
-            max_calories=demo["max_calories"],
-            n_results=3,
-        )
-
         display_search_results(results, demo["title"], show_details=False)
 
         input("\n⏸️  Press Enter to continue to next demonstration...")
@@ -279,6 +328,7 @@ def show_advanced_help():
     print("  2. Cuisine Filter - Search within specific cuisine types")
     print("  3. Calorie Filter - Search for foods under calorie limits")
     print("  4. Combined Filters - Use multiple filters together")
+    print("     (several cuisines, calorie ranges, ingredients to include/exclude)")
     print("  5. Demonstrations - See predefined search examples")
     print("\nTips:")
     print("  • Use descriptive terms: 'creamy', 'spicy', 'light'")
@@ -0,0 +1,427 @@
+"""
+Asyncio version of the enhanced RAG chatbot pipeline.
+
+The blocking chatbot runs each step in turn: the comparison mode's two
+searches and the LLM call each wait for the one before. Here every step is
+a coroutine:
+
+- retrieval runs in a thread pool (query embedding is the expensive, blocking
+  part), so the searches of a comparison, or of several sessions, overlap;
+  with FOOD_SEARCH_BATCH_WINDOW_MS set they also share micro-batches
+- LLM calls go through AsyncLLMClient, which calls the shared watsonx.ai
+  client's agenerate() (the SDK's async API when available, a worker thread
+  otherwise) and gives up on any call after a deadline
+  (FOOD_SEARCH_LLM_DEADLINE seconds) in favour of the template fallback
+- run_chat_session() reads and writes through callables, so any number of
+  sessions can share one event loop without blocking each other
+
+Usage (from the repository root):
+    python food_search/async_rag_chatbot.py
+    python food_search/async_rag_chatbot.py --simulate 8 --turns 3
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from shared_functions import *
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from enhanced_rag_chatbot import (
+    build_comparison_prompt,
+    build_rag_prompt,
+    format_comparison_table,
+    format_enhanced_rag_help,
+    format_search_result_details,
+    generate_fallback_response,
+    generate_simple_comparison,
+    get_response_cache,
+    lookup_query_embedding,
+    response_cache_namespace,
+    result_food_ids,
+)
+from llm_client import (
+    WatsonxInferenceClient,
+    format_llm_client_stats,
+    get_llm_client,
+)
+from context_packing import format_prompt_token_stats, warmup_tokenizer
+from response_cache import format_response_cache_stats
+
+# Threads shared by retrievals and blocking LLM calls
+ASYNC_WORKERS = int(os.getenv("FOOD_SEARCH_ASYNC_WORKERS", "8"))
+# Seconds an LLM call may take before the fallback response is used
+LLM_CALL_DEADLINE = float(os.getenv("FOOD_SEARCH_LLM_DEADLINE", "20"))
+
+LineReader = Callable[[str], Awaitable[Optional[str]]]
+LineWriter = Callable[[str], None]
+
+
+class AsyncLLMClient:
+    """Async watsonx.ai text generation with a deadline on every call"""
+
+    def __init__(
+        self,
+        executor: ThreadPoolExecutor = None,
+        deadline: float = LLM_CALL_DEADLINE,
+        client: WatsonxInferenceClient = None,
+    ):
+        self.executor = executor
+        self.deadline = deadline
+        self.client = client or get_llm_client()
+        self.calls = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    async def generate(self, prompt: str, deadline: float = None) -> Optional[str]:
+        """Generated text, or None on error or when the deadline passes.
+
+        A call that falls back to a worker thread cannot be interrupted; past
+        its deadline its result is simply discarded.
+        """
+        deadline = self.deadline if deadline is None else deadline
+        self.calls += 1
+        try:
+            with stage_timer("llm"):
+                response = await asyncio.wait_for(
+                    self.client.agenerate(prompt, executor=self.executor), deadline
+                )
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            print(f"⏱️ LLM call exceeded its {deadline:g}s deadline, using fallback")
+            return None
+        except Exception as e:
+            self.errors += 1
+            print(f"❌ LLM Error: {e}")
+            return None
+
+        if response and "results" in response:
+            return response["results"][0]["generated_text"].strip()
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "deadline_seconds": self.deadline,
+        }
+
+
+async def async_similarity_search(
+    collection, query: str, n_results: int = 3, executor: ThreadPoolExecutor = None
+) -> List[Dict]:
+    """perform_similarity_search on a worker thread"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor, perform_similarity_search, collection, query, n_results
+    )
+
+
+async def async_batch_search(
+    collection,
+    queries: List[str],
+    n_results: int = 3,
+    executor: ThreadPoolExecutor = None,
+) -> List[List[Dict]]:
+    """Results for every query, searched concurrently"""
+    return list(
+        await asyncio.gather(
+            *(
+                async_similarity_search(collection, query, n_results, executor)
+                for query in queries
+            )
+        )
+    )
+
+
+async def async_rag_response(
+    collection, query: str, llm: AsyncLLMClient, executor: ThreadPoolExecutor = None
+) -> Tuple[Optional[str], List[Dict]]:
+    """The chatbot answer to query and the results it is based on.
+
+    The answer is None when nothing matched the query.
+    """
+    loop = asyncio.get_running_loop()
+    search_results = await async_similarity_search(collection, query, 3, executor)
+    if not search_results:
+        return None, []
+
+    # The search just embedded the query, so this is a cache hit
+    query_embedding = await loop.run_in_executor(
+        executor, lookup_query_embedding, collection, query
+    )
+    # A thin client asks the service for its catalog fingerprint once
+    cache_namespace = await loop.run_in_executor(
+        executor, response_cache_namespace, collection
+    )
+    use_cache = query_embedding is not None and cache_namespace is not None
+    food_ids = result_food_ids(search_results)
+    # The answer cache is SQLite-backed, so it is read and written off the loop
+    if use_cache:
+        cached_response = await loop.run_in_executor(
+            executor,
+            lambda: get_response_cache().get(
+                cache_namespace, query_embedding, food_ids
+            ),
+        )
+        if cached_response is not None:
+            return cached_response, search_results
+
+    # Packing the context counts tokens, which is CPU-bound
+    prompt = await loop.run_in_executor(
+        executor, build_rag_prompt, query, search_results
+    )
+    response_text = await llm.generate(prompt)
+    # As in the blocking chatbot, very short answers are replaced
+    if not response_text or len(response_text) < 50:
+        return generate_fallback_response(query, search_results), search_results
+
+    if use_cache:
+        await loop.run_in_executor(
+            executor,
+            lambda: get_response_cache().put(
+                cache_namespace,
+                query,
+                query_embedding,
+                food_ids,
+                response_text,
+            ),
+        )
+    return response_text, search_results
+
+
+async def async_comparison(
+    collection,
+    query1: str,
+    query2: str,
+    llm: AsyncLLMClient,
+    executor: ThreadPoolExecutor = None,
+) -> Tuple[str, List[Dict], List[Dict]]:
+    """AI comparison of two queries, whose searches run concurrently"""
+    loop = asyncio.get_running_loop()
+    results1, results2 = await async_batch_search(
+        collection, [query1, query2], 3, executor
+    )
+    prompt = await loop.run_in_executor(
+        executor, build_comparison_prompt, query1, query2, results1, results2
+    )
+    response_text = await llm.generate(prompt)
+    if not response_text:
+        response_text = generate_simple_comparison(query1, query2, results1, results2)
+    return response_text, results1, results2
+
+
+async def run_chat_session(
+    collection,
+    llm: AsyncLLMClient,
+    read_line: LineReader,
+    write: LineWriter,
+    executor: ThreadPoolExecutor = None,
+) -> int:
+    """One chatbot conversation; returns the number of queries answered.
+
+    read_line(prompt) returns the next line, or None when the session ends.
+    """
+    answered = 0
+    while True:
+        user_input = await read_line("\n👤 You: ")
+        if user_input is None:
+            break
+        user_input = user_input.strip()
+
+        if not user_input:
+            write("🤖 Bot: Please tell me what kind of food you're looking for!")
+            continue
+
+        if user_input.lower() in ["quit", "exit", "q"]:
+            write("\n🤖 Bot: Thank you for using the Enhanced RAG Food Chatbot!")
+            break
+
+        elif user_input.lower() in ["help", "h"]:
+            write(format_enhanced_rag_help())
+
+        elif user_input.lower() in ["compare"]:
+            query1 = ((await read_line("Enter first food query: ")) or "").strip()
+            query2 = ((await read_line("Enter second food query: ")) or "").strip()
+            if not query1 or not query2:
+                write("❌ Please enter both queries for comparison")
+                continue
+
+            write(f"\n🔍 Analyzing '{query1}' vs '{query2}' with AI...")
+            response_text, results1, results2 = await async_comparison(
+                collection, query1, query2, llm, executor
+            )
+            write(f"\n🤖 AI Analysis: {response_text}")
+            write(format_comparison_table(query1, query2, results1, results2))
+
+        elif user_input.lower() in ["latency", "stats"]:
+            write("\n⏱️  Latency breakdown:")
+            write(format_latency_breakdown())
+            write(f"🧠 LLM calls: {llm.stats()}")
+            write(format_llm_client_stats(llm.client.stats()))
+            write(format_prompt_token_stats())
+            # The first get_response_cache() call opens the SQLite store
+            cache_stats = await asyncio.get_running_loop().run_in_executor(
+                executor, lambda: get_response_cache().stats()
+            )
+            write(format_response_cache_stats(cache_stats))
+
+        else:
+            write(f"\n🔍 Searching vector database for: '{user_input}'...")
+            response_text, search_results = await async_rag_response(
+                collection, user_input, llm, executor
+            )
+            if response_text is None:
+                write("🤖 Bot: I couldn't find any food items matching your request.")
+                continue
+            write(f"\n🤖 Bot: {response_text}")
+            write(format_search_result_details(search_results))
+            answered += 1
+    return answered
+
+
+async def read_stdin_line(prompt: str) -> Optional[str]:
+    """input() on a daemon thread, so an abandoned prompt never blocks exit"""
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def read():
+        try:
+            line = input(prompt)
+        except EOFError:
+            line = None
+        loop.call_soon_threadsafe(lambda: future.done() or future.set_result(line))
+
+    threading.Thread(target=read, name="stdin", daemon=True).start()
+    return await future
+
+
+async def simulate_sessions(
+    collection,
+    llm: AsyncLLMClient,
+    sessions: int,
+    turns: int,
+    executor: ThreadPoolExecutor = None,
+) -> Dict[str, Any]:
+    """Run scripted sessions side by side on this event loop and time them"""
+    from search_benchmark import load_query_set
+
+    queries = [query["query"] for query in load_query_set()["queries"]]
+    turn_seconds = []
+
+    async def scripted_session(number: int) -> int:
+        script = [
+            queries[(number * turns + turn) % len(queries)] for turn in range(turns)
+        ]
+        started = {}
+
+        async def read_line(prompt: str) -> Optional[str]:
+            if "started" in started:
+                turn_seconds.append(time.perf_counter() - started.pop("started"))
+            if not script:
+                return None
+            started["started"] = time.perf_counter()
+            return script.pop(0)
+
+        def write(text: str):
+            if text.startswith("\n🤖 Bot:"):
+                print(f"[session {number}] {text.strip()[:100]}")
+
+        return await run_chat_session(collection, llm, read_line, write, executor)
+
+    started = time.perf_counter()
+    answered = await asyncio.gather(*(scripted_session(n) for n in range(sessions)))
+    wall_seconds = time.perf_counter() - started
+    return {
+        "sessions": sessions,
+        "turns": len(turn_seconds),
+        "answered": sum(answered),
+        "wall_seconds": wall_seconds,
+        "mean_turn_seconds": (
+            sum(turn_seconds) / len(turn_seconds) if turn_seconds else 0.0
+        ),
+        # Total turn time over wall time: how many turns were in flight at once
+        "concurrency": sum(turn_seconds) / wall_seconds if wall_seconds else 0.0,
+        "llm": llm.stats(),
+        "response_cache": get_response_cache().stats(),
+    }
+
+
+def load_chatbot_collection():
+    """The search service if one is running, otherwise a local collection"""
+    collection = connect_search_service()
+    if collection is None:
+        registry.warmup(EMBEDDING_MODEL_NAME)
+        food_items = load_food_data("files/FoodDataSet.json")
+        print(f"✅ Loaded {len(food_items)} food items")
+        collection = prepare_food_collection(
+            "async_rag_food_chatbot",
+            {"description": "Async RAG chatbot with IBM watsonx.ai integration"},
+            food_items,
+            data_path="files/FoodDataSet.json",
+        )
+    print("✅ Vector database ready")
+    return collection
+
+
+async def async_main(args) -> int:
+    executor = ThreadPoolExecutor(args.workers, thread_name_prefix="rag")
+    llm = AsyncLLMClient(executor, args.deadline)
+    try:
+        # Neither check blocks the event loop or the first prompt
+        print("🔗 Checking LLM connection in the background...")
+        llm.client.start_health_check()
+        warmup_tokenizer()
+        loop = asyncio.get_running_loop()
+        collection = await loop.run_in_executor(executor, load_chatbot_collection)
+
+        if args.simulate:
+            report = await simulate_sessions(
+                collection, llm, args.simulate, args.turns, executor
+            )
+            print(
+                f"\n📊 {report['sessions']} sessions, {report['turns']} turns in "
+                f"{report['wall_seconds']:.2f}s (mean turn "
+                f"{report['mean_turn_seconds']:.2f}s, "
+                f"{report['concurrency']:.1f} turns in flight)"
+            )
+            print(f"🧠 LLM calls: {report['llm']}")
+            print(format_llm_client_stats(llm.client.stats()))
+            print(format_response_cache_stats(report["response_cache"]))
+            return 0
+
+        print("💬 Ask me about food recommendations ('help' for commands)")
+        await run_chat_session(collection, llm, read_stdin_line, print, executor)
+        return 0
+    finally:
+        executor.shutdown(wait=False)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Async RAG food chatbot")
+    parser.add_argument("--workers", type=int, default=ASYNC_WORKERS)
+    parser.add_argument(
+        "--deadline", type=float, default=LLM_CALL_DEADLINE, help="LLM call seconds"
+    )
+    parser.add_argument(
+        "--simulate", type=int, default=0, help="Run N scripted sessions at once"
+    )
+    parser.add_argument("--turns", type=int, default=3, help="Queries per session")
+    args = parser.parse_args(argv)
+
+    print("🤖 Async RAG-Powered Food Recommendation Chatbot")
+    print("   Powered by IBM Granite & ChromaDB")
+    print("=" * 55)
+    try:
+        return asyncio.run(async_main(args))
+    except KeyboardInterrupt:
+        print("\n\n🤖 Bot: Goodbye! Hope you find something delicious! 👋")
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
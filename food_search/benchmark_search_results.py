@@ -0,0 +1,121 @@
+"""
+Allocation benchmark: eager result dicts vs lazy ResultSet/SearchHit.
+
+Builds synthetic query responses shaped like ChromaDB's and measures, with
+tracemalloc, how much memory is allocated to format them. The lazy result
+set is measured both untouched and after reading the top three hits, which
+is what the CLIs typically display.
+
+Usage:
+    python food_search/benchmark_search_results.py
+"""
+
+import random
+import time
+import tracemalloc
+from typing import Dict, List
+
+from search_results import ResultSet
+
+
+def build_response(n_results: int) -> Dict[str, List]:
+    metadatas = [
+        {
+            "name": f"Food {i}",
+            "description": f"Description of food {i}",
+            "cuisine_type": random.choice(["Italian", "Thai", "Mexican"]),
+            "calories": random.randint(100, 800),
+            "ingredients": "Flour, Butter, Sugar",
+            "cooking_method": "Baking",
+            "health_benefits": "Rich in fiber",
+            "taste_profile": "sweet, crisp",
+        }
+        for i in range(n_results)
+    ]
+    return {
+        "ids": [[str(i) for i in range(n_results)]],
+        "distances": [sorted(random.random() for _ in range(n_results))],
+        "metadatas": [metadatas],
+    }
+
+
+def format_as_dicts(results) -> List[Dict]:
+    """The eager formatting the search helpers used before ResultSet"""
+    formatted_results = []
+    for i in range(len(results["ids"][0])):
+        similarity_score = 1 - results["distances"][0][i]
+        formatted_results.append(
+            {
+                "food_id": results["ids"][0][i],
+                "food_name": results["metadatas"][0][i]["name"],
+                "food_description": results["metadatas"][0][i]["description"],
+                "cuisine_type": results["metadatas"][0][i]["cuisine_type"],
+                "food_calories_per_serving": results["metadatas"][0][i]["calories"],
+                "similarity_score": similarity_score,
+                "distance": results["distances"][0][i],
+            }
+        )
+    return formatted_results
+
+
+def format_lazily(results):
+    return ResultSet(results)
+
+
+def format_lazily_and_read_top3(results):
+    result_set = ResultSet(results)
+    for hit in result_set[:3]:
+        hit["food_name"], hit["cuisine_type"], hit["similarity_score"]
+    return result_set
+
+
+def measure(formatter, response, repeats: int = 20):
+    """Return (bytes allocated per call, microseconds per call)"""
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    kept = formatter(response)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+
+    start_time = time.perf_counter()
+    for _ in range(repeats):
+        formatter(response)
+    elapsed = (time.perf_counter() - start_time) / repeats
+    return after - before, elapsed * 1e6
+
+
+def main():
+    random.seed(0)
+    formatters = [
+        ("eager dicts", format_as_dicts),
+        ("ResultSet", format_lazily),
+        ("ResultSet+top3", format_lazily_and_read_top3),
+    ]
+
+    print("📊 SEARCH RESULT ALLOCATION BENCHMARK")
+    print("=" * 72)
+    print(
+        f"{'n_results':>10} | {'formatter':<16} | {'bytes kept':>12} | {'µs/call':>10}"
+    )
+    print("-" * 72)
+
+    for n_results in (5, 100, 1000, 10000):
+        response = build_response(n_results)
+        baseline = None
+        for name, formatter in formatters:
+            allocated, micros = measure(formatter, response)
+            baseline = baseline or allocated
+            print(
+                f"{n_results:>10} | {name:<16} | {allocated:>12,} | {micros:>10.1f}"
+                + (
+                    f"  ({baseline / max(allocated, 1):.0f}x less)"
+                    if allocated < baseline
+                    else ""
+                )
+            )
+        print("-" * 72)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""
+Token-budgeted context packing for the RAG chatbot prompts.
+
+pack_context_for_llm() formats search results the way the chatbot always
+has, but counts the tokens of every line and keeps the context within a
+budget (FOOD_SEARCH_CONTEXT_TOKEN_BUDGET):
+
+1. each result, most relevant first, gets its name, cuisine and calories
+   while they fit
+2. the remaining fields are then added one field at a time across all the
+   included results, in FIELD_PRIORITY order, so low-value fields (similarity
+   score, cooking method, taste profile) are the first to be dropped
+
+Tokens are counted with the LLM's tokenizer (FOOD_SEARCH_PROMPT_TOKENIZER, a
+Hugging Face tokenizer name or a local tokenizer.json), or estimated at four
+characters per token when it cannot be loaded. The chatbots load it with
+warmup_tokenizer() at startup and never in the request path: until it is
+loaded, counts are estimated. Each context is packed with one tokenizer
+throughout, even if loading finishes part way. record_prompt() keeps the
+token counts of each prompt sent, for the chatbots' 'latency' command.
+
+Usage, comparing budgets over the benchmark queries:
+    python food_search/context_packing.py --budgets 150,300,0
+"""
+
+import argparse
+import math
+import os
+import sys
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("FOOD_SEARCH_CONTEXT_TOKEN_BUDGET", "300"))
+CONTEXT_MAX_RESULTS = int(os.getenv("FOOD_SEARCH_CONTEXT_MAX_RESULTS", "3"))
+PROMPT_TOKENIZER = os.getenv(
+    "FOOD_SEARCH_PROMPT_TOKENIZER", "ibm-granite/granite-3.3-8b-instruct"
+)
+# Fallback estimate when the tokenizer is unavailable
+CHARS_PER_TOKEN = 4
+
+CONTEXT_HEADER = (
+    "Based on your query, here are the most relevant food options from our database:"
+)
+NO_RESULTS_CONTEXT = "No relevant food items found in the database."
+
+# Kept for every included result, as long as the result fits at all
+CORE_FIELDS = ("cuisine_type", "food_calories_per_serving")
+# Other fields, most valuable first; the last ones are dropped first
+FIELD_PRIORITY = (
+    "food_description",
+    "food_ingredients",
+    "food_health_benefits",
+    "taste_profile",
+    "cooking_method",
+    "similarity_score",
+)
+# Order fields appear in under each option
+FIELD_ORDER = (
+    "food_description",
+    "cuisine_type",
+    "food_calories_per_serving",
+    "food_ingredients",
+    "food_health_benefits",
+    "cooking_method",
+    "taste_profile",
+    "similarity_score",
+)
+
+# The tokenizer is loaded by get_tokenizer() on first use; False means it
+# could not be loaded and token counts are estimated
+_tokenizer = None
+_tokenizer_lock = threading.Lock()
+
+# Token counts of each prompt sent to the LLM
+prompt_token_log = []
+
+
+def get_tokenizer(wait: bool = True):
+    """The prompt tokenizer, or None when it cannot be loaded.
+
+    With wait=False it is never loaded here, which can mean a download:
+    None is returned until warmup_tokenizer() or a waiting call has loaded it.
+    """
+    global _tokenizer
+    if _tokenizer is None:
+        if not wait:
+            return None
+        with _tokenizer_lock:
+            if _tokenizer is None:
+                _tokenizer = load_tokenizer()
+    return _tokenizer or None
+
+
+def load_tokenizer():
+    """PROMPT_TOKENIZER from a local path or the Hugging Face Hub, or False"""
+    try:
+        from tokenizers import Tokenizer
+
+        if os.path.isdir(PROMPT_TOKENIZER):
+            return Tokenizer.from_file(os.path.join(PROMPT_TOKENIZER, "tokenizer.json"))
+        if os.path.isfile(PROMPT_TOKENIZER):
+            return Tokenizer.from_file(PROMPT_TOKENIZER)
+        return Tokenizer.from_pretrained(PROMPT_TOKENIZER)
+    except Exception as e:
+        print(f"⚠️ Tokenizer {PROMPT_TOKENIZER} unavailable, estimating tokens: {e}")
+        return False
+
+
+def warmup_tokenizer():
+    """Load the tokenizer on a background thread, before the first prompt"""
+    threading.Thread(target=get_tokenizer, name="tokenizer", daemon=True).start()
+
+
+def tokenizer_name() -> str:
+    return PROMPT_TOKENIZER if get_tokenizer(wait=False) else "heuristic"
+
+
+def count_tokens_with(tokenizer, text: str) -> int:
+    """Tokens in text by tokenizer, or estimated when tokenizer is None"""
+    if not text:
+        return 0
+    if tokenizer is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    return len(tokenizer.encode(text, add_special_tokens=False).ids)
+
+
+def count_tokens(text: str) -> int:
+    return count_tokens_with(get_tokenizer(wait=False), text)
+
+
+def format_context_field(result: Dict, field: str) -> Optional[str]:
+    """The context line for one field of a result, or None if it is empty"""
+    if field == "food_description":
+        return f"  - Description: {result['food_description']}"
+    if field == "cuisine_type":
+        return f"  - Cuisine: {result['cuisine_type']}"
+    if field == "food_calories_per_serving":
+        return f"  - Calories: {result['food_calories_per_serving']} per serving"
+    if field == "similarity_score":
+        return f"  - Similarity score: {result['similarity_score']*100:.1f}%"
+
+    value = result.get(field)
+    if not value:
+        return None
+    if field == "food_ingredients":
+        if isinstance(value, list):
+            return f"  - Key ingredients: {', '.join(value[:5])}"
+        return f"  - Key ingredients: {value}"
+    if field == "food_health_benefits":
+        return f"  - Health benefits: {value}"
+    if field == "cooking_method":
+        return f"  - Cooking method: {value}"
+    if field == "taste_profile":
+        return f"  - Taste profile: {value}"
+    return None
+
+
+def pack_context_for_llm(
+    search_results: List[Dict],
+    token_budget: int = None,
+    max_results: int = None,
+) -> Tuple[str, Dict[str, Any]]:
+    """Context text for the results within token_budget, and a packing report.
+
+    A budget of 0 keeps every field of every result up to max_results.
+    """
+    token_budget = CONTEXT_TOKEN_BUDGET if token_budget is None else token_budget
+    max_results = max_results or CONTEXT_MAX_RESULTS
+    candidates = search_results[:max_results]
+    # One tokenizer for the whole context, even if loading finishes meanwhile
+    tokenizer = get_tokenizer(wait=False)
+
+    def count_tokens(text: str) -> int:
+        return count_tokens_with(tokenizer, text)
+
+    report = {
+        "token_budget": token_budget,
+        "candidates": len(candidates),
+        "results": 0,
+        "dropped_fields": {},
+        "tokenizer": PROMPT_TOKENIZER if tokenizer else "heuristic",
+    }
+    if not candidates:
+        report["context_tokens"] = count_tokens(NO_RESULTS_CONTEXT)
+        return NO_RESULTS_CONTEXT, report
+
+    def fits(cost: int) -> bool:
+        return not token_budget or used + cost <= token_budget
+
+    # Every line costs its tokens plus one for the newline after it
+    used = count_tokens(CONTEXT_HEADER) + 2
+    options = []
+    for result in candidates:
+        number = len(options) + 1
+        lines = {"title": f"Option {number}: {result['food_name']}"}
+        for field in CORE_FIELDS:
+            line = format_context_field(result, field)
+            if line is not None:
+                lines[field] = line
+        # The blank line after the option is one more token
+        cost = sum(count_tokens(line) + 1 for line in lines.values()) + 1
+        # The top result is always included, even over budget
+        if options and not fits(cost):
+            break
+        used += cost
+        options.append((result, lines))
+
+    dropped = report["dropped_fields"]
+    for field in FIELD_PRIORITY:
+        for result, lines in options:
+            line = format_context_field(result, field)
+            if line is None:
+                continue
+            cost = count_tokens(line) + 1
+            if fits(cost):
+                lines[field] = line
+                used += cost
+            else:
+                dropped[field] = dropped.get(field, 0) + 1
+
+    context_parts = [CONTEXT_HEADER, ""]
+    for result, lines in options:
+        context_parts.append(lines["title"])
+        context_parts.extend(lines[field] for field in FIELD_ORDER if field in lines)
+        context_parts.append("")
+    context = "\n".join(context_parts)
+
+    report["results"] = len(options)
+    report["context_tokens"] = count_tokens(context)
+    return context, report
+
+
+def record_prompt(prompt: str, context_reports: List[Dict[str, Any]]):
+    """Log the token counts of a prompt about to be sent to the LLM"""
+    prompt_token_log.append(
+        {
+            "prompt_tokens": count_tokens(prompt),
+            "context_tokens": sum(r["context_tokens"] for r in context_reports),
+            "token_budget": sum(r["token_budget"] for r in context_reports),
+            "results": sum(r["results"] for r in context_reports),
+            "dropped_fields": sum(
+                sum(r["dropped_fields"].values()) for r in context_reports
+            ),
+        }
+    )
+
+
+def format_prompt_token_stats() -> str:
+    """Token counts of the last prompt and the mean over all prompts"""
+    if not prompt_token_log:
+        return "No prompts sent yet."
+    last = prompt_token_log[-1]
+    mean_tokens = sum(entry["prompt_tokens"] for entry in prompt_token_log) / len(
+        prompt_token_log
+    )
+    budget = last["token_budget"] or "no"
+    return (
+        f"🧾 Prompt tokens ({tokenizer_name()}): last {last['prompt_tokens']} "
+        f"(context {last['context_tokens']} of {budget} budget, "
+        f"{last['results']} results, {last['dropped_fields']} fields dropped); "
+        f"mean {mean_tokens:.0f} over {len(prompt_token_log)} prompts"
+    )
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare context token budgets")
+    parser.add_argument("--data", default="files/FoodDataSet.json")
+    parser.add_argument("--budgets", default="150,300,0", help="0 means no budget")
+    parser.add_argument("--n-results", type=int, default=CONTEXT_MAX_RESULTS)
+    args = parser.parse_args(argv)
+
+    from search_benchmark import load_query_set
+    from shared_functions import (
+        perform_similarity_search,
+        prepare_food_collection,
+    )
+
+    print("🧾 CONTEXT TOKEN BUDGETS")
+    print("=" * 50)
+    # A report, not a request path: wait for the tokenizer
+    get_tokenizer()
+    collection = prepare_food_collection(
+        "context_packing",
+        {"description": "Context packing report"},
+        None,
+        data_path=args.data,
+    )
+    queries = [query["query"] for query in load_query_set()["queries"]]
+    search_results = [
+        perform_similarity_search(collection, query, args.n_results)
+        for query in queries
+    ]
+
+    print(f"\n📊 {len(queries)} queries, tokenizer: {tokenizer_name()}")
+    print(
+        f"{'budget':>8} {'mean tokens':>12} {'max tokens':>11} {'results':>8} dropped"
+    )
+    for budget in (int(value) for value in args.budgets.split(",")):
+        reports = [
+            pack_context_for_llm(results, budget, args.n_results)[1]
+            for results in search_results
+        ]
+        tokens = [report["context_tokens"] for report in reports]
+        dropped = {}
+        for report in reports:
+            for field, count in report["dropped_fields"].items():
+                dropped[field] = dropped.get(field, 0) + count
+        print(
+            f"{budget or 'none':>8} {sum(tokens) / len(tokens):>12.1f} "
+            f"{max(tokens):>11} "
+            f"{sum(r['results'] for r in reports) / len(reports):>8.2f} "
+            f"{dropped or '-'}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""
+Prebuilt embedding artifacts for a food dataset.
+
+The food embeddings for a dataset never change unless the file or the model
+does, so they can be computed once and shipped next to the dataset:
+
+    python food_search/embedding_artifacts.py build --data files/FoodDataSet.json
+
+writes files/FoodDataSet.embeddings/<model>-<backend>-<dataset hash>/ with
+
+    manifest.json      format version, dataset SHA-256, model, shapes, columns
+    embeddings.npy     normalized float32 matrix, one row per item
+    ids.npy            collection ids, in row order
+    meta_<key>.npy     one array per metadata field, in row order
+
+load_embedding_artifact() memory-maps the arrays (mmap_mode="r"), so opening
+an artifact costs no embedding and no copy. It returns None when no artifact
+matches the dataset's current hash, model and format version, and callers
+then re-embed as before.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+ARTIFACT_FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+EMBEDDINGS_FILE = "embeddings.npy"
+IDS_FILE = "ids.npy"
+METADATA_PREFIX = "meta_"
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def artifact_directory(
+    data_path: str, model_name: str, backend: str, dataset_hash: str = None
+) -> str:
+    """Where the artifact for this dataset, model and embedding backend lives"""
+    dataset_hash = dataset_hash or file_sha256(data_path)
+    stem = os.path.splitext(data_path)[0]
+    model = model_name.strip("/").replace("/", "__")
+    return f"{stem}.embeddings/{model}-{backend}-{dataset_hash[:16]}"
+
+
+class EmbeddingArtifact:
+    """Memory-mapped embeddings, ids and metadata columns of one dataset"""
+
+    def __init__(self, directory: str, manifest: Dict[str, Any]):
+        import numpy as np
+
+        self.directory = directory
+        self.manifest = manifest
+        self.embeddings = np.load(
+            os.path.join(directory, EMBEDDINGS_FILE), mmap_mode="r"
+        )
+        self.ids = np.load(os.path.join(directory, IDS_FILE), mmap_mode="r")
+        self.columns = {
+            key: np.load(
+                os.path.join(directory, f"{METADATA_PREFIX}{key}.npy"), mmap_mode="r"
+            )
+            for key in manifest["columns"]
+        }
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def metadatas(self) -> List[Dict[str, Any]]:
+        """Rebuild per-item metadata dicts from the columns"""
+        columns = {key: column.tolist() for key, column in self.columns.items()}
+        return [
+            {key: values[row] for key, values in columns.items()}
+            for row in range(len(self))
+        ]
+
+    def matches(self, ids: List[str], content_hashes: List[str]) -> bool:
+        """True when the artifact holds exactly these items, in this order"""
+        return (
+            len(ids) == len(self)
+            and self.ids.tolist() == list(ids)
+            and self.columns["content_hash"].tolist() == list(content_hashes)
+        )
+
+
+def load_embedding_artifact(
+    data_path: str, model_name: str, backend: str
+) -> Optional[EmbeddingArtifact]:
+    """The artifact for data_path's current contents, or None if there is none"""
+    if not os.path.exists(data_path):
+        return None
+    dataset_hash = file_sha256(data_path)
+    directory = artifact_directory(data_path, model_name, backend, dataset_hash)
+    try:
+        with open(os.path.join(directory, MANIFEST_FILE), encoding="utf-8") as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return None
+
+    if (
+        manifest.get("format_version") != ARTIFACT_FORMAT_VERSION
+        or manifest.get("dataset_sha256") != dataset_hash
+        or manifest.get("model_name") != model_name
+        or manifest.get("backend") != backend
+    ):
+        return None
+    try:
+        return EmbeddingArtifact(directory, manifest)
+    except (OSError, ValueError) as e:
+        print(f"Error loading embedding artifact {directory}: {e}")
+        return None
+
+
+def metadata_column(values: List[Any]):
+    """Metadata values as a fixed-width array that can be memory-mapped"""
+    import numpy as np
+
+    if all(isinstance(value, bool) for value in values):
+        return np.array(values, dtype=bool)
+    if all(isinstance(value, int) and not isinstance(value, bool) for value in values):
+        return np.array(values, dtype=np.int64)
+    if all(isinstance(value, (int, float)) for value in values):
+        return np.array(values, dtype=np.float64)
+    return np.array([str(value) for value in values], dtype=str)
+
+
+def build_embedding_artifact(
+    data_path: str, batch_size: int = 256, force: bool = False
+) -> str:
+    """Embed every item in data_path and write the artifact; returns its directory"""
+    import numpy as np
+
+    from numpy_backend import normalize_rows
+    from shared_functions import (
+        EMBEDDING_MODEL_NAME,
+        load_food_data,
+        prepare_collection_records,
+        registry,
+    )
+
+    dataset_hash = file_sha256(data_path)
+    directory = artifact_directory(
+        data_path, EMBEDDING_MODEL_NAME, registry.backend, dataset_hash
+    )
+    if not force and load_embedding_artifact(
+        data_path, EMBEDDING_MODEL_NAME, registry.backend
+    ):
+        print(f"✅ Embedding artifact is up to date: {directory}")
+        return directory
+
+    food_items = load_food_data(data_path)
+    documents, metadatas, ids = prepare_collection_records(food_items)
+    embedding_function = registry.get(EMBEDDING_MODEL_NAME)
+
+    started = time.perf_counter()
+    embeddings = []
+    for start in range(0, len(documents), batch_size):
+        embeddings.extend(embedding_function(documents[start : start + batch_size]))
+        print(f"  ...embedded {min(start + batch_size, len(documents))} items")
+    embeddings = normalize_rows(embeddings)
+    elapsed = time.perf_counter() - started
+
+    # Write into a temporary directory and swap it in, so a reader never sees
+    # a half-written artifact
+    staging = f"{directory}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    np.save(os.path.join(staging, EMBEDDINGS_FILE), embeddings)
+    np.save(os.path.join(staging, IDS_FILE), np.array(ids, dtype=str))
+    columns = list(metadatas[0]) if metadatas else []
+    for key in columns:
+        np.save(
+            os.path.join(staging, f"{METADATA_PREFIX}{key}.npy"),
+            metadata_column([metadata[key] for metadata in metadatas]),
+        )
+    with open(os.path.join(staging, MANIFEST_FILE), "w", encoding="utf-8") as file:
+        json.dump(
+            {
+                "format_version": ARTIFACT_FORMAT_VERSION,
+                "dataset_path": os.path.basename(data_path),
+                "dataset_sha256": dataset_hash,
+                "model_name": EMBEDDING_MODEL_NAME,
+                "backend": registry.backend,
+                "items": len(ids),
+                "dimensions": int(embeddings.shape[1]) if len(ids) else 0,
+                "columns": columns,
+                "embedding_seconds": elapsed,
+            },
+            file,
+            indent=2,
+        )
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(staging, directory)
+
+    print(f"✅ Wrote {len(ids)} embeddings in {elapsed:.1f}s to {directory}")
+    return directory
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Prebuilt food embedding artifacts")
+    parser.add_argument("command", choices=["build", "check"])
+    parser.add_argument("--data", default="files/FoodDataSet.json")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--force", action="store_true", help="Rebuild even if current")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        build_embedding_artifact(args.data, args.batch_size, args.force)
+        return 0
+
+    from shared_functions import EMBEDDING_MODEL_NAME, registry
+
+    artifact = load_embedding_artifact(
+        args.data, EMBEDDING_MODEL_NAME, registry.backend
+    )
+    if artifact is None:
+        print(f"❌ No current embedding artifact for {args.data}")
+        return 1
+    print(
+        f"✅ {artifact.directory}: {len(artifact)} items, "
+        f"{artifact.manifest['dimensions']} dimensions"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+"""
+Parity check and CPU throughput benchmark for the embedding backends.
+
+Embeds the FoodDataSet.json documents and the benchmark query texts with the
+PyTorch (sentence-transformers) model and with the ONNX Runtime exports, then
+reports for each ONNX backend:
+
+- parity: per-text cosine similarity to the PyTorch embeddings, and how many
+  of each query's top-k documents agree
+- throughput: documents per second for batched embedding, and single-query
+  latency (the search path embeds one query at a time)
+
+Exits with code 1 if any text's cosine similarity falls below --min-cosine.
+
+Usage:
+    python food_search/embedding_benchmark.py
+    python food_search/embedding_benchmark.py --backends onnx-int8 --min-cosine 0.98 --output embeddings.json
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from embedding_registry import create_embedding_function
+from search_benchmark import load_query_set
+from shared_functions import EMBEDDING_MODEL_NAME, build_food_document, load_food_data
+
+REFERENCE_BACKEND = "sentence-transformers"
+
+
+def embed_all(embedding_function, texts: List[str], batch_size: int) -> np.ndarray:
+    embeddings = []
+    for start in range(0, len(texts), batch_size):
+        embeddings.extend(embedding_function(texts[start : start + batch_size]))
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+
+def measure_throughput(
+    embedding_function, documents: List[str], queries: List[str], batch_size: int
+) -> Dict[str, float]:
+    """Batched documents per second and single-query latency percentiles"""
+    embedding_function(documents[:batch_size])  # warm up
+
+    started = time.perf_counter()
+    embed_all(embedding_function, documents, batch_size)
+    elapsed = time.perf_counter() - started
+
+    latencies_ms = []
+    for query in queries:
+        query_started = time.perf_counter_ns()
+        embedding_function([query])
+        latencies_ms.append((time.perf_counter_ns() - query_started) / 1e6)
+
+    return {
+        "documents_per_second": len(documents) / elapsed if elapsed else 0.0,
+        "query_p50_ms": float(np.percentile(latencies_ms, 50)),
+        "query_p95_ms": float(np.percentile(latencies_ms, 95)),
+    }
+
+
+def measure_parity(
+    reference: Dict[str, np.ndarray], candidate: Dict[str, np.ndarray], k: int
+) -> Dict[str, float]:
+    """Cosine agreement with the reference embeddings and top-k overlap"""
+    cosines = np.concatenate(
+        [
+            (reference["documents"] * candidate["documents"]).sum(axis=1),
+            (reference["queries"] * candidate["queries"]).sum(axis=1),
+        ]
+    )
+
+    def top_k(embeddings: Dict[str, np.ndarray]) -> np.ndarray:
+        scores = embeddings["queries"] @ embeddings["documents"].T
+        return np.argsort(-scores, axis=1)[:, :k]
+
+    overlaps = [
+        len(set(expected) & set(returned)) / k
+        for expected, returned in zip(top_k(reference), top_k(candidate))
+    ]
+    return {
+        "min_cosine": float(cosines.min()),
+        "mean_cosine": float(cosines.mean()),
+        f"top{k}_overlap": float(np.mean(overlaps)),
+    }
+
+
+def run_embedding_benchmark(
+    documents: List[str],
+    queries: List[str],
+    backends: List[str],
+    model_name: str = EMBEDDING_MODEL_NAME,
+    batch_size: int = 32,
+    k: int = 5,
+) -> Dict[str, Any]:
+    report = {
+        "model_name": model_name,
+        "documents": len(documents),
+        "queries": len(queries),
+        "backends": {},
+    }
+    embeddings = {}
+    backends = [REFERENCE_BACKEND] + [b for b in backends if b != REFERENCE_BACKEND]
+    for backend in backends:
+        print(f"⏱️ {backend}...")
+        started = time.perf_counter()
+        embedding_function = create_embedding_function(model_name, backend)
+        load_seconds = time.perf_counter() - started
+
+        embeddings[backend] = {
+            "documents": embed_all(embedding_function, documents, batch_size),
+            "queries": embed_all(embedding_function, queries, batch_size),
+        }
+        result = {"load_seconds": load_seconds}
+        result.update(
+            measure_throughput(embedding_function, documents, queries, batch_size)
+        )
+        if backend != REFERENCE_BACKEND:
+            result.update(
+                measure_parity(embeddings[REFERENCE_BACKEND], embeddings[backend], k)
+            )
+            result["speedup"] = (
+                result["documents_per_second"]
+                / report["backends"][REFERENCE_BACKEND]["documents_per_second"]
+            )
+        report["backends"][backend] = result
+    return report
+
+
+def format_report(report: Dict[str, Any], k: int) -> str:
+    lines = [
+        f"{'backend':<22} {'docs/s':>8} {'speedup':>8} {'query p50':>10} "
+        f"{'min cos':>8} {'mean cos':>9} {f'top{k}':>6}"
+    ]
+    for backend, result in report["backends"].items():
+        line = (
+            f"{backend:<22} {result['documents_per_second']:>8.1f} "
+            f"{result.get('speedup', 1.0):>7.2f}x {result['query_p50_ms']:>8.2f}ms"
+        )
+        if "min_cosine" in result:
+            line += (
+                f" {result['min_cosine']:>8.4f} {result['mean_cosine']:>9.4f} "
+                f"{result[f'top{k}_overlap']:>6.2f}"
+            )
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare embedding backends")
+    parser.add_argument("--data", default="files/FoodDataSet.json")
+    parser.add_argument("--model", default=EMBEDDING_MODEL_NAME)
+    parser.add_argument("--backends", default="onnx,onnx-int8")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--min-cosine", type=float, default=0.98)
+    parser.add_argument("--output", default=None, help="Write the report as JSON")
+    args = parser.parse_args(argv)
+
+    print("🏎️ EMBEDDING BACKEND BENCHMARK")
+    print("=" * 50)
+    documents = [build_food_document(food) for food in load_food_data(args.data)]
+    queries = [query["query"] for query in load_query_set()["queries"]]
+
+    report = run_embedding_benchmark(
+        documents,
+        queries,
+        args.backends.split(","),
+        args.model,
+        args.batch_size,
+        args.k,
+    )
+    print(f"\n📊 {args.model}: {len(documents)} documents, {len(queries)} queries")
+    print(format_report(report, args.k))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        print(f"\n💾 Report written to {args.output}")
+
+    failures = [
+        f"{backend}: min cosine {result['min_cosine']:.4f} < {args.min_cosine}"
+        for backend, result in report["backends"].items()
+        if result.get("min_cosine", 1.0) < args.min_cosine
+    ]
+    if failures:
+        print("\n❌ Parity check failed:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print(f"\n✅ Every backend agrees with PyTorch (cosine >= {args.min_cosine})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
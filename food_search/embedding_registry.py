@@ -0,0 +1,151 @@
+"""
+Process-wide registry of embedding models for the food search tools.
+
+Every collection that uses the same model shares one loaded instance, so a
+script that builds several collections only pays the model load once.
+
+FOOD_SEARCH_EMBEDDING_BACKEND picks how models run: "sentence-transformers"
+(PyTorch, the default), "onnx" (ONNX Runtime) or "onnx-int8" (ONNX Runtime
+with dynamically quantized int8 weights).
+"""
+
+import os
+import resource
+import sys
+import threading
+import time
+from typing import Any, Dict
+
+EMBEDDING_BACKENDS = ("sentence-transformers", "onnx", "onnx-int8")
+EMBEDDING_BACKEND = os.getenv("FOOD_SEARCH_EMBEDDING_BACKEND", "sentence-transformers")
+
+
+def get_resident_memory_mb() -> float:
+    """Return the current resident set size of this process in MB"""
+    try:
+        with open("/proc/self/statm", "r") as statm:
+            resident_pages = int(statm.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        # Fall back to peak RSS (reported in bytes on macOS, KB elsewhere)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def create_embedding_function(model_name: str, backend: str = EMBEDDING_BACKEND):
+    """Build a Chroma embedding function for model_name on the given backend"""
+    if backend == "sentence-transformers":
+        # Importing chromadb's embedding functions is slow, so wait until needed
+        from chromadb.utils import embedding_functions
+
+        return embedding_functions.SentenceTransformerEmbeddingFunction(
+            model_name=model_name
+        )
+    if backend in ("onnx", "onnx-int8"):
+        from onnx_embedding import OnnxEmbeddingFunction
+
+        return OnnxEmbeddingFunction(model_name, quantized=backend == "onnx-int8")
+    raise ValueError(
+        f"Unknown embedding backend: {backend} "
+        f"(choose from {', '.join(EMBEDDING_BACKENDS)})"
+    )
+
+
+class EmbeddingModelRegistry:
+    """Loads each embedding model once per process and hands out the shared instance"""
+
+    def __init__(self, backend: str = EMBEDDING_BACKEND):
+        self.backend = backend
+        self._models = {}
+        self._stats = {}
+        self._warmup_threads = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_name: str):
+        """Return the embedding function for model_name, loading it on first use"""
+        embedding_function = self._models.get(model_name)
+        if embedding_function is not None:
+            return embedding_function
+
+        with self._lock:
+            # Another thread may have finished loading while we waited
+            if model_name not in self._models:
+                memory_before = get_resident_memory_mb()
+                start_time = time.perf_counter()
+
+                self._models[model_name] = create_embedding_function(
+                    model_name, self.backend
+                )
+
+                self._stats[model_name] = {
+                    "load_seconds": time.perf_counter() - start_time,
+                    "memory_delta_mb": get_resident_memory_mb() - memory_before,
+                    "warmup_seconds": None,
+                    "backend": self.backend,
+                }
+            return self._models[model_name]
+
+    def warmup(self, model_name: str, background: bool = True):
+        """Load model_name and run one tiny forward pass, optionally in a daemon thread"""
+        if not background:
+            self._warmup(model_name)
+            return None
+
+        with self._lock:
+            thread = self._warmup_threads.get(model_name)
+            if thread is None:
+                thread = threading.Thread(
+                    target=self._warmup,
+                    args=(model_name,),
+                    name=f"warmup-{model_name}",
+                    daemon=True,
+                )
+                self._warmup_threads[model_name] = thread
+                thread.start()
+        return thread
+
+    def _warmup(self, model_name: str):
+        try:
+            embedding_function = self.get(model_name)
+            start_time = time.perf_counter()
+            embedding_function(["warmup"])
+            self._stats[model_name]["warmup_seconds"] = time.perf_counter() - start_time
+        except Exception as e:
+            print(f"Error warming up embedding model {model_name}: {e}")
+
+    def wait_until_ready(self, model_name: str, timeout: float = None) -> bool:
+        """Block until a background warmup finishes; True if the model is loaded"""
+        thread = self._warmup_threads.get(model_name)
+        if thread is not None:
+            thread.join(timeout)
+        return model_name in self._models
+
+    def is_loaded(self, model_name: str) -> bool:
+        return model_name in self._models
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "models": {name: dict(stats) for name, stats in self._stats.items()},
+            "resident_memory_mb": get_resident_memory_mb(),
+        }
+
+
+# Create a registry instance
+registry = EmbeddingModelRegistry()
+
+
+def format_registry_stats() -> str:
+    """Describe load time and memory use of every loaded embedding model"""
+    stats = registry.stats()
+    lines = []
+    for name, model_stats in stats["models"].items():
+        line = (
+            f"{name} ({model_stats['backend']}): "
+            f"loaded in {model_stats['load_seconds']:.2f}s "
+            f"(+{model_stats['memory_delta_mb']:.0f} MB)"
+        )
+        if model_stats["warmup_seconds"] is not None:
+            line += f", warmup {model_stats['warmup_seconds']*1000:.0f} ms"
+        lines.append(line)
+    lines.append(f"Resident memory: {stats['resident_memory_mb']:.0f} MB")
+    return "\n".join(lines)
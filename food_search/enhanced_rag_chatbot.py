@@ -1,119 +1,243 @@
+import os
+import queue
+import threading
+import time
 from shared_functions import *
-from typing import List, Dict, Any
-from ibm_watsonx_ai.foundation_models.utils.enums import ModelTypes
-from ibm_watsonx_ai.foundation_models import ModelInference
-from utils.config import config
+from typing import Callable, List, Dict, Any, Optional, Tuple
+from context_packing import (
+    CONTEXT_TOKEN_BUDGET,
+    format_prompt_token_stats,
+    pack_context_for_llm,
+    record_prompt,
+    warmup_tokenizer,
+)
+from llm_client import LLM_MODEL_ID, format_llm_client_stats, get_llm_client
+from response_cache import (
+    RESPONSE_CACHE_PATH,
+    SemanticResponseCache,
+    format_response_cache_stats,
+)
 
 food_items = []
 
-model_id = "ibm/granite-3-3-8b-instruct"
-gen_parms = {"max_new_tokens": 400}
+# Stream LLM responses token by token (set FOOD_SEARCH_STREAM_LLM=0 to wait
+# for the whole response); without a first token in time, fall back
+STREAM_LLM_RESPONSES = os.getenv("FOOD_SEARCH_STREAM_LLM", "1").lower() not in (
+    "0",
+    "false",
+    "no",
+)
+FIRST_TOKEN_TIMEOUT = float(os.getenv("FOOD_SEARCH_FIRST_TOKEN_TIMEOUT", "10"))
+# A stream that stalls this long after its first token is cut short
+STREAM_IDLE_TIMEOUT = 30.0
+# Appended to an answer whose stream was cut short
+STREAM_INCOMPLETE_NOTE = "\n⚠️ The response was cut short."
 
-space_id = None
-verify = None
+# Time to first token, token count and tokens/s of each streamed turn
+llm_stream_turns = []
 
-url = config.WATSON_URL
-apikey = config.OPENAI_API_KEY
-project_id = config.PROJECT_ID
-credentials = {"url": url, "apikey": apikey}
 
+# Answers for paraphrased queries, opened by get_response_cache() on first use
+_response_cache = None
 
-model = ModelInference(
-    model_id=model_id, params=gen_parms, credentials=credentials, project_id=project_id
-)
 
+def get_response_cache() -> SemanticResponseCache:
+    """The shared semantic answer cache, loaded from disk on first use"""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = SemanticResponseCache(cache_path=RESPONSE_CACHE_PATH or None)
+    return _response_cache
 
-def main():
-    """Main function for enhanced RAG chatbot system"""
+
+def response_cache_namespace(collection) -> Optional[str]:
+    """Namespace for answers from collection, or None if its catalog is unknown.
+
+    Cached answers are only reused for the same model and prompt, embedding
+    backend and catalog, so a re-synced catalog never serves answers about
+    foods that changed or were removed.
+    """
+    catalog = get_catalog_fingerprint(collection)
+    if not catalog:
+        return None
+    return f"{LLM_MODEL_ID}:rag:{registry.backend}:{catalog[:16]}"
+
+
+def result_food_ids(search_results: List[Dict]) -> List[str]:
+    return [result.get("food_id") or result["food_name"] for result in search_results]
+
+
+def lookup_query_embedding(collection, query: str):
+    """The query's embedding for the answer cache, or None if unavailable"""
     try:
-        print("🤖 Enhanced RAG-Powered Food Recommendation Chatbot")
-        print("   Powered by IBM Granite & ChromaDB")
-        print("=" * 55)
-        global food_items
-        food_items = load_food_data("files/FoodDataSet.json")
-        print(f"✅ Loaded {len(food_items)} food items")
+        return embed_query(collection, query)
+    except Exception as e:
+        print(f"⚠️ Answer cache unavailable: {e}")
+        return None
+
+
+def stream_llm_generation(
+    prompt: str,
+    on_token: Callable[[str], None],
+    first_token_timeout: float = None,
+) -> Tuple[Optional[str], bool]:
+    """Stream a generation, handing each piece of text to on_token as it arrives.
+
+    Returns the text and whether the stream finished. The text is None when
+    no token arrives within first_token_timeout seconds (default
+    FIRST_TOKEN_TIMEOUT) or the stream fails before its first token; a stream
+    that stalls or fails after that returns its partial text, not finished.
+    """
+    if first_token_timeout is None:
+        first_token_timeout = FIRST_TOKEN_TIMEOUT
+    chunks = queue.Queue()
+    cancelled = threading.Event()
+    end_of_stream = object()
+
+    def produce():
+        try:
+            stream = get_llm_client().generate_text_stream(
+                prompt=prompt, params=None, raw_response=True
+            )
+            for chunk in stream:
+                if cancelled.is_set():
+                    return
+                chunks.put(chunk)
+            chunks.put(end_of_stream)
+        except Exception as e:
+            chunks.put(e)
 
-        collection = create_similarity_search_collection(
-            "enhanced_rag_food_chatbot",
-            {"description": "Enhanced RAG chatbot with IBM watsonx.ai integration"},
-        )
-        populate_similarity_collection(collection, food_items)
-        print("✅ Vector database ready")
+    started = time.perf_counter()
+    threading.Thread(target=produce, name="llm-stream", daemon=True).start()
 
-        # Test LLM connection
-        print("🔗 Testing LLM connection...")
-        test_response = model.generate(prompt="Hello", params=None)
-        if test_response and "results" in test_response:
-            print("✅ LLM connection established")
+    text_parts = []
+    tokens = 0
+    first_token_seconds = None
+    complete = False
+    while True:
+        if first_token_seconds is None:
+            timeout = first_token_timeout
         else:
-            print("❌ LLM connection failed")
-            return
+            timeout = STREAM_IDLE_TIMEOUT
+        try:
+            chunk = chunks.get(timeout=timeout)
+        except queue.Empty:
+            cancelled.set()
+            if first_token_seconds is None:
+                print(
+                    f"\n⏱️ No response within {first_token_timeout:g}s, using fallback"
+                )
+                return None, False
+            break
 
-        # Start enhanced RAG chatbot
-        enhanced_rag_food_chatbot(collection)
+        if chunk is end_of_stream:
+            complete = True
+            break
+        if isinstance(chunk, Exception):
+            print(f"\n❌ LLM stream error: {chunk}")
+            if first_token_seconds is None:
+                return None, False
+            break
 
-    except Exception as error:
-        print(f"❌ Error: {error}")
+        result = chunk["results"][0]
+        if first_token_seconds is None:
+            first_token_seconds = time.perf_counter() - started
+            latency_recorder.observe("llm_ttft", first_token_seconds * 1000)
+        # Chunks may carry a running token count; otherwise count chunks
+        tokens = max(tokens + 1, result.get("generated_token_count") or 0)
+        text_parts.append(result.get("generated_text", ""))
+        on_token(text_parts[-1])
+
+    total_seconds = time.perf_counter() - started
+    generation_seconds = total_seconds - first_token_seconds
+    llm_stream_turns.append(
+        {
+            "ttft_ms": first_token_seconds * 1000,
+            "total_ms": total_seconds * 1000,
+            "tokens": tokens,
+            "tokens_per_second": (
+                tokens / generation_seconds if generation_seconds > 0 else 0.0
+            ),
+            "complete": complete,
+        }
+    )
+    return "".join(text_parts), complete
 
 
-def prepare_context_for_llm(query: str, search_results: List[Dict]) -> str:
-    """Prepare structured context from search results for LLM"""
-    if not search_results:
-        return "No relevant food items found in the database."
+def print_token(text: str):
+    print(text, end="", flush=True)
+
 
-    context_parts = []
-    context_parts.append(
-        "Based on your query, here are the most relevant food options from our database:"
+def format_llm_stream_stats() -> str:
+    """Time to first token and tokens/s of the last and all streamed turns"""
+    if not llm_stream_turns:
+        return "No streamed LLM responses yet."
+    last = llm_stream_turns[-1]
+    mean_ttft = sum(turn["ttft_ms"] for turn in llm_stream_turns) / len(
+        llm_stream_turns
+    )
+    mean_rate = sum(turn["tokens_per_second"] for turn in llm_stream_turns) / len(
+        llm_stream_turns
+    )
+    return (
+        f"🧠 LLM streaming: last turn {last['ttft_ms']:.0f} ms to first token, "
+        f"{last['tokens']} tokens at {last['tokens_per_second']:.1f} tokens/s; "
+        f"mean over {len(llm_stream_turns)} turns {mean_ttft:.0f} ms, "
+        f"{mean_rate:.1f} tokens/s"
     )
-    context_parts.append("")
 
-    for i, result in enumerate(search_results[:3], 1):
-        food_context = []
-        food_context.append(f"Option {i}: {result['food_name']}")
-        food_context.append(f"  - Description: {result['food_description']}")
-        food_context.append(f"  - Cuisine: {result['cuisine_type']}")
-        food_context.append(
-            f"  - Calories: {result['food_calories_per_serving']} per serving"
-        )
 
-        if result.get("food_ingredients"):
-            ingredients = result["food_ingredients"]
-            if isinstance(ingredients, list):
-                food_context.append(
-                    f"  - Key ingredients: {', '.join(ingredients[:5])}"
-                )
-            else:
-                food_context.append(f"  - Key ingredients: {ingredients}")
+def main():
+    """Main function for enhanced RAG chatbot system"""
+    try:
+        print("🤖 Enhanced RAG-Powered Food Recommendation Chatbot")
+        print("   Powered by IBM Granite & ChromaDB")
+        print("=" * 55)
 
-        if result.get("food_health_benefits"):
-            food_context.append(
-                f"  - Health benefits: {result['food_health_benefits']}"
+        # Check the LLM connection in the background with a metadata call;
+        # the first prompt does not wait for the remote model
+        print("🔗 Checking LLM connection in the background...")
+        get_llm_client().start_health_check()
+
+        # Load the prompt tokenizer while the collection is prepared
+        warmup_tokenizer()
+
+        # Use the shared search service when one is running
+        collection = connect_search_service()
+        if collection is None:
+            # Load the embedding model in the background while the dataset loads
+            registry.warmup(EMBEDDING_MODEL_NAME)
+            global food_items
+            food_items = load_food_data("files/FoodDataSet.json")
+            print(f"✅ Loaded {len(food_items)} food items")
+
+            collection = prepare_food_collection(
+                "enhanced_rag_food_chatbot",
+                {"description": "Enhanced RAG chatbot with IBM watsonx.ai integration"},
+                food_items,
+                data_path="files/FoodDataSet.json",
             )
+        print("✅ Vector database ready")
 
-        if result.get("cooking_method"):
-            food_context.append(f"  - Cooking method: {result['cooking_method']}")
-
-        if result.get("taste_profile"):
-            food_context.append(f"  - Taste profile: {result['taste_profile']}")
+        # Start enhanced RAG chatbot
+        enhanced_rag_food_chatbot(collection)
 
-        food_context.append(
-            f"  - Similarity score: {result['similarity_score']*100:.1f}%"
-        )
-        food_context.append("")
+    except Exception as error:
+        print(f"❌ Error: {error}")
 
-        context_parts.extend(food_context)
 
-    return "\n".join(context_parts)
+def prepare_context_for_llm(
+    query: str, search_results: List[Dict], token_budget: int = None
+) -> str:
+    """Prepare structured context from search results for LLM, within token_budget"""
+    return pack_context_for_llm(search_results, token_budget)[0]
 
 
-def generate_llm_rag_response(query: str, search_results: List[Dict]) -> str:
-    """Generate response using IBM Granite with retrieved context"""
-    try:
-        # Prepare context from search results
-        context = prepare_context_for_llm(query, search_results)
+def build_rag_prompt(query: str, search_results: List[Dict]) -> str:
+    """Prompt asking the LLM to recommend from the retrieved foods"""
+    # Prepare context from search results
+    context, context_report = pack_context_for_llm(search_results)
 
-        # Build the prompt for the LLM
-        prompt = f"""You are a helpful food recommendation assistant. A user is asking for food recommendations, and I've retrieved relevant options from a food database.
+    prompt = f"""You are a helpful food recommendation assistant. A user is asking for food recommendations, and I've retrieved relevant options from a food database.
 
 User Query: "{query}"
 
@@ -129,9 +253,63 @@ Please provide a helpful, short response that:
 6. Keeps the response concise but informative
 
 Response:"""
+    record_prompt(prompt, [context_report])
+    return prompt
+
+
+def generate_llm_rag_response(
+    query: str,
+    search_results: List[Dict],
+    on_token: Callable[[str], None] = None,
+    query_embedding=None,
+    cache_namespace: str = None,
+) -> str:
+    """Generate response using IBM Granite with retrieved context.
+
+    With on_token, the response is streamed and each piece of text is passed
+    to on_token as it arrives; the fallback response is returned instead if
+    the first token does not arrive in time, and an answer whose stream was
+    cut short ends with STREAM_INCOMPLETE_NOTE. With query_embedding and
+    cache_namespace (see response_cache_namespace()), a cached answer to a
+    similar query over the same results is reused, and new answers are
+    cached once they are complete.
+    """
+    food_ids = result_food_ids(search_results)
+    use_cache = query_embedding is not None and cache_namespace is not None
+    if use_cache:
+        cached_response = get_response_cache().get(
+            cache_namespace, query_embedding, food_ids
+        )
+        if cached_response is not None:
+            return cached_response
+
+    try:
+        prompt = build_rag_prompt(query, search_results)
+
+        if on_token is not None:
+            with stage_timer("llm"):
+                response_text, complete = stream_llm_generation(prompt, on_token)
+            if response_text is None:
+                return generate_fallback_response(query, search_results)
+            response_text = response_text.strip()
+            if not complete:
+                # Already partly shown, so mark it rather than replace it
+                on_token(STREAM_INCOMPLETE_NOTE)
+                return response_text + STREAM_INCOMPLETE_NOTE
+            # Only answers whose stream reached its end are cached
+            if use_cache and len(response_text) >= 50:
+                get_response_cache().put(
+                    cache_namespace,
+                    query,
+                    query_embedding,
+                    food_ids,
+                    response_text,
+                )
+            return response_text
 
         # Generate response using IBM Granite
-        generated_response = model.generate(prompt=prompt, params=None)
+        with stage_timer("llm"):
+            generated_response = get_llm_client().generate(prompt=prompt, params=None)
 
         # Extract the generated text
         if generated_response and "results" in generated_response:
@@ -144,6 +322,14 @@ Response:"""
             if len(response_text) < 50:
                 return generate_fallback_response(query, search_results)
 
+            if use_cache:
+                get_response_cache().put(
+                    cache_namespace,
+                    query,
+                    query_embedding,
+                    food_ids,
+                    response_text,
+                )
             return response_text
         else:
             return generate_fallback_response(query, search_results)
@@ -177,6 +363,24 @@ def generate_fallback_response(query: str, search_results: List[Dict]) -> str:
     return " ".join(response_parts)
 
 
+class TokenPrinter:
+    """Prints streamed text as it arrives, then whatever was not streamed"""
+
+    def __init__(self):
+        self.printed = False
+
+    def __call__(self, text: str):
+        self.printed = True
+        print_token(text)
+
+    def finish(self, response: str):
+        # A fallback response arrives whole, after nothing was streamed
+        if self.printed:
+            print()
+        else:
+            print(response)
+
+
 def enhanced_rag_food_chatbot(collection):
     """Enhanced RAG-powered conversational food chatbot with IBM Granite"""
     print("\n" + "=" * 70)
@@ -192,6 +396,7 @@ def enhanced_rag_food_chatbot(collection):
     print("\nCommands:")
     print("  • 'help' - Show detailed help menu")
     print("  • 'compare' - Compare recommendations for two different queries")
+    print("  • 'latency' - Show search and LLM latency breakdown")
     print("  • 'quit' - Exit the chatbot")
     print("-" * 70)
 
@@ -216,6 +421,20 @@ def enhanced_rag_food_chatbot(collection):
             elif user_input.lower() in ["compare"]:
                 handle_enhanced_comparison_mode(collection)
 
+            elif user_input.lower() in ["latency", "stats"]:
+                print("\n⏱️  Latency breakdown:")
+                print(format_latency_breakdown())
+                cache_stats = get_result_cache_stats()
+                print(
+                    f"📈 Result cache: {cache_stats['hits']} hits, "
+                    f"{cache_stats['misses']} misses "
+                    f"({cache_stats['hit_rate']*100:.1f}% hit rate)"
+                )
+                print(format_llm_client_stats(get_llm_client().stats()))
+                print(format_llm_stream_stats())
+                print(format_prompt_token_stats())
+                print(format_response_cache_stats(get_response_cache().stats()))
+
             else:
                 # Process the food query with enhanced RAG
                 handle_enhanced_rag_query(collection, user_input, conversation_history)
@@ -247,21 +466,32 @@ def handle_enhanced_rag_query(collection, query: str, conversation_history: List
     print(f"✅ Found {len(search_results)} relevant matches")
     print("🧠 Generating AI-powered response...")
 
+    # Paraphrases of earlier queries that retrieve the same foods reuse answers
+    query_embedding = lookup_query_embedding(collection, query)
+    cache_namespace = response_cache_namespace(collection)
+
     # Generate enhanced RAG response using IBM Granite
-    ai_response = generate_llm_rag_response(query, search_results)
+    if STREAM_LLM_RESPONSES:
+        print("\n🤖 Bot: ", end="", flush=True)
+        printer = TokenPrinter()
+        ai_response = generate_llm_rag_response(
+            query, search_results, printer, query_embedding, cache_namespace
+        )
+        printer.finish(ai_response)
+    else:
+        ai_response = generate_llm_rag_response(
+            query,
+            search_results,
+            query_embedding=query_embedding,
+            cache_namespace=cache_namespace,
+        )
+        print(f"\n🤖 Bot: {ai_response}")
 
-    print(f"\n🤖 Bot: {ai_response}")
+    if SHOW_LATENCY:
+        print(format_latency_breakdown())
 
     # Show detailed results for reference
-    print(f"\n📊 Search Results Details:")
-    print("-" * 45)
-    for i, result in enumerate(search_results[:3], 1):
-        print(f"{i}. 🍽️  {result['food_name']}")
-        print(
-            f"   📍 {result['cuisine_type']} | 🔥 {result['food_calories_per_serving']} cal | 📈 {result['similarity_score']*100:.1f}% match"
-        )
-        if i < 3:
-            print()
+    print(format_search_result_details(search_results))
 
 
 def handle_enhanced_comparison_mode(collection):
@@ -279,22 +509,51 @@ def handle_enhanced_comparison_mode(collection):
 
     print(f"\n🔍 Analyzing '{query1}' vs '{query2}' with AI...")
 
-    # Get results for both queries
-    results1 = perform_similarity_search(collection, query1, 3)
-    results2 = perform_similarity_search(collection, query2, 3)
+    # Get results for both queries in one batched search
+    results1, results2 = perform_batch_similarity_search(
+        collection, [(query1, None, 3), (query2, None, 3)]
+    )
 
     # Generate AI-powered comparison
-    comparison_response = generate_llm_comparison(query1, query2, results1, results2)
-
-    print(f"\n🤖 AI Analysis: {comparison_response}")
+    if STREAM_LLM_RESPONSES:
+        print("\n🤖 AI Analysis: ", end="", flush=True)
+        printer = TokenPrinter()
+        comparison_response = generate_llm_comparison(
+            query1, query2, results1, results2, printer
+        )
+        printer.finish(comparison_response)
+    else:
+        comparison_response = generate_llm_comparison(
+            query1, query2, results1, results2
+        )
+        print(f"\n🤖 AI Analysis: {comparison_response}")
 
     # Show side-by-side results
-    print(f"\n📊 DETAILED COMPARISON")
-    print("=" * 60)
-    print(
+    print(format_comparison_table(query1, query2, results1, results2))
+
+
+def format_search_result_details(search_results: List[Dict]) -> str:
+    """The top three results as printed under a chatbot answer"""
+    lines = [f"\n📊 Search Results Details:", "-" * 45]
+    for i, result in enumerate(search_results[:3], 1):
+        lines.append(f"{i}. 🍽️  {result['food_name']}")
+        lines.append(
+            f"   📍 {result['cuisine_type']} | 🔥 {result['food_calories_per_serving']} cal | 📈 {result['similarity_score']*100:.1f}% match"
+        )
+        if i < 3:
+            lines.append("")
+    return "\n".join(lines)
+
+
+def format_comparison_table(
+    query1: str, query2: str, results1: List[Dict], results2: List[Dict]
+) -> str:
+    """Side-by-side top results of two queries"""
+    lines = [f"\n📊 DETAILED COMPARISON", "=" * 60]
+    lines.append(
         f"{'Query 1: ' + query1[:20] + '...' if len(query1) > 20 else 'Query 1: ' + query1:<30} | {'Query 2: ' + query2[:20] + '...' if len(query2) > 20 else 'Query 2: ' + query2}"
     )
-    print("-" * 60)
+    lines.append("-" * 60)
 
     max_results = max(len(results1), len(results2))
     for i in range(min(max_results, 3)):
@@ -308,18 +567,20 @@ def handle_enhanced_comparison_mode(collection):
             if i < len(results2)
             else "---"
         )
-        print(f"{left[:30]:<30} | {right[:30]}")
+        lines.append(f"{left[:30]:<30} | {right[:30]}")
+    return "\n".join(lines)
 
 
-def generate_llm_comparison(
+def build_comparison_prompt(
     query1: str, query2: str, results1: List[Dict], results2: List[Dict]
 ) -> str:
-    """Generate AI-powered comparison between two queries"""
-    try:
-        context1 = prepare_context_for_llm(query1, results1[:3])
-        context2 = prepare_context_for_llm(query2, results2[:3])
+    """Prompt asking the LLM to compare the results of two queries"""
+    # The two contexts share one budget
+    token_budget = CONTEXT_TOKEN_BUDGET // 2
+    context1, context_report1 = pack_context_for_llm(results1, token_budget)
+    context2, context_report2 = pack_context_for_llm(results2, token_budget)
 
-        comparison_prompt = f"""You are analyzing and comparing two different food preference queries. Please provide a thoughtful comparison.
+    prompt = f"""You are analyzing and comparing two different food preference queries. Please provide a thoughtful comparison.
 
 Query 1: "{query1}"
 Top Results for Query 1:
@@ -337,8 +598,37 @@ Please provide a short comparison that:
 5. Keeps the analysis concise but insightful
 
 Comparison:"""
+    record_prompt(prompt, [context_report1, context_report2])
+    return prompt
+
+
+def generate_llm_comparison(
+    query1: str,
+    query2: str,
+    results1: List[Dict],
+    results2: List[Dict],
+    on_token: Callable[[str], None] = None,
+) -> str:
+    """Generate AI-powered comparison between two queries, streamed with on_token"""
+    try:
+        comparison_prompt = build_comparison_prompt(query1, query2, results1, results2)
 
-        generated_response = model.generate(prompt=comparison_prompt, params=None)
+        if on_token is not None:
+            with stage_timer("llm"):
+                response_text, complete = stream_llm_generation(
+                    comparison_prompt, on_token
+                )
+            if response_text is None:
+                return generate_simple_comparison(query1, query2, results1, results2)
+            if not complete:
+                on_token(STREAM_INCOMPLETE_NOTE)
+                return response_text.strip() + STREAM_INCOMPLETE_NOTE
+            return response_text.strip()
+
+        with stage_timer("llm"):
+            generated_response = get_llm_client().generate(
+                prompt=comparison_prompt, params=None
+            )
 
         if generated_response and "results" in generated_response:
             return generated_response["results"][0]["generated_text"].strip()
@@ -363,31 +653,41 @@ def generate_simple_comparison(
     return f"For '{query1}', I recommend {results1[0]['food_name']}. For '{query2}', {results2[0]['food_name']} would be perfect."
 
 
+def format_enhanced_rag_help() -> str:
+    """Help text for the enhanced RAG chatbot"""
+    return "\n".join(
+        [
+            "\n📖 ENHANCED RAG CHATBOT HELP",
+            "=" * 45,
+            "🧠 This chatbot uses IBM Granite to understand your",
+            "   food preferences and provide intelligent recommendations.",
+            "\nHow to get the best recommendations:",
+            "  • Be specific: 'healthy Italian pasta under 350 calories'",
+            "  • Mention preferences: 'spicy comfort food for cold weather'",
+            "  • Include context: 'light breakfast for busy morning'",
+            "  • Ask about benefits: 'protein-rich foods for workout recovery'",
+            "\nSpecial features:",
+            "  • 🔍 Vector similarity search finds relevant foods",
+            "  • 🧠 AI analysis provides contextual explanations",
+            "  • 📊 Detailed nutritional and cuisine information",
+            "  • 🔄 Smart comparison between different preferences",
+            "\nCommands:",
+            "  • 'compare' - AI-powered comparison of two queries",
+            "  • 'latency' - Show search and LLM latency breakdown",
+            "  • 'help' - Show this help menu",
+            "  • 'quit' - Exit the chatbot",
+            "\nTips for better results:",
+            "  • Use natural language - talk like you would to a friend",
+            "  • Mention dietary restrictions or preferences",
+            "  • Include meal timing (breakfast, lunch, dinner)",
+            "  • Specify if you want healthy, comfort, or indulgent options",
+        ]
+    )
+
+
 def show_enhanced_rag_help():
     """Display help information for enhanced RAG chatbot"""
-    print("\n📖 ENHANCED RAG CHATBOT HELP")
-    print("=" * 45)
-    print("🧠 This chatbot uses IBM Granite to understand your")
-    print("   food preferences and provide intelligent recommendations.")
-    print("\nHow to get the best recommendations:")
-    print("  • Be specific: 'healthy Italian pasta under 350 calories'")
-    print("  • Mention preferences: 'spicy comfort food for cold weather'")
-    print("  • Include context: 'light breakfast for busy morning'")
-    print("  • Ask about benefits: 'protein-rich foods for workout recovery'")
-    print("\nSpecial features:")
-    print("  • 🔍 Vector similarity search finds relevant foods")
-    print("  • 🧠 AI analysis provides contextual explanations")
-    print("  • 📊 Detailed nutritional and cuisine information")
-    print("  • 🔄 Smart comparison between different preferences")
-    print("\nCommands:")
-    print("  • 'compare' - AI-powered comparison of two queries")
-    print("  • 'help' - Show this help menu")
-    print("  • 'quit' - Exit the chatbot")
-    print("\nTips for better results:")
-    print("  • Use natural language - talk like you would to a friend")
-    print("  • Mention dietary restrictions or preferences")
-    print("  • Include meal timing (breakfast, lunch, dinner)")
-    print("  • Specify if you want healthy, comfort, or indulgent options")
+    print(format_enhanced_rag_help())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,261 @@
+"""
+HNSW parameter tuner for food collections.
+
+Sweeps max_neighbors (M), ef_construction and ef_search over a grid. For each
+setting it builds a Chroma collection from the catalog's embeddings (embedded
+once, never per setting), times every tuning query and measures recall@k
+against an exact brute-force search. The cheapest setting by mean query
+latency that meets the target recall is selected.
+
+Chroma does not apply a changed ef_search to an index that is already
+loaded, so every setting gets its own freshly built collection.
+
+With --persist-dir the stored embeddings of an existing collection are used,
+the selected setting is recorded in its metadata (hnsw_max_neighbors,
+hnsw_ef_construction, hnsw_ef_search) and, with --rebuild, the collection is
+rebuilt with it. create_similarity_search_collection and
+open_persistent_collection apply settings recorded in metadata.
+
+Usage:
+    python food_search/hnsw_tuner.py --target-recall 0.95 --k 10
+    python food_search/hnsw_tuner.py --persist-dir chroma_food_db --collection food_catalog --rebuild
+"""
+
+import argparse
+import itertools
+import json
+import random
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from numpy_backend import NumpyCollection
+from search_benchmark import load_query_set
+from shared_functions import (
+    EMBEDDING_MODEL_NAME,
+    HNSW_METADATA_PREFIX,
+    HNSW_PARAMETERS,
+    SYNC_BATCH_SIZE,
+    create_similarity_search_collection,
+    get_persistent_client,
+    iter_batches,
+    load_food_data,
+    open_persistent_collection,
+    populate_similarity_collection,
+    registry,
+)
+
+DEFAULT_GRID = {
+    "max_neighbors": (8, 16, 32, 64),
+    "ef_construction": (50, 100, 200),
+    "ef_search": (10, 25, 50, 100, 200),
+}
+TUNING_COLLECTION_NAME = "hnsw_tuning"
+
+
+def load_exact_collection(args) -> NumpyCollection:
+    """Catalog embeddings in an exact-search collection, embedded at most once"""
+    embedding_function = registry.get(EMBEDDING_MODEL_NAME)
+    if args.persist_dir:
+        source = get_persistent_client(args.persist_dir).get_collection(args.collection)
+        return NumpyCollection.from_collection(source, embedding_function)
+
+    exact = NumpyCollection(TUNING_COLLECTION_NAME, embedding_function)
+    populate_similarity_collection(exact, load_food_data(args.data))
+    return exact
+
+
+def build_tuning_queries(
+    exact: NumpyCollection, sample_size: int, seed: int = 0
+) -> List[str]:
+    """Benchmark query texts plus the names of a seeded sample of catalog items"""
+    queries = [query["query"] for query in load_query_set()["queries"]]
+    names = [
+        metadata["name"] for metadata in exact.get(include=["metadatas"])["metadatas"]
+    ]
+    random.Random(seed).shuffle(names)
+    return list(dict.fromkeys(queries + names[:sample_size]))
+
+
+def evaluate_setting(
+    exact: NumpyCollection,
+    query_embeddings,
+    true_ids: List[List[str]],
+    k: int,
+    setting: Dict[str, int],
+) -> Dict[str, Any]:
+    """Build an index with setting and return its recall@k and query latency"""
+    started = time.perf_counter()
+    collection = create_similarity_search_collection(
+        TUNING_COLLECTION_NAME, backend="chroma", hnsw_params=setting
+    )
+    records = exact.get(include=["embeddings"])
+    for batch in iter_batches(range(len(records["ids"])), SYNC_BATCH_SIZE):
+        collection.add(
+            ids=[records["ids"][i] for i in batch],
+            embeddings=records["embeddings"][batch[0] : batch[-1] + 1],
+        )
+    build_seconds = time.perf_counter() - started
+
+    latencies_ms = []
+    recalls = []
+    for embedding, expected in zip(query_embeddings, true_ids):
+        query_started = time.perf_counter_ns()
+        results = collection.query(
+            query_embeddings=[embedding], n_results=k, include=[]
+        )
+        latencies_ms.append((time.perf_counter_ns() - query_started) / 1e6)
+        recalls.append(len(set(results["ids"][0]) & set(expected)) / len(expected))
+
+    return {
+        **setting,
+        "recall_at_k": float(np.mean(recalls)),
+        "mean_ms": float(np.mean(latencies_ms)),
+        "p95_ms": float(np.percentile(latencies_ms, 95)),
+        "build_seconds": build_seconds,
+    }
+
+
+def select_setting(results: List[Dict], target_recall: float) -> Dict[str, Any]:
+    """Cheapest setting meeting target_recall, or the most accurate one if none do"""
+    passing = [result for result in results if result["recall_at_k"] >= target_recall]
+    if passing:
+        return min(
+            passing, key=lambda result: (result["mean_ms"], result["build_seconds"])
+        )
+    return max(results, key=lambda result: (result["recall_at_k"], -result["mean_ms"]))
+
+
+def tune_hnsw(
+    exact: NumpyCollection,
+    query_texts: List[str],
+    k: int = 10,
+    target_recall: float = 0.95,
+    grid: Dict[str, tuple] = DEFAULT_GRID,
+) -> Dict[str, Any]:
+    """Sweep grid and return every result plus the selected setting"""
+    k = min(k, exact.count())
+    query_embeddings = registry.get(EMBEDDING_MODEL_NAME)(query_texts)
+    ground_truth = exact.query(
+        query_embeddings=query_embeddings, n_results=k, include=[]
+    )["ids"]
+
+    results = []
+    for values in itertools.product(*(grid[name] for name in HNSW_PARAMETERS)):
+        setting = dict(zip(HNSW_PARAMETERS, values))
+        result = evaluate_setting(exact, query_embeddings, ground_truth, k, setting)
+        results.append(result)
+        print(
+            f"  M={setting['max_neighbors']:<3} "
+            f"ef_construction={setting['ef_construction']:<4} "
+            f"ef_search={setting['ef_search']:<4} "
+            f"recall@{k}={result['recall_at_k']:.3f} mean={result['mean_ms']:.2f}ms"
+        )
+
+    selected = select_setting(results, target_recall)
+    return {
+        "k": k,
+        "target_recall": target_recall,
+        "queries": len(query_texts),
+        "items": exact.count(),
+        "met_target": selected["recall_at_k"] >= target_recall,
+        "selected": selected,
+        "results": results,
+    }
+
+
+def tuned_metadata(report: Dict[str, Any]) -> Dict[str, Any]:
+    """Collection metadata entries that record the selected setting"""
+    selected = report["selected"]
+    metadata = {HNSW_METADATA_PREFIX + name: selected[name] for name in HNSW_PARAMETERS}
+    metadata[HNSW_METADATA_PREFIX + "tuned_k"] = report["k"]
+    metadata[HNSW_METADATA_PREFIX + "tuned_recall"] = selected["recall_at_k"]
+    return metadata
+
+
+def record_tuned_setting(collection, report: Dict[str, Any]):
+    """Store the selected setting in the collection's metadata"""
+    metadata = {**(collection.metadata or {}), **tuned_metadata(report)}
+    collection.modify(metadata=metadata)
+    return metadata
+
+
+def rebuild_persistent_collection(exact: NumpyCollection, args, metadata: Dict):
+    """Recreate the persistent collection so its index uses the recorded setting"""
+    records = exact.get(include=["embeddings", "metadatas", "documents"])
+    get_persistent_client(args.persist_dir).delete_collection(args.collection)
+    collection = open_persistent_collection(args.collection, metadata, args.persist_dir)
+    for batch in iter_batches(range(len(records["ids"])), SYNC_BATCH_SIZE):
+        collection.add(
+            ids=[records["ids"][i] for i in batch],
+            embeddings=records["embeddings"][batch[0] : batch[-1] + 1],
+            metadatas=[records["metadatas"][i] for i in batch],
+            documents=[records["documents"][i] for i in batch],
+        )
+    return collection
+
+
+def parse_grid(values: str, default: tuple) -> tuple:
+    return tuple(int(value) for value in values.split(",")) if values else default
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune HNSW parameters for recall@k")
+    parser.add_argument("--data", default="files/FoodDataSet.json")
+    parser.add_argument("--persist-dir", default=None)
+    parser.add_argument("--collection", default="food_catalog")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--target-recall", type=float, default=0.95)
+    parser.add_argument("--sample-queries", type=int, default=100)
+    parser.add_argument("--max-neighbors", default=None, help="e.g. 8,16,32")
+    parser.add_argument("--ef-construction", default=None, help="e.g. 50,100,200")
+    parser.add_argument("--ef-search", default=None, help="e.g. 10,50,100")
+    parser.add_argument("--rebuild", action="store_true")
+    parser.add_argument("--output", default=None, help="Write the sweep as JSON")
+    args = parser.parse_args()
+
+    grid = {
+        "max_neighbors": parse_grid(args.max_neighbors, DEFAULT_GRID["max_neighbors"]),
+        "ef_construction": parse_grid(
+            args.ef_construction, DEFAULT_GRID["ef_construction"]
+        ),
+        "ef_search": parse_grid(args.ef_search, DEFAULT_GRID["ef_search"]),
+    }
+
+    print("🎛️ HNSW PARAMETER TUNING")
+    print("=" * 50)
+    exact = load_exact_collection(args)
+    query_texts = build_tuning_queries(exact, args.sample_queries)
+    report = tune_hnsw(exact, query_texts, args.k, args.target_recall, grid)
+
+    selected = report["selected"]
+    status = "✅" if report["met_target"] else "⚠️ Target not met;"
+    print(
+        f"\n{status} selected M={selected['max_neighbors']} "
+        f"ef_construction={selected['ef_construction']} "
+        f"ef_search={selected['ef_search']} "
+        f"(recall@{report['k']} {selected['recall_at_k']:.3f}, "
+        f"{selected['mean_ms']:.2f}ms/query)"
+    )
+
+    if args.persist_dir:
+        source = get_persistent_client(args.persist_dir).get_collection(args.collection)
+        metadata = record_tuned_setting(source, report)
+        print(f"💾 Recorded in metadata of '{args.collection}'")
+        if args.rebuild:
+            rebuild_persistent_collection(exact, args, metadata)
+            print(f"🔁 Rebuilt '{args.collection}' with the selected setting")
+    else:
+        print(
+            f"Pass hnsw_params={json.dumps({n: selected[n] for n in HNSW_PARAMETERS})}"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        print(f"💾 Sweep written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,395 @@
+"""
+Staged, parallel ingestion pipeline for food collections.
+
+Items flow through three stages connected by bounded queues:
+
+1. text building - documents and metadatas are built in a worker pool
+2. embedding     - documents are embedded in batches of embed_batch_size
+3. add           - embedded batches are upserted into the collection
+
+The stages run concurrently, so embedding of one batch overlaps with text
+building of the next and with writing the previous one. After every written
+batch a checkpoint is saved; a rerun with the same checkpoint skips batches
+that were already committed instead of embedding them again. The checkpoint
+records the source file's path and content hash, so a rerun over an edited
+catalog starts from the beginning.
+
+Usage:
+    python food_search/ingestion_pipeline.py files/FoodDataSet.json
+"""
+
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Optional
+
+from embedding_artifacts import file_sha256
+from lexical_index import BM25Index
+from metadata_index import FoodMetadataIndex
+from shared_functions import (
+    DEFAULT_PERSIST_DIRECTORY,
+    EMBEDDING_MODEL_NAME,
+    assign_unique_ids,
+    build_collection_records,
+    bump_collection_version,
+    iter_batches,
+    iter_food_data,
+    open_persistent_collection,
+    registry,
+    set_lexical_index,
+    set_metadata_index,
+)
+
+# Marks the end of the stream on every queue
+_DONE = object()
+
+
+def _timed_build(food_items):
+    """Build records for one batch in a pool worker and time the work"""
+    started = time.perf_counter()
+    documents, metadatas = build_collection_records(food_items)
+    return documents, metadatas, time.perf_counter() - started
+
+
+class StageStats:
+    """Items processed and busy time for one pipeline stage"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.batches = 0
+        self.busy_seconds = 0.0
+
+    def record(self, items: int, seconds: float):
+        self.items += items
+        self.batches += 1
+        self.busy_seconds += seconds
+
+    @property
+    def items_per_second(self) -> float:
+        return self.items / self.busy_seconds if self.busy_seconds else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "items": self.items,
+            "batches": self.batches,
+            "busy_seconds": self.busy_seconds,
+            "items_per_second": self.items_per_second,
+        }
+
+
+class IngestionPipeline:
+    """Build, embed and add food items with the three stages overlapping"""
+
+    def __init__(
+        self,
+        collection,
+        batch_size: int = 512,
+        embed_batch_size: int = 64,
+        text_workers: int = 4,
+        queue_size: int = 4,
+        checkpoint_path: Optional[str] = None,
+        use_processes: bool = False,
+        embedding_function=None,
+        source_path: Optional[str] = None,
+    ):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.embed_batch_size = embed_batch_size
+        self.text_workers = text_workers
+        self.queue_size = queue_size
+        self.checkpoint_path = checkpoint_path
+        self.use_processes = use_processes
+        # The file the items are read from, if any, to tie checkpoints to it
+        self.source_path = source_path
+        self.source = None
+        self.embedding_function = embedding_function or registry.get(
+            EMBEDDING_MODEL_NAME
+        )
+        self.stats = {
+            name: StageStats(name) for name in ("text", "embed", "add", "skipped")
+        }
+        self._stop = threading.Event()
+        self._errors = []
+
+    def describe_source(self) -> Optional[Dict[str, str]]:
+        """Path and content hash of the source file, or None without one"""
+        if not self.source_path:
+            return None
+        return {
+            "path": os.path.abspath(self.source_path),
+            "sha256": file_sha256(self.source_path),
+        }
+
+    def load_checkpoint(self):
+        """Return (last committed batch, items committed); (-1, 0) starts fresh"""
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return -1, 0
+        with open(self.checkpoint_path, "r", encoding="utf-8") as file:
+            checkpoint = json.load(file)
+        if checkpoint.get("collection") != self.collection.name:
+            return -1, 0
+        if checkpoint.get("batch_size") != self.batch_size:
+            print("⚠️ Checkpoint batch size differs; starting from the beginning")
+            return -1, 0
+        if checkpoint.get("source") != self.source:
+            print(
+                "⚠️ Catalog changed since the checkpoint; starting from the beginning"
+            )
+            return -1, 0
+        return (
+            checkpoint.get("last_committed_batch", -1),
+            checkpoint.get("items_committed", 0),
+        )
+
+    def save_checkpoint(self, batch_number: int, items_committed: int):
+        if not self.checkpoint_path:
+            return
+        temporary_path = f"{self.checkpoint_path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "collection": self.collection.name,
+                    "batch_size": self.batch_size,
+                    "source": self.source,
+                    "last_committed_batch": batch_number,
+                    "items_committed": items_committed,
+                },
+                file,
+            )
+        # Atomic rename, so a crash never leaves a half-written checkpoint
+        os.replace(temporary_path, self.checkpoint_path)
+
+    def _put(self, target: queue.Queue, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source: queue.Queue):
+        while not self._stop.is_set():
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _fail(self, error: Exception):
+        self._errors.append(error)
+        self._stop.set()
+
+    def _produce(self, food_items, executor, text_queue, resume_after, indexes):
+        """Assign ids in order and hand each batch to the text-building pool"""
+        try:
+            used_ids = set()
+            for batch_number, batch in enumerate(
+                iter_batches(food_items, self.batch_size)
+            ):
+                ids = assign_unique_ids(batch, used_ids)
+                for item_id, food in zip(ids, batch):
+                    for index in indexes:
+                        index.add(item_id, food)
+
+                if batch_number <= resume_after:
+                    self.stats["skipped"].record(len(batch), 0.0)
+                    continue
+
+                future = executor.submit(_timed_build, batch)
+                if not self._put(text_queue, (batch_number, ids, future)):
+                    return
+        except Exception as e:
+            self._fail(e)
+        finally:
+            self._put(text_queue, _DONE)
+
+    def _embed(self, text_queue, add_queue):
+        try:
+            while True:
+                item = self._get(text_queue)
+                if item is _DONE:
+                    break
+                batch_number, ids, future = item
+                documents, metadatas, build_seconds = future.result()
+                self.stats["text"].record(len(ids), build_seconds)
+
+                started = time.perf_counter()
+                embeddings = []
+                for start in range(0, len(documents), self.embed_batch_size):
+                    embeddings.extend(
+                        self.embedding_function(
+                            documents[start : start + self.embed_batch_size]
+                        )
+                    )
+                self.stats["embed"].record(len(ids), time.perf_counter() - started)
+
+                if not self._put(
+                    add_queue, (batch_number, ids, documents, metadatas, embeddings)
+                ):
+                    return
+        except Exception as e:
+            self._fail(e)
+        finally:
+            self._put(add_queue, _DONE)
+
+    def _add(self, add_queue, items_already_committed: int):
+        committed = items_already_committed
+        try:
+            while True:
+                item = self._get(add_queue)
+                if item is _DONE:
+                    break
+                batch_number, ids, documents, metadatas, embeddings = item
+
+                started = time.perf_counter()
+                # Upsert keeps a retried batch idempotent after a crash
+                self.collection.upsert(
+                    ids=ids,
+                    documents=documents,
+                    metadatas=metadatas,
+                    embeddings=embeddings,
+                )
+                self.stats["add"].record(len(ids), time.perf_counter() - started)
+                bump_collection_version(self.collection)
+
+                committed += len(ids)
+                self.save_checkpoint(batch_number, committed)
+                print(
+                    f"  batch {batch_number}: {committed} items committed "
+                    f"(embed {self.stats['embed'].items_per_second:.0f} items/s)"
+                )
+        except Exception as e:
+            self._fail(e)
+
+    def run(self, food_items: Iterable[Dict]) -> Dict[str, Any]:
+        """Ingest food_items and return per-stage throughput"""
+        self.source = self.describe_source()
+        resume_after, items_committed = self.load_checkpoint()
+        if resume_after >= 0:
+            print(f"↩️ Resuming after committed batch {resume_after}")
+
+        metadata_index = FoodMetadataIndex()
+        lexical_index = BM25Index()
+        text_queue = queue.Queue(maxsize=self.queue_size)
+        add_queue = queue.Queue(maxsize=self.queue_size)
+        pool_class = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+        wall_started = time.perf_counter()
+
+        with pool_class(max_workers=self.text_workers) as executor:
+            producer = threading.Thread(
+                target=self._produce,
+                args=(
+                    food_items,
+                    executor,
+                    text_queue,
+                    resume_after,
+                    (metadata_index, lexical_index),
+                ),
+                name="ingest-text",
+            )
+            embedder = threading.Thread(
+                target=self._embed, args=(text_queue, add_queue), name="ingest-embed"
+            )
+            producer.start()
+            embedder.start()
+            # The add stage runs in the calling thread
+            self._add(add_queue, items_committed)
+            producer.join()
+            embedder.join()
+
+        if self._errors:
+            raise self._errors[0]
+
+        metadata_index.finalize()
+        set_metadata_index(self.collection, metadata_index)
+        lexical_index.finalize()
+        set_lexical_index(self.collection, lexical_index)
+
+        wall_seconds = time.perf_counter() - wall_started
+        written = self.stats["add"].items
+        skipped = self.stats["skipped"].items
+        report = {
+            "items": written + skipped,
+            "written": written,
+            "skipped": skipped,
+            "wall_seconds": wall_seconds,
+            "items_per_second": (
+                self.stats["add"].items / wall_seconds if wall_seconds else 0.0
+            ),
+            "stages": {name: stats.to_dict() for name, stats in self.stats.items()},
+        }
+
+        # A finished run needs no checkpoint; the next run starts fresh
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+        if skipped:
+            print(
+                f"Added {written} food items to collection "
+                f"({skipped} were committed before resuming)"
+            )
+        else:
+            print(f"Added {written} food items to collection")
+        return report
+
+
+def run_ingestion_pipeline(collection, food_items: Iterable[Dict], **options):
+    """Ingest food_items into collection with an IngestionPipeline"""
+    return IngestionPipeline(collection, **options).run(food_items)
+
+
+def format_pipeline_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"Ingested {report['items']} items in {report['wall_seconds']:.2f}s "
+        f"({report['written']} written this run, "
+        f"{report['items_per_second']:.0f} items/s end to end)"
+    ]
+    for name, stats in report["stages"].items():
+        lines.append(
+            f"  {name:<8} {stats['items']:>8} items  "
+            f"{stats['items_per_second']:>10.0f} items/s  "
+            f"busy {stats['busy_seconds']:.2f}s"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest a food catalog")
+    parser.add_argument("data_file", help="JSON array or NDJSON food catalog")
+    parser.add_argument("--collection", default="food_catalog")
+    parser.add_argument("--persist-dir", default=DEFAULT_PERSIST_DIRECTORY)
+    parser.add_argument("--batch-size", type=int, default=512)
+    parser.add_argument("--embed-batch-size", type=int, default=64)
+    parser.add_argument("--text-workers", type=int, default=4)
+    parser.add_argument("--processes", action="store_true")
+    parser.add_argument("--checkpoint", default=None)
+    args = parser.parse_args()
+
+    collection = open_persistent_collection(
+        args.collection, {"description": "Ingested food catalog"}, args.persist_dir
+    )
+    checkpoint_path = args.checkpoint or os.path.join(
+        args.persist_dir, f"{args.collection}.checkpoint.json"
+    )
+
+    report = run_ingestion_pipeline(
+        collection,
+        iter_food_data(args.data_file),
+        batch_size=args.batch_size,
+        embed_batch_size=args.embed_batch_size,
+        text_workers=args.text_workers,
+        use_processes=args.processes,
+        checkpoint_path=checkpoint_path,
+        source_path=args.data_file,
+    )
+    print(format_pipeline_report(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Per-stage latency instrumentation for the food search path.
+
+Wrap a stage in `with stage_timer("embed"):` and its duration, measured with
+time.perf_counter_ns, is recorded into a histogram named after the stage.
+Histograms can be exported as JSON or in the Prometheus text format, and
+format_latency_breakdown() renders a table the CLIs can print on demand.
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List
+
+# Histogram bucket upper bounds in milliseconds
+DEFAULT_BUCKETS_MS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100)
+DEFAULT_BUCKETS_MS += (250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# Standard search stages, in the order they happen
+SEARCH_STAGES = ("lexical", "embed", "search", "hydrate", "format", "llm")
+
+
+class LatencyHistogram:
+    """Cumulative-bucket latency histogram with count, sum, min, max and last"""
+
+    def __init__(self, name: str, buckets_ms=DEFAULT_BUCKETS_MS):
+        self.name = name
+        self.buckets_ms = tuple(buckets_ms)
+        self.bucket_counts = [0] * (len(self.buckets_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = None
+        self.max_ms = None
+        self.last_ms = None
+        self._lock = threading.Lock()
+
+    def observe(self, duration_ms: float):
+        with self._lock:
+            index = 0
+            while index < len(self.buckets_ms) and duration_ms > self.buckets_ms[index]:
+                index += 1
+            self.bucket_counts[index] += 1
+            self.count += 1
+            self.total_ms += duration_ms
+            self.last_ms = duration_ms
+            self.min_ms = (
+                duration_ms if self.min_ms is None else min(self.min_ms, duration_ms)
+            )
+            self.max_ms = (
+                duration_ms if self.max_ms is None else max(self.max_ms, duration_ms)
+            )
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by linear interpolation inside its bucket"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        lower = 0.0
+        for index, bucket_count in enumerate(self.bucket_counts):
+            upper = (
+                self.buckets_ms[index] if index < len(self.buckets_ms) else self.max_ms
+            )
+            if bucket_count and seen + bucket_count >= target:
+                fraction = (target - seen) / bucket_count
+                estimate = lower + (upper - lower) * fraction
+                return min(max(estimate, self.min_ms), self.max_ms)
+            seen += bucket_count
+            lower = upper
+        return self.max_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum_ms": self.total_ms,
+            "mean_ms": self.mean_ms,
+            "min_ms": self.min_ms,
+            "max_ms": self.max_ms,
+            "last_ms": self.last_ms,
+            "p50_ms": self.quantile(0.50),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "buckets_ms": list(self.buckets_ms),
+            "bucket_counts": list(self.bucket_counts),
+        }
+
+
+class LatencyRecorder:
+    """Named collection of latency histograms"""
+
+    def __init__(self):
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        with self._lock:
+            if name not in self.histograms:
+                self.histograms[name] = LatencyHistogram(name)
+            return self.histograms[name]
+
+    def observe(self, name: str, duration_ms: float):
+        self.histogram(name).observe(duration_ms)
+
+    @contextmanager
+    def stage(self, name: str):
+        start_ns = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.observe(name, (time.perf_counter_ns() - start_ns) / 1e6)
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: hist.to_dict() for name, hist in self.histograms.items()}
+
+    def to_json(self, indent: int = 2) -> str:
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def to_prometheus(self, metric: str = "food_search_stage_latency_seconds") -> str:
+        """Render every histogram in the Prometheus text exposition format"""
+        lines = [
+            f"# HELP {metric} Duration of each food search stage.",
+            f"# TYPE {metric} histogram",
+        ]
+        for name, hist in self.histograms.items():
+            cumulative = 0
+            for bound, bucket_count in zip(hist.buckets_ms, hist.bucket_counts):
+                cumulative += bucket_count
+                lines.append(
+                    f'{metric}_bucket{{stage="{name}",le="{bound / 1000:g}"}} {cumulative}'
+                )
+            lines.append(f'{metric}_bucket{{stage="{name}",le="+Inf"}} {hist.count}')
+            lines.append(f'{metric}_sum{{stage="{name}"}} {hist.total_ms / 1000:.9f}')
+            lines.append(f'{metric}_count{{stage="{name}"}} {hist.count}')
+        return "\n".join(lines) + "\n"
+
+
+# Create a recorder instance
+latency_recorder = LatencyRecorder()
+
+
+def stage_timer(name: str):
+    """Context manager that records the duration of a search stage"""
+    return latency_recorder.stage(name)
+
+
+def format_latency_breakdown(
+    stages: List[str] = None, histograms: Dict[str, Dict[str, Any]] = None
+) -> str:
+    """Table of last, mean and tail latency for each recorded stage.
+
+    histograms is a LatencyRecorder.to_dict() snapshot, such as the search
+    service's /stats "latency"; by default this process's recorder is used.
+    """
+    if histograms is None:
+        histograms = latency_recorder.to_dict()
+    names = [name for name in (stages or SEARCH_STAGES) if name in histograms]
+    names += [name for name in histograms if name not in names and not stages]
+    if not names:
+        return "No latency recorded yet."
+
+    lines = [
+        f"{'stage':<10} {'last':>9} {'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'count':>7}",
+    ]
+    for name in names:
+        hist = histograms[name]
+        lines.append(
+            f"{name:<10} {hist['last_ms']:>7.2f}ms {hist['mean_ms']:>7.2f}ms "
+            f"{hist['p50_ms']:>7.2f}ms {hist['p95_ms']:>7.2f}ms "
+            f"{hist['p99_ms']:>7.2f}ms {hist['count']:>7}"
+        )
+    return "\n".join(lines)
@@ -9,19 +9,26 @@ def main():
     try:
         print("🍽️  Interactive Food Recommendation System")
         print("=" * 50)
-        print("Loading food database...")
-
-        # Load food data from file
-        global food_items
-        food_items = load_food_data("files/FoodDataSet.json")
-        print(f"✅ Loaded {len(food_items)} food items successfully")
-
-        # Create and populate search collection
-        collection = create_similarity_search_collection(
-            "interactive_food_search",
-            {"description": "A collection for interactive food search"},
-        )
-        populate_similarity_collection(collection, food_items)
+        # Use the shared search service when one is running
+        collection = connect_search_service()
+        if collection is None:
+            print("Loading food database...")
+
+            # Load the embedding model in the background while the dataset loads
+            registry.warmup(EMBEDDING_MODEL_NAME)
+
+            # Load food data from file
+            global food_items
+            food_items = load_food_data("files/FoodDataSet.json")
+            print(f"✅ Loaded {len(food_items)} food items successfully")
+
+            # Create and populate search collection
+            collection = prepare_food_collection(
+                "interactive_food_search",
+                {"description": "A collection for interactive food search"},
+                food_items,
+                data_path="files/FoodDataSet.json",
+            )
 
         # Start interactive chatbot
         interactive_food_chatbot(collection)
@@ -38,6 +45,7 @@ def interactive_food_chatbot(collection):
     print("Commands:")
     print("  • Type any food name or description to search")
     print("  • 'help' - Show available commands")
+    print("  • 'latency' - Show search latency breakdown")
     print("  • 'quit' or 'exit' - Exit the system")
     print("  • Ctrl+C - Emergency exit")
     print("-" * 50)
@@ -54,6 +62,26 @@ def interactive_food_chatbot(collection):
 
             # Handle exit commands
             if user_input.lower() in ["quit", "exit", "q"]:
+                # In thin-client mode the searches ran in the search service
+                search_stats = get_collection_search_stats(collection)
+                if search_stats is not None:
+                    source = (
+                        " (search service)"
+                        if isinstance(collection, RemoteCollection)
+                        else ""
+                    )
+                    cache_stats = search_stats["query_embedding_cache"]
+                    print(
+                        f"\n📈 Query cache hit rate{source}: "
+                        f"{cache_stats['hit_rate']*100:.1f}% "
+                        f"({cache_stats['memory_hits'] + cache_stats['disk_hits']} hits, "
+                        f"{cache_stats['misses']} misses)"
+                    )
+                    hybrid_stats = search_stats["hybrid_search"]
+                    print(
+                        f"⚡ Lexical fast path: {hybrid_stats['fast_path_rate']*100:.1f}% "
+                        f"of searches skipped the embedding model"
+                    )
                 print("\n👋 Thank you for using the Food Recommendation System!")
                 print("   Goodbye!")
                 break
@@ -62,6 +90,10 @@ def interactive_food_chatbot(collection):
             elif user_input.lower() in ["help", "h"]:
                 show_help_menu()
 
+            # Show per-stage search latency
+            elif user_input.lower() in ["latency", "stats"]:
+                show_latency_breakdown(collection)
+
             # Handle food search
             else:
                 handle_food_search(collection, user_input)
@@ -85,6 +117,7 @@ def show_help_menu():
     print("  • 'low calorie' - Find lower-calorie options")
     print("\nCommands:")
     print("  • 'help' - Show this help menu")
+    print("  • 'latency' - Show search latency breakdown")
     print("  • 'quit' - Exit the system")
 
 
@@ -93,8 +126,8 @@ def handle_food_search(collection, query):
     print(f"\n🔍 Searching for '{query}'...")
     print("   Please wait...")
 
-    # Perform similarity search
-    results = perform_similarity_search(collection, query, 5)
+    # Exact dish and ingredient names are answered from the BM25 index alone
+    results = perform_hybrid_search(collection, query, 5)
 
     if not results:
         print("❌ No matching foods found.")
@@ -109,8 +142,8 @@ def handle_food_search(collection, query):
     print("=" * 60)
 
     for i, result in enumerate(results, 1):
-        # Calculate percentage score
-        percentage_score = result["similarity_score"] * 100
+        # Hybrid results rank by fused score but show how well they match
+        percentage_score = result.get("match_score", result["similarity_score"]) * 100
 
         print(f"\n{i}. 🍽️  {result['food_name']}")
         print(f"   📊 Match Score: {percentage_score:.1f}%")
@@ -124,10 +157,29 @@ def handle_food_search(collection, query):
 
     print("=" * 60)
 
+    if SHOW_LATENCY:
+        show_latency_breakdown(collection, title=False)
+
     # Provide suggestions for further exploration
     suggest_related_searches(results)
 
 
+def show_latency_breakdown(collection, title: bool = True):
+    """Print the per-stage latency of wherever collection's searches run"""
+    if isinstance(collection, RemoteCollection):
+        # In thin-client mode the searches are timed by the search service
+        search_stats = get_collection_search_stats(collection)
+        if search_stats is None:
+            return
+        if title:
+            print("\n⏱️  Search latency breakdown (search service):")
+        print(format_latency_breakdown(histograms=search_stats["latency"]))
+    else:
+        if title:
+            print("\n⏱️  Search latency breakdown:")
+        print(format_latency_breakdown())
+
+
 def suggest_related_searches(results):
     """Suggest related searches based on current results"""
     if not results:
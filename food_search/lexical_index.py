@@ -0,0 +1,201 @@
+"""
+In-memory BM25 index over food names, ingredients and descriptions.
+
+Built alongside the metadata index when a collection is populated. Names and
+ingredients count more than descriptions (term frequencies are weighted per
+field), and the index remembers which items contain a term in their name or
+ingredients, so a query such as "salmon" or "Apple Pie" can be recognized as
+a confident lexical match and answered without running the embedding model.
+"""
+
+import re
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Term frequency weight of each indexed field
+FIELD_WEIGHTS = {"name": 3.0, "ingredients": 2.0, "description": 1.0}
+
+STOPWORDS = frozenset(
+    "a an and are as at for from in is it of on or the to with".split()
+)
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords, with a plural "s" stripped"""
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(str(text).lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def _normalize_name(text: str) -> str:
+    return " ".join(tokenize(text))
+
+
+class BM25Index:
+    """Okapi BM25 inverted index with per-field term weights.
+
+    Add items with add() and call finalize() once, or pass ids and food_items
+    to the constructor to do both.
+    """
+
+    def __init__(
+        self,
+        ids: List[str] = None,
+        food_items: Iterable[Dict] = None,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ):
+        self.k1 = k1
+        self.b = b
+        self.ids = []
+        self._term_frequencies = {}
+        self._strong_positions = {}
+        self._name_positions = {}
+        self._lengths = []
+
+        if ids is not None:
+            for item_id, food in zip(ids, food_items):
+                self.add(item_id, food)
+            self.finalize()
+
+    def add(self, item_id: str, food: Dict):
+        """Record one item; call finalize() once every item has been added"""
+        position = len(self.ids)
+        self.ids.append(item_id)
+
+        fields = {
+            "name": food.get("food_name", ""),
+            "ingredients": " ".join(food.get("food_ingredients", [])),
+            "description": food.get("food_description", ""),
+        }
+        length = 0.0
+        for field, text in fields.items():
+            weight = FIELD_WEIGHTS[field]
+            for term in tokenize(text):
+                frequencies = self._term_frequencies.setdefault(term, {})
+                frequencies[position] = frequencies.get(position, 0.0) + weight
+                length += weight
+                if field != "description":
+                    self._strong_positions.setdefault(term, set()).add(position)
+        self._lengths.append(length)
+
+        name = _normalize_name(fields["name"])
+        if name:
+            self._name_positions.setdefault(name, []).append(position)
+
+    def finalize(self):
+        """Convert the accumulated postings into arrays and compute IDF"""
+        size = len(self.ids)
+        self.lengths = np.array(self._lengths, dtype=np.float32)
+        self.average_length = float(self.lengths.mean()) if size else 0.0
+
+        self.postings = {}
+        self.idf = {}
+        for term, frequencies in self._term_frequencies.items():
+            positions = np.fromiter(frequencies.keys(), dtype=np.int64)
+            order = np.argsort(positions)
+            tfs = np.fromiter(frequencies.values(), dtype=np.float32)
+            self.postings[term] = (positions[order], tfs[order])
+            document_frequency = len(positions)
+            self.idf[term] = float(
+                np.log(
+                    1 + (size - document_frequency + 0.5) / (document_frequency + 0.5)
+                )
+            )
+
+        self.strong_postings = {
+            term: np.array(sorted(positions), dtype=np.int64)
+            for term, positions in self._strong_positions.items()
+        }
+        self.name_positions = self._name_positions
+
+        # The accumulators are no longer needed once the arrays exist
+        self._term_frequencies = {}
+        self._strong_positions = {}
+        self._lengths = []
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every item for query"""
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        if not self.ids:
+            return scores
+        for term in set(tokenize(query)):
+            if term not in self.postings:
+                continue
+            positions, tfs = self.postings[term]
+            norms = self.k1 * (
+                1 - self.b + self.b * self.lengths[positions] / self.average_length
+            )
+            scores[positions] += self.idf[term] * tfs * (self.k1 + 1) / (tfs + norms)
+        return scores
+
+    def search(self, query: str, n_results: int = 10) -> List[Tuple[str, float]]:
+        """Top n_results (id, score) pairs with a positive score, best first"""
+        scores = self.scores(query)
+        matched = np.flatnonzero(scores > 0)
+        if not len(matched):
+            return []
+        best = matched[np.argsort(-scores[matched], kind="stable")[:n_results]]
+        return [(self.ids[position], float(scores[position])) for position in best]
+
+    def strong_match_positions(self, query: str) -> np.ndarray:
+        """Items whose name or ingredients contain every query term"""
+        terms = set(tokenize(query))
+        if not terms:
+            return np.zeros(0, dtype=np.int64)
+        positions = None
+        for term in terms:
+            postings = self.strong_postings.get(term)
+            if postings is None:
+                return np.zeros(0, dtype=np.int64)
+            positions = (
+                postings if positions is None else np.intersect1d(positions, postings)
+            )
+        return positions
+
+    def confident_search(
+        self, query: str, n_results: int = 10
+    ) -> Optional[List[Tuple[str, float]]]:
+        """Lexical results when the match is confident enough to skip embedding.
+
+        The match is confident when the query is exactly a food name, or when
+        at least n_results items contain every query term in their name or
+        ingredients. Returns None otherwise.
+        """
+        scores = self.scores(query)
+        exact = self.name_positions.get(_normalize_name(query), [])
+        strong = self.strong_match_positions(query)
+        if not exact and len(strong) < n_results:
+            return None
+
+        # Exact name matches first, then name/ingredient matches, then the rest
+        ranked = np.argsort(-scores, kind="stable")
+        ranked = ranked[scores[ranked] > 0].tolist()
+        strong = set(strong.tolist())
+        order = list(exact) + [p for p in ranked if p in strong]
+        order += [p for p in ranked if p not in strong]
+        return [
+            (self.ids[position], float(scores[position]))
+            for position in list(dict.fromkeys(order))[:n_results]
+        ]
+
+
+def reciprocal_rank_fusion(
+    rankings: List[List[str]], k: int = 60
+) -> List[Tuple[str, float]]:
+    """Fuse ranked id lists by summing 1 / (k + rank); best first"""
+    fused = {}
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, 1):
+            fused[item_id] = fused.get(item_id, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda pair: pair[1], reverse=True)
@@ -0,0 +1,194 @@
+"""
+Shared watsonx.ai inference client for the food_search chatbots.
+
+One WatsonxInferenceClient per process wraps a single ModelInference:
+
+- the ModelInference is created on first use, not at import, and creation
+  is guarded so concurrent first calls build it once
+- it keeps its HTTP connection alive (persistent_connection=True), so every
+  call after the first reuses the same connection
+- start_health_check() checks the model in the background with a metadata
+  request (the model's details) instead of a generation, so a CLI reaches
+  its first prompt without waiting on the remote model
+- every call's latency is recorded per client and, as the "llm_call" stage,
+  in the shared latency recorder
+
+Chatbot answers already fall back to search-only responses when a call
+fails, so a failed health check is reported rather than fatal.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator
+
+from instrumentation import LatencyHistogram, latency_recorder
+
+LLM_MODEL_ID = os.getenv("FOOD_SEARCH_LLM_MODEL_ID", "ibm/granite-3-3-8b-instruct")
+LLM_GENERATION_PARAMS = {"max_new_tokens": 400}
+
+
+class WatsonxInferenceClient:
+    """Lazily created, keep-alive ModelInference with per-call latency"""
+
+    def __init__(
+        self,
+        model_id: str = LLM_MODEL_ID,
+        params: Dict[str, Any] = None,
+        credentials: Dict[str, str] = None,
+        project_id: str = None,
+    ):
+        self.model_id = model_id
+        self.params = params if params is not None else dict(LLM_GENERATION_PARAMS)
+        self.credentials = credentials
+        self.project_id = project_id
+        self.latency = LatencyHistogram("llm_call")
+        self.errors = 0
+        self.health = {"status": "unchecked"}
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        """The ModelInference, created on first use"""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = self._create_model()
+        return self._model
+
+    def _create_model(self):
+        from ibm_watsonx_ai.foundation_models import ModelInference
+
+        credentials, project_id = self.credentials, self.project_id
+        if credentials is None:
+            from utils.config import config
+
+            credentials = {"url": config.WATSON_URL, "apikey": config.OPENAI_API_KEY}
+            project_id = project_id or config.PROJECT_ID
+
+        return ModelInference(
+            model_id=self.model_id,
+            params=self.params,
+            credentials=credentials,
+            project_id=project_id,
+            persistent_connection=True,
+        )
+
+    def _observe(self, started: float):
+        duration_ms = (time.perf_counter() - started) * 1000
+        self.latency.observe(duration_ms)
+        latency_recorder.observe("llm_call", duration_ms)
+
+    def generate(self, prompt: str, params: Dict[str, Any] = None) -> Dict:
+        started = time.perf_counter()
+        try:
+            return self.model.generate(prompt=prompt, params=params)
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self._observe(started)
+
+    def generate_text_stream(
+        self, prompt: str, params: Dict[str, Any] = None, raw_response: bool = False
+    ) -> Iterator:
+        """Stream chunks; the call's latency runs until the stream ends"""
+        started = time.perf_counter()
+        try:
+            yield from self.model.generate_text_stream(
+                prompt=prompt, params=params, raw_response=raw_response
+            )
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self._observe(started)
+
+    async def agenerate(
+        self, prompt: str, params: Dict[str, Any] = None, executor=None
+    ) -> Dict:
+        """generate() for asyncio: the SDK's async API, else a worker thread"""
+        loop = asyncio.get_running_loop()
+        # Creating the client authenticates, so keep it off the event loop
+        model = await loop.run_in_executor(executor, lambda: self.model)
+        started = time.perf_counter()
+        try:
+            if hasattr(model, "agenerate"):
+                return await model.agenerate(prompt=prompt, params=params)
+            return await loop.run_in_executor(
+                executor, lambda: model.generate(prompt=prompt, params=params)
+            )
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self._observe(started)
+
+    def check_health(self) -> Dict[str, Any]:
+        """Fetch the model's details: a metadata call, no tokens generated"""
+        started = time.perf_counter()
+        try:
+            details = self.model.get_details()
+            self.health = {
+                "status": "ok",
+                "model_id": details.get("model_id", self.model_id),
+            }
+        except Exception as e:
+            self.health = {"status": "error", "error": str(e)}
+        self.health["latency_ms"] = (time.perf_counter() - started) * 1000
+        return self.health
+
+    def start_health_check(self) -> threading.Thread:
+        """Create the client and check the model on a background thread"""
+
+        def check():
+            health = self.check_health()
+            if health["status"] != "ok":
+                print(f"\n❌ LLM connection failed: {health['error']}")
+                print("   Answers will use search results only until it recovers.")
+
+        self.health = {"status": "checking"}
+        thread = threading.Thread(target=check, name="llm-health", daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "model_id": self.model_id,
+            "connected": self._model is not None,
+            "health": dict(self.health),
+            "calls": self.latency.count,
+            "errors": self.errors,
+            "latency": self.latency.to_dict(),
+        }
+
+
+# The process-wide client, created by get_llm_client() on first use
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_llm_client() -> WatsonxInferenceClient:
+    """The shared watsonx.ai client"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = WatsonxInferenceClient()
+    return _client
+
+
+def format_llm_client_stats(stats: Dict[str, Any]) -> str:
+    health = stats["health"]
+    latency = stats["latency"]
+    line = f"🔗 {stats['model_id']}: {health['status']}"
+    if "latency_ms" in health:
+        line += f" (health check {health['latency_ms']:.0f} ms)"
+    if stats["calls"]:
+        line += (
+            f", {stats['calls']} calls, {stats['errors']} errors, "
+            f"last {latency['last_ms']:.0f} ms, mean {latency['mean_ms']:.0f} ms, "
+            f"p95 {latency['p95_ms']:.0f} ms"
+        )
+    return line
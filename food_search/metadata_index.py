@@ -0,0 +1,170 @@
+"""
+Columnar metadata index used to narrow filtered food searches.
+
+The index is built in one pass over the food items when a collection is
+populated, either all at once or item by item while streaming. Filters are
+resolved against it to an explicit candidate set, and only those candidates
+are scored against the query vector, so selective filters never lose recall
+the way post-filtered HNSW results do.
+"""
+
+import numpy as np
+from typing import List, Dict, Iterable, Optional, Union
+
+
+def _normalize(value) -> str:
+    return " ".join(str(value).lower().split())
+
+
+def _as_list(value) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return list(value)
+
+
+class FoodMetadataIndex:
+    """Bitmaps, a sorted calorie column and an ingredient inverted index over items.
+
+    Cuisine, cooking method and ingredient lookups are case-insensitive.
+    An ingredient filter matches either a whole ingredient ("olive oil") or any
+    word within one ("cheese" matches "Parmesan cheese").
+    """
+
+    def __init__(self, ids: List[str] = None, food_items: Iterable[Dict] = None):
+        self.ids = []
+        self._cuisine_positions = {}
+        self._method_positions = {}
+        self._ingredient_positions = {}
+        self._calories = []
+
+        if ids is not None:
+            for item_id, food in zip(ids, food_items):
+                self.add(item_id, food)
+            self.finalize()
+
+    def add(self, item_id: str, food: Dict):
+        """Record one item; call finalize() once every item has been added"""
+        position = len(self.ids)
+        self.ids.append(item_id)
+
+        cuisine = _normalize(food.get("cuisine_type", "Unknown"))
+        self._cuisine_positions.setdefault(cuisine, []).append(position)
+
+        method = _normalize(food.get("cooking_method", ""))
+        if method:
+            self._method_positions.setdefault(method, []).append(position)
+
+        for ingredient in food.get("food_ingredients", []):
+            ingredient = _normalize(ingredient)
+            for term in {ingredient, *ingredient.split()}:
+                self._ingredient_positions.setdefault(term, set()).add(position)
+
+        calorie_value = food.get("food_calories_per_serving", 0)
+        self._calories.append(
+            calorie_value if isinstance(calorie_value, (int, float)) else 0
+        )
+
+    def finalize(self):
+        """Convert the accumulated positions into bitmaps and sorted arrays"""
+        size = len(self.ids)
+        calories = np.array(self._calories, dtype=np.float64)
+
+        self.cuisine_bitmaps = self._bitmaps(self._cuisine_positions, size)
+        self.cooking_method_bitmaps = self._bitmaps(self._method_positions, size)
+        self.ingredient_postings = {
+            term: np.array(sorted(positions), dtype=np.int64)
+            for term, positions in self._ingredient_positions.items()
+        }
+        self.calorie_order = np.argsort(calories, kind="stable")
+        self.sorted_calories = calories[self.calorie_order]
+
+        # The accumulators are no longer needed once the columns exist
+        self._cuisine_positions = {}
+        self._method_positions = {}
+        self._ingredient_positions = {}
+        self._calories = []
+
+    @staticmethod
+    def _bitmaps(positions_by_value: Dict[str, List[int]], size: int):
+        bitmaps = {}
+        for value, positions in positions_by_value.items():
+            bitmap = np.zeros(size, dtype=bool)
+            bitmap[positions] = True
+            bitmaps[value] = bitmap
+        return bitmaps
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _any_of(self, bitmaps: Dict[str, np.ndarray], values) -> np.ndarray:
+        mask = np.zeros(len(self.ids), dtype=bool)
+        for value in values:
+            bitmap = bitmaps.get(_normalize(value))
+            if bitmap is not None:
+                mask |= bitmap
+        return mask
+
+    def _ingredient_mask(self, ingredient: str) -> np.ndarray:
+        mask = np.zeros(len(self.ids), dtype=bool)
+        postings = self.ingredient_postings.get(_normalize(ingredient))
+        if postings is not None:
+            mask[postings] = True
+        return mask
+
+    def calorie_range_mask(
+        self, min_calories: float = None, max_calories: float = None
+    ) -> np.ndarray:
+        """Items whose calories fall in [min_calories, max_calories]"""
+        low = 0
+        high = len(self.sorted_calories)
+        if min_calories is not None:
+            low = np.searchsorted(self.sorted_calories, min_calories, side="left")
+        if max_calories is not None:
+            high = np.searchsorted(self.sorted_calories, max_calories, side="right")
+
+        mask = np.zeros(len(self.ids), dtype=bool)
+        mask[self.calorie_order[low:high]] = True
+        return mask
+
+    def candidate_mask(
+        self,
+        cuisine_filter: Union[str, List[str]] = None,
+        max_calories: float = None,
+        min_calories: float = None,
+        cooking_method: Union[str, List[str]] = None,
+        include_ingredients: List[str] = None,
+        exclude_ingredients: List[str] = None,
+    ) -> Optional[np.ndarray]:
+        """Boolean mask of items passing every filter, or None when nothing filters"""
+        mask = None
+
+        def narrow(current, new_mask):
+            return new_mask if current is None else current & new_mask
+
+        cuisines = _as_list(cuisine_filter)
+        if cuisines:
+            mask = narrow(mask, self._any_of(self.cuisine_bitmaps, cuisines))
+
+        methods = _as_list(cooking_method)
+        if methods:
+            mask = narrow(mask, self._any_of(self.cooking_method_bitmaps, methods))
+
+        if min_calories is not None or max_calories is not None:
+            mask = narrow(mask, self.calorie_range_mask(min_calories, max_calories))
+
+        for ingredient in _as_list(include_ingredients):
+            mask = narrow(mask, self._ingredient_mask(ingredient))
+
+        for ingredient in _as_list(exclude_ingredients):
+            mask = narrow(mask, ~self._ingredient_mask(ingredient))
+
+        return mask
+
+    def candidate_ids(self, **filters) -> Optional[List[str]]:
+        """IDs of items passing every filter, or None when nothing filters"""
+        mask = self.candidate_mask(**filters)
+        if mask is None:
+            return None
+        return [self.ids[position] for position in np.flatnonzero(mask)]
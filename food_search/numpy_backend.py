@@ -0,0 +1,429 @@
+"""
+Exact cosine search over a contiguous NumPy embedding matrix.
+
+NumpyCollection mirrors the parts of the ChromaDB collection API that the
+food search tools use (add, upsert, update, delete, get, count, query), so it
+can be passed anywhere a Chroma collection is expected. Queries score every
+candidate with one matrix product and pick the top k with argpartition, which
+for catalogs of up to a few hundred thousand items is both faster and more
+accurate than an approximate HNSW index.
+"""
+
+import numpy as np
+from typing import List, Dict, Any, Optional
+
+# Comparison operators supported in where clauses
+NUMERIC_OPERATORS = {
+    "$gt": np.greater,
+    "$gte": np.greater_equal,
+    "$lt": np.less,
+    "$lte": np.less_equal,
+}
+
+
+def normalize_rows(vectors) -> np.ndarray:
+    """Return float32 copies of the vectors scaled to unit length"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors.reshape(1, -1)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first"""
+    if k >= len(scores):
+        return np.argsort(-scores, kind="stable")
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+def score_candidates(
+    query_embeddings,
+    candidate_embeddings,
+    n_results: int,
+    candidates_normalized: bool = False,
+):
+    """Exact top-k cosine search of each query over the candidate embeddings.
+
+    Returns one (candidate_indices, cosine_distances) pair per query, best
+    first.
+    """
+    queries = normalize_rows(query_embeddings)
+    if len(candidate_embeddings) == 0:
+        return [(np.zeros(0, dtype=np.int64), []) for _ in queries]
+    if not candidates_normalized:
+        candidate_embeddings = normalize_rows(candidate_embeddings)
+
+    # One matrix product scores every query against every candidate
+    scores = queries @ candidate_embeddings.T
+    ranked = []
+    for query_scores in scores:
+        best = top_k_indices(query_scores, n_results)
+        # Cosine distance, matching a Chroma collection in cosine space
+        ranked.append((best, (1.0 - query_scores[best]).tolist()))
+    return ranked
+
+
+class NumpyCollection:
+    """In-memory collection that answers queries with exact cosine similarity"""
+
+    def __init__(
+        self,
+        name: str,
+        embedding_function,
+        metadata: Optional[Dict] = None,
+        initial_capacity: int = 1024,
+        store_documents: bool = True,
+    ):
+        self.name = name
+        self.metadata = metadata
+        self.configuration = {
+            "embedding_function": embedding_function,
+            "backend": "numpy",
+        }
+        self._embedding_function = embedding_function
+        self._matrix = None
+        self._initial_capacity = initial_capacity
+        self._size = 0
+        self._ids = []
+        self._rows = {}
+        self._metadatas = []
+        self._documents = []
+        self._store_documents = store_documents
+        self._columns = {}
+
+    @classmethod
+    def from_collection(
+        cls, source, embedding_function, page_size: int = 1000, **options
+    ):
+        """Copy ids, embeddings, metadatas and documents out of a Chroma collection"""
+        collection = cls(source.name, embedding_function, source.metadata, **options)
+        offset = 0
+        while True:
+            page = source.get(
+                include=["embeddings", "metadatas", "documents"],
+                limit=page_size,
+                offset=offset,
+            )
+            if not len(page["ids"]):
+                break
+            collection.add(
+                ids=page["ids"],
+                embeddings=page["embeddings"],
+                metadatas=page["metadatas"],
+                documents=page["documents"],
+            )
+            offset += len(page["ids"])
+        return collection
+
+    def attach_embeddings(
+        self,
+        ids: List[str],
+        embeddings: np.ndarray,
+        metadatas: List[Dict] = None,
+        documents: List[str] = None,
+    ):
+        """Use a normalized float32 matrix as storage without copying it.
+
+        Meant for read-only memory maps of prebuilt embeddings; the matrix is
+        copied only if the collection is written to later.
+        """
+        if self._size:
+            raise ValueError("Embeddings can only be attached to an empty collection")
+        ids = list(ids)
+        if len(embeddings) != len(ids) or embeddings.dtype != np.float32:
+            raise ValueError("Attached embeddings must be float32, one row per id")
+
+        self._matrix = embeddings
+        self._size = len(ids)
+        self._ids = ids
+        self._rows = {item_id: row for row, item_id in enumerate(ids)}
+        self._metadatas = list(metadatas or [{} for _ in ids])
+        if documents and self._store_documents:
+            self._documents = list(documents)
+        else:
+            self._documents = ["" for _ in ids]
+        self._columns.clear()
+
+    @property
+    def embeddings(self) -> np.ndarray:
+        """Normalized float32 embedding matrix, one row per item"""
+        if self._matrix is None:
+            return np.zeros((0, 0), dtype=np.float32)
+        return self._matrix[: self._size]
+
+    def count(self) -> int:
+        return self._size
+
+    def _embed(self, documents, embeddings):
+        if embeddings is None:
+            if documents is None:
+                raise ValueError("Either documents or embeddings must be provided")
+            embeddings = self._embedding_function(list(documents))
+        return normalize_rows(embeddings)
+
+    def _allocate(self, capacity: int, dimensions: int) -> np.ndarray:
+        return np.zeros((capacity, dimensions), dtype=np.float32)
+
+    def _ensure_writable(self):
+        """Copy an attached read-only matrix before the first write to it"""
+        if self._matrix is not None and not self._matrix.flags.writeable:
+            writable = self._allocate(len(self._matrix), self._matrix.shape[1])
+            writable[: self._size] = self._matrix[: self._size]
+            self._matrix = writable
+
+    def _reserve(self, rows_needed: int, dimensions: int):
+        self._ensure_writable()
+        if self._matrix is None:
+            capacity = max(self._initial_capacity, rows_needed)
+            self._matrix = self._allocate(capacity, dimensions)
+        elif self._matrix.shape[1] != dimensions:
+            raise ValueError(
+                f"Embedding dimension {dimensions} does not match "
+                f"collection dimension {self._matrix.shape[1]}"
+            )
+        elif rows_needed > len(self._matrix):
+            # Grow geometrically so repeated adds stay amortized O(1) per row
+            capacity = max(rows_needed, 2 * len(self._matrix))
+            grown = self._allocate(capacity, dimensions)
+            grown[: self._size] = self._matrix[: self._size]
+            self._matrix = grown
+
+    def add(
+        self,
+        ids: List[str],
+        documents: List[str] = None,
+        metadatas: List[Dict] = None,
+        embeddings=None,
+    ):
+        ids = list(ids)
+        duplicates = [item_id for item_id in ids if item_id in self._rows]
+        if duplicates or len(set(ids)) != len(ids):
+            raise ValueError(f"Duplicate ids in add: {duplicates[:5]}")
+        if not ids:
+            return
+
+        vectors = self._embed(documents, embeddings)
+        self._reserve(self._size + len(ids), vectors.shape[1])
+
+        start = self._size
+        self._matrix[start : start + len(ids)] = vectors
+        for offset, item_id in enumerate(ids):
+            self._rows[item_id] = start + offset
+        self._ids.extend(ids)
+        self._metadatas.extend(metadatas or [{} for _ in ids])
+        if documents and self._store_documents:
+            self._documents.extend(documents)
+        else:
+            self._documents.extend("" for _ in ids)
+        self._size += len(ids)
+        self._columns.clear()
+
+    def update(
+        self,
+        ids: List[str],
+        documents: List[str] = None,
+        metadatas: List[Dict] = None,
+        embeddings=None,
+    ):
+        ids = list(ids)
+        missing = [item_id for item_id in ids if item_id not in self._rows]
+        if missing:
+            raise ValueError(f"Unknown ids in update: {missing[:5]}")
+
+        rows = [self._rows[item_id] for item_id in ids]
+        if documents is not None or embeddings is not None:
+            self._ensure_writable()
+            self._matrix[rows] = self._embed(documents, embeddings)
+        for i, row in enumerate(rows):
+            if metadatas is not None:
+                self._metadatas[row] = metadatas[i]
+            if documents is not None and self._store_documents:
+                self._documents[row] = documents[i]
+        self._columns.clear()
+
+    def upsert(
+        self,
+        ids: List[str],
+        documents: List[str] = None,
+        metadatas: List[Dict] = None,
+        embeddings=None,
+    ):
+        ids = list(ids)
+        vectors = self._embed(documents, embeddings)
+        existing = [i for i, item_id in enumerate(ids) if item_id in self._rows]
+        new = [i for i, item_id in enumerate(ids) if item_id not in self._rows]
+
+        for positions, write in ((existing, self.update), (new, self.add)):
+            if positions:
+                write(
+                    ids=[ids[i] for i in positions],
+                    documents=[documents[i] for i in positions] if documents else None,
+                    metadatas=[metadatas[i] for i in positions] if metadatas else None,
+                    embeddings=vectors[positions],
+                )
+
+    def delete(self, ids: List[str] = None, where: Optional[Dict] = None):
+        if where is not None:
+            ids = list(ids or []) + self.get(where=where, include=[])["ids"]
+        self._ensure_writable()
+        for item_id in ids or []:
+            row = self._rows.pop(item_id, None)
+            if row is None:
+                continue
+
+            # Move the last row into the freed slot to keep the matrix contiguous
+            last = self._size - 1
+            if row != last:
+                moved_id = self._ids[last]
+                self._matrix[row] = self._matrix[last]
+                self._ids[row] = moved_id
+                self._metadatas[row] = self._metadatas[last]
+                self._documents[row] = self._documents[last]
+                self._rows[moved_id] = row
+            self._ids.pop()
+            self._metadatas.pop()
+            self._documents.pop()
+            self._size -= 1
+        self._columns.clear()
+
+    def _column(self, key: str) -> np.ndarray:
+        """Metadata values for key as an array, cached until the next write"""
+        if key not in self._columns:
+            self._columns[key] = np.array(
+                [metadata.get(key) for metadata in self._metadatas], dtype=object
+            )
+        return self._columns[key]
+
+    def where_mask(self, where: Optional[Dict]) -> np.ndarray:
+        """Evaluate a Chroma-style where clause as a boolean mask over rows"""
+        if not where:
+            return np.ones(self._size, dtype=bool)
+
+        mask = np.ones(self._size, dtype=bool)
+        for key, condition in where.items():
+            if key == "$and":
+                for clause in condition:
+                    mask &= self.where_mask(clause)
+            elif key == "$or":
+                any_mask = np.zeros(self._size, dtype=bool)
+                for clause in condition:
+                    any_mask |= self.where_mask(clause)
+                mask &= any_mask
+            elif isinstance(condition, dict):
+                for operator, value in condition.items():
+                    mask &= self._compare(key, operator, value)
+            else:
+                mask &= self._compare(key, "$eq", condition)
+        return mask
+
+    def _compare(self, key: str, operator: str, value) -> np.ndarray:
+        column = self._column(key)
+        if operator == "$eq":
+            return column == value
+        if operator == "$ne":
+            return column != value
+        if operator == "$in":
+            return np.isin(column, list(value))
+        if operator == "$nin":
+            return ~np.isin(column, list(value))
+        if operator in NUMERIC_OPERATORS:
+            present = np.array(
+                [
+                    isinstance(v, (int, float)) and not isinstance(v, bool)
+                    for v in column
+                ],
+                dtype=bool,
+            )
+            numeric = np.where(present, column, 0).astype(np.float64)
+            return present & NUMERIC_OPERATORS[operator](numeric, value)
+        raise ValueError(f"Unsupported where operator: {operator}")
+
+    def get(
+        self,
+        ids: List[str] = None,
+        where: Optional[Dict] = None,
+        limit: int = None,
+        offset: int = None,
+        include: List[str] = ["metadatas", "documents"],
+    ) -> Dict[str, Any]:
+        if ids is not None:
+            rows = [self._rows[item_id] for item_id in ids if item_id in self._rows]
+            rows = np.array(rows, dtype=np.int64)
+            if where:
+                rows = rows[self.where_mask(where)[rows]]
+        else:
+            rows = np.flatnonzero(self.where_mask(where))
+
+        start = offset or 0
+        rows = rows[start : start + limit] if limit is not None else rows[start:]
+        return self._rows_to_result(rows, include)
+
+    def _rows_to_result(self, rows, include) -> Dict[str, Any]:
+        result = {"ids": [self._ids[row] for row in rows]}
+        result["metadatas"] = (
+            [self._metadatas[row] for row in rows] if "metadatas" in include else None
+        )
+        result["documents"] = (
+            [self._documents[row] for row in rows] if "documents" in include else None
+        )
+        result["embeddings"] = (
+            self.embeddings[rows] if "embeddings" in include else None
+        )
+        return result
+
+    def query(
+        self,
+        query_embeddings=None,
+        query_texts: List[str] = None,
+        n_results: int = 10,
+        where: Optional[Dict] = None,
+        ids: List[str] = None,
+        include: List[str] = ["metadatas", "documents", "distances"],
+    ) -> Dict[str, Any]:
+        if query_embeddings is None:
+            query_embeddings = self._embedding_function(list(query_texts))
+
+        # Restrict scoring to rows that pass the id and metadata filters
+        if ids is not None or where:
+            if ids is not None:
+                candidate_rows = np.array(
+                    [self._rows[item_id] for item_id in ids if item_id in self._rows],
+                    dtype=np.int64,
+                )
+            else:
+                candidate_rows = np.arange(self._size)
+            if where:
+                candidate_rows = candidate_rows[self.where_mask(where)[candidate_rows]]
+        else:
+            candidate_rows = None
+
+        results = {"ids": [], "distances": [], "metadatas": [], "documents": []}
+        for rows, distances in self._rank(query_embeddings, candidate_rows, n_results):
+            row_result = self._rows_to_result(rows, include)
+            results["ids"].append(row_result["ids"])
+            results["metadatas"].append(row_result["metadatas"])
+            results["documents"].append(row_result["documents"])
+            results["distances"].append(distances)
+        return results
+
+    def _rank(self, query_embeddings, candidate_rows, n_results: int):
+        """(rows, cosine distances) of the best candidate rows for each query.
+
+        candidate_rows None means every row is a candidate.
+        """
+        candidates = (
+            self.embeddings
+            if candidate_rows is None
+            else self.embeddings[candidate_rows]
+        )
+        ranked = []
+        for best, distances in score_candidates(
+            query_embeddings, candidates, n_results, candidates_normalized=True
+        ):
+            ranked.append(
+                (best if candidate_rows is None else candidate_rows[best], distances)
+            )
+        return ranked
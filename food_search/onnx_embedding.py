@@ -0,0 +1,212 @@
+"""
+ONNX Runtime embedding backend for the food search tools.
+
+The sentence-transformers model is exported to ONNX once, quantized to int8
+with ONNX Runtime dynamic quantization, and cached on disk (FOOD_SEARCH_ONNX_DIR,
+one directory per model). OnnxEmbeddingFunction then embeds with ONNX Runtime
+alone: the fast tokenizer, one session run per batch, mean pooling over the
+attention mask and L2 normalization, matching the all-MiniLM-L6-v2 pipeline.
+It is a drop-in Chroma embedding function, and the registry hands it out when
+FOOD_SEARCH_EMBEDDING_BACKEND is "onnx-int8" (or "onnx" for the unquantized
+export).
+
+Exporting needs torch, sentence-transformers and onnx; embedding only needs
+onnxruntime and tokenizers.
+"""
+
+import json
+import os
+import numpy as np
+from typing import Any, Dict
+
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings, Space
+from chromadb.utils.embedding_functions import register_embedding_function
+
+ONNX_CACHE_DIR = os.getenv(
+    "FOOD_SEARCH_ONNX_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "food_search", "onnx"),
+)
+FP32_MODEL_FILE = "model.onnx"
+INT8_MODEL_FILE = "model_int8.onnx"
+EXPORT_CONFIG_FILE = "export_config.json"
+ONNX_OPSET = 17
+ONNX_BATCH_SIZE = 32
+
+
+def model_directory(model_name: str, cache_dir: str = None) -> str:
+    """Where the ONNX export of model_name is cached"""
+    safe_name = model_name.strip("/").replace("/", "__")
+    return os.path.join(cache_dir or ONNX_CACHE_DIR, safe_name)
+
+
+def export_onnx_model(model_name: str, cache_dir: str = None) -> str:
+    """Export model_name to ONNX and quantize it to int8, unless already cached.
+
+    Returns the directory holding model.onnx, model_int8.onnx, the tokenizer
+    and export_config.json.
+    """
+    directory = model_directory(model_name, cache_dir)
+    fp32_path = os.path.join(directory, FP32_MODEL_FILE)
+    int8_path = os.path.join(directory, INT8_MODEL_FILE)
+    config_path = os.path.join(directory, EXPORT_CONFIG_FILE)
+    if all(os.path.exists(path) for path in (fp32_path, int8_path, config_path)):
+        return directory
+
+    # Only exporting needs the PyTorch stack
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from sentence_transformers import SentenceTransformer
+
+    print(f"📦 Exporting {model_name} to ONNX in {directory}...")
+    os.makedirs(directory, exist_ok=True)
+    st_model = SentenceTransformer(model_name, device="cpu")
+    transformer = st_model[0].auto_model.eval()
+    tokenizer = st_model.tokenizer
+    tokenizer.save_pretrained(directory)
+
+    sample = tokenizer(["export sample text"], return_tensors="pt")
+    input_names = [
+        name
+        for name in ("input_ids", "attention_mask", "token_type_ids")
+        if name in sample
+    ]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["token_embeddings"] = {0: "batch", 1: "sequence"}
+
+    class TokenEmbeddings(torch.nn.Module):
+        """Positional ONNX inputs in, last hidden state out"""
+
+        def __init__(self):
+            super().__init__()
+            self.transformer = transformer
+
+        def forward(self, *inputs):
+            named_inputs = dict(zip(input_names, inputs))
+            return self.transformer(**named_inputs).last_hidden_state
+
+    with torch.no_grad():
+        torch.onnx.export(
+            TokenEmbeddings(),
+            tuple(sample[name] for name in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=["token_embeddings"],
+            dynamic_axes=dynamic_axes,
+            opset_version=ONNX_OPSET,
+            dynamo=False,
+        )
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+
+    module_names = [type(module).__name__ for module in st_model]
+    with open(config_path, "w", encoding="utf-8") as file:
+        json.dump(
+            {
+                "model_name": model_name,
+                "max_seq_length": st_model.max_seq_length,
+                "dimensions": transformer.config.hidden_size,
+                "normalize": "Normalize" in module_names,
+                "pad_token": tokenizer.pad_token,
+                "input_names": input_names,
+            },
+            file,
+            indent=2,
+        )
+    print(f"✅ Exported {model_name} (int8: {os.path.getsize(int8_path) / 1e6:.1f} MB)")
+    return directory
+
+
+@register_embedding_function
+class OnnxEmbeddingFunction(EmbeddingFunction[Documents]):
+    """Sentence embeddings from an ONNX Runtime session, int8 by default"""
+
+    def __init__(
+        self,
+        model_name: str = "all-MiniLM-L6-v2",
+        quantized: bool = True,
+        batch_size: int = ONNX_BATCH_SIZE,
+        threads: int = 0,
+        cache_dir: str = None,
+    ):
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        self.model_name = model_name
+        self.quantized = quantized
+        self.batch_size = batch_size
+        self.threads = threads
+        self.cache_dir = cache_dir
+
+        directory = export_onnx_model(model_name, cache_dir)
+        with open(os.path.join(directory, EXPORT_CONFIG_FILE), encoding="utf-8") as f:
+            self.export_config = json.load(f)
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(directory, "tokenizer.json"))
+        self.tokenizer.enable_truncation(self.export_config["max_seq_length"])
+        pad_token = self.export_config["pad_token"]
+        self.tokenizer.enable_padding(
+            pad_id=self.tokenizer.token_to_id(pad_token), pad_token=pad_token
+        )
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = (
+            onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        )
+        if threads:
+            options.intra_op_num_threads = threads
+        model_file = INT8_MODEL_FILE if quantized else FP32_MODEL_FILE
+        self.session = onnxruntime.InferenceSession(
+            os.path.join(directory, model_file),
+            options,
+            providers=["CPUExecutionProvider"],
+        )
+        self._input_names = [
+            model_input.name for model_input in self.session.get_inputs()
+        ]
+
+    def _embed_batch(self, texts) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(list(texts))
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        inputs = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": attention_mask,
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        [token_embeddings] = self.session.run(
+            ["token_embeddings"], {name: inputs[name] for name in self._input_names}
+        )
+
+        # Mean pooling over the real (unpadded) tokens
+        mask = attention_mask[:, :, None].astype(np.float32)
+        embeddings = (token_embeddings * mask).sum(axis=1) / np.maximum(
+            mask.sum(axis=1), 1e-9
+        )
+        if self.export_config["normalize"]:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.maximum(norms, 1e-12)
+        return embeddings.astype(np.float32)
+
+    def __call__(self, input: Documents) -> Embeddings:
+        embeddings = []
+        for start in range(0, len(input), self.batch_size):
+            embeddings.extend(self._embed_batch(input[start : start + self.batch_size]))
+        return embeddings
+
+    @staticmethod
+    def name() -> str:
+        return "food_search_onnx"
+
+    def default_space(self) -> Space:
+        return "cosine"
+
+    def get_config(self) -> Dict[str, Any]:
+        return {
+            "model_name": self.model_name,
+            "quantized": self.quantized,
+            "batch_size": self.batch_size,
+            "threads": self.threads,
+            "cache_dir": self.cache_dir,
+        }
+
+    @staticmethod
+    def build_from_config(config: Dict[str, Any]) -> "OnnxEmbeddingFunction":
+        return OnnxEmbeddingFunction(**config)
@@ -0,0 +1,157 @@
+"""
+Memory and recall report for quantized vector storage.
+
+Embeds FoodDataSet.json once, then for float16, int8 and product
+quantization reports the RAM held for vectors, recall@k of the quantized
+candidate ranking on its own and after exact rescoring, and query latency.
+Ground truth is exact float32 search over the same embeddings.
+
+Usage:
+    python food_search/quantization_report.py
+    python food_search/quantization_report.py --k 10 --rescore-depth 50 --output quantization.json
+"""
+
+import argparse
+import json
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from hnsw_tuner import build_tuning_queries
+from numpy_backend import NumpyCollection
+from quantized_backend import QUANTIZATION_SETTINGS, QuantizedCollection
+from shared_functions import (
+    EMBEDDING_MODEL_NAME,
+    load_food_data,
+    populate_similarity_collection,
+    registry,
+)
+
+
+def measure_recall(collection, query_embeddings, true_ids: List[List[str]], k: int):
+    """Mean recall@k and mean per-query latency in milliseconds"""
+    recalls = []
+    latencies_ms = []
+    for embedding, expected in zip(query_embeddings, true_ids):
+        started = time.perf_counter_ns()
+        results = collection.query(
+            query_embeddings=[embedding], n_results=k, include=[]
+        )
+        latencies_ms.append((time.perf_counter_ns() - started) / 1e6)
+        recalls.append(len(set(results["ids"][0]) & set(expected)) / len(expected))
+    return float(np.mean(recalls)), float(np.mean(latencies_ms))
+
+
+def build_report(
+    food_items: List[Dict], k: int, rescore_depth: int, sample_queries: int
+) -> Dict[str, Any]:
+    embedding_function = registry.get(EMBEDDING_MODEL_NAME)
+    exact = NumpyCollection("quantization_report", embedding_function)
+    populate_similarity_collection(exact, food_items)
+
+    query_texts = build_tuning_queries(exact, sample_queries)
+    query_embeddings = embedding_function(query_texts)
+    k = min(k, exact.count())
+    true_ids = exact.query(query_embeddings=query_embeddings, n_results=k, include=[])[
+        "ids"
+    ]
+
+    float32_bytes = exact.embeddings.nbytes
+    document_bytes = sum(
+        len(document.encode("utf-8"))
+        for document in exact.get(include=["documents"])["documents"]
+    )
+    _, exact_ms = measure_recall(exact, query_embeddings, true_ids, k)
+    settings = [
+        {
+            "quantization": "float32",
+            "vector_bytes": float32_bytes,
+            "bytes_per_vector": float32_bytes / exact.count(),
+            "compression": 1.0,
+            "document_bytes": document_bytes,
+            "recall_candidates": 1.0,
+            "recall_rescored": 1.0,
+            "mean_ms": exact_ms,
+        }
+    ]
+
+    for quantization in QUANTIZATION_SETTINGS:
+        collection = QuantizedCollection.from_collection(
+            exact, embedding_function, quantization=quantization
+        )
+        memory = collection.memory_report()
+
+        collection.rescore_depth = 0
+        recall_candidates, _ = measure_recall(collection, query_embeddings, true_ids, k)
+        collection.rescore_depth = rescore_depth
+        recall_rescored, mean_ms = measure_recall(
+            collection, query_embeddings, true_ids, k
+        )
+        settings.append(
+            {
+                "quantization": quantization,
+                "vector_bytes": memory["vector_bytes"],
+                "bytes_per_vector": memory["bytes_per_vector"],
+                "compression": memory["compression"],
+                "document_bytes": memory["document_bytes"],
+                "recall_candidates": recall_candidates,
+                "recall_rescored": recall_rescored,
+                "mean_ms": mean_ms,
+            }
+        )
+
+    return {
+        "items": exact.count(),
+        "queries": len(query_texts),
+        "k": k,
+        "rescore_depth": rescore_depth,
+        "settings": settings,
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    k = report["k"]
+    lines = [
+        f"{'storage':<8} {'bytes/vec':>9} {'vectors':>10} {'docs':>10} "
+        f"{'ratio':>6} {f'recall@{k}':>10} {'rescored':>9} {'ms/query':>9}"
+    ]
+    for setting in report["settings"]:
+        lines.append(
+            f"{setting['quantization']:<8} {setting['bytes_per_vector']:>9.1f} "
+            f"{setting['vector_bytes'] / 1024:>8.1f}KB "
+            f"{setting['document_bytes'] / 1024:>8.1f}KB "
+            f"{setting['compression']:>5.1f}x {setting['recall_candidates']:>10.3f} "
+            f"{setting['recall_rescored']:>9.3f} {setting['mean_ms']:>9.3f}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantized vector storage report")
+    parser.add_argument("--data", default="files/FoodDataSet.json")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rescore-depth", type=int, default=50)
+    parser.add_argument("--sample-queries", type=int, default=100)
+    parser.add_argument("--output", default=None, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    print("🗜️ QUANTIZED STORAGE REPORT")
+    print("=" * 50)
+    food_items = load_food_data(args.data)
+    report = build_report(food_items, args.k, args.rescore_depth, args.sample_queries)
+
+    print(
+        f"\n{report['items']} items, {report['queries']} queries, "
+        f"top {report['rescore_depth']} candidates rescored"
+    )
+    print(format_report(report))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        print(f"\n💾 Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+"""
+Compact vector storage for the NumPy backend.
+
+QuantizedCollection keeps its vectors in RAM in one of three compressed
+forms and generates candidates from them:
+
+- "float16": half-precision copies of the vectors (2x smaller)
+- "int8":    scalar quantization with one scale per vector (about 4x smaller)
+- "pq":      product quantization, one byte per 8-dimension subvector
+             (32x smaller for 384-dimension MiniLM vectors)
+
+The best rescore_depth candidates are then rescored exactly against the
+full-precision vectors, which live in a memory-mapped temporary file rather
+than on the heap. Document strings are not kept by default, since search
+results are read from metadata.
+"""
+
+import tempfile
+import threading
+import numpy as np
+from typing import Dict, Optional
+
+from numpy_backend import (
+    NumpyCollection,
+    normalize_rows,
+    score_candidates,
+    top_k_indices,
+)
+
+QUANTIZATION_SETTINGS = ("float16", "int8", "pq")
+
+# Rows scored per chunk when decompressing codes, to bound temporary memory
+SCORE_CHUNK_ROWS = 16384
+
+
+class Float16Codec:
+    """Half-precision copy of every vector"""
+
+    name = "float16"
+
+    def __init__(self):
+        self.codes = None
+
+    def fit(self, vectors: np.ndarray):
+        pass
+
+    def encode(self, vectors: np.ndarray):
+        self.codes = vectors.astype(np.float16)
+
+    def scores(self, queries: np.ndarray, rows: Optional[np.ndarray]) -> np.ndarray:
+        codes = self.codes if rows is None else self.codes[rows]
+        scores = np.empty((len(queries), len(codes)), dtype=np.float32)
+        for start in range(0, len(codes), SCORE_CHUNK_ROWS):
+            chunk = codes[start : start + SCORE_CHUNK_ROWS].astype(np.float32)
+            scores[:, start : start + len(chunk)] = queries @ chunk.T
+        return scores
+
+    @property
+    def nbytes(self) -> int:
+        return 0 if self.codes is None else self.codes.nbytes
+
+
+class Int8Codec:
+    """Symmetric int8 scalar quantization with one float32 scale per vector"""
+
+    name = "int8"
+
+    def __init__(self):
+        self.codes = None
+        self.scales = None
+
+    def fit(self, vectors: np.ndarray):
+        pass
+
+    def encode(self, vectors: np.ndarray):
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        self.codes = np.round(vectors / scales[:, None]).astype(np.int8)
+        self.scales = scales.astype(np.float32)
+
+    def scores(self, queries: np.ndarray, rows: Optional[np.ndarray]) -> np.ndarray:
+        codes = self.codes if rows is None else self.codes[rows]
+        scales = self.scales if rows is None else self.scales[rows]
+        scores = np.empty((len(queries), len(codes)), dtype=np.float32)
+        for start in range(0, len(codes), SCORE_CHUNK_ROWS):
+            chunk = codes[start : start + SCORE_CHUNK_ROWS].astype(np.float32)
+            scores[:, start : start + len(chunk)] = queries @ chunk.T
+        return scores * scales
+
+    @property
+    def nbytes(self) -> int:
+        return 0 if self.codes is None else self.codes.nbytes + self.scales.nbytes
+
+
+class ProductQuantizationCodec:
+    """Product quantization scored by asymmetric distance (inner product tables)"""
+
+    name = "pq"
+
+    def __init__(
+        self,
+        subvector_size: int = 8,
+        centroids: int = 256,
+        iterations: int = 20,
+        training_sample: int = 20000,
+        seed: int = 0,
+    ):
+        self.subvector_size = subvector_size
+        self.centroids = centroids
+        self.iterations = iterations
+        self.training_sample = training_sample
+        self.seed = seed
+        self.codebooks = None
+        self.codes = None
+        self.trained_rows = 0
+
+    def _subspaces(self, dimensions: int) -> int:
+        subspaces = max(1, dimensions // self.subvector_size)
+        while dimensions % subspaces:
+            subspaces -= 1
+        return subspaces
+
+    @staticmethod
+    def _nearest(data: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        # ||x||^2 is the same for every centroid, so it is left out
+        distances = (centroids**2).sum(axis=1)[None, :] - 2 * data @ centroids.T
+        return distances.argmin(axis=1)
+
+    def fit(self, vectors: np.ndarray):
+        """Train one k-means codebook per subspace on a sample of vectors"""
+        rng = np.random.default_rng(self.seed)
+        if len(vectors) > self.training_sample:
+            vectors = vectors[rng.choice(len(vectors), self.training_sample, False)]
+        vectors = np.asarray(vectors, dtype=np.float32)
+
+        subspaces = self._subspaces(vectors.shape[1])
+        width = vectors.shape[1] // subspaces
+        centroids = min(self.centroids, len(vectors))
+        self.codebooks = np.zeros((subspaces, centroids, width), dtype=np.float32)
+
+        for subspace in range(subspaces):
+            data = vectors[:, subspace * width : (subspace + 1) * width]
+            codebook = data[rng.choice(len(data), centroids, replace=False)].copy()
+            for _ in range(self.iterations):
+                assignments = self._nearest(data, codebook)
+                sums = np.stack(
+                    [
+                        np.bincount(assignments, data[:, dim], centroids)
+                        for dim in range(width)
+                    ],
+                    axis=1,
+                )
+                counts = np.bincount(assignments, minlength=centroids)
+                filled = counts > 0
+                codebook[filled] = sums[filled] / counts[filled, None]
+            self.codebooks[subspace] = codebook
+        self.trained_rows = len(vectors)
+
+    def encode(self, vectors: np.ndarray):
+        subspaces, _, width = self.codebooks.shape
+        codes = np.empty((len(vectors), subspaces), dtype=np.uint8)
+        for start in range(0, len(vectors), SCORE_CHUNK_ROWS):
+            chunk = np.asarray(vectors[start : start + SCORE_CHUNK_ROWS])
+            for subspace in range(subspaces):
+                data = chunk[:, subspace * width : (subspace + 1) * width]
+                codes[start : start + len(chunk), subspace] = self._nearest(
+                    data, self.codebooks[subspace]
+                )
+        self.codes = codes
+
+    def scores(self, queries: np.ndarray, rows: Optional[np.ndarray]) -> np.ndarray:
+        codes = self.codes if rows is None else self.codes[rows]
+        subspaces, _, width = self.codebooks.shape
+        subspace_index = np.arange(subspaces)
+        scores = np.empty((len(queries), len(codes)), dtype=np.float32)
+        for q, query in enumerate(queries):
+            # tables[s, c] is the inner product of query subvector s and centroid c
+            tables = np.einsum(
+                "sw,scw->sc", query.reshape(subspaces, width), self.codebooks
+            )
+            scores[q] = tables[subspace_index, codes].sum(axis=1)
+        return scores
+
+    @property
+    def nbytes(self) -> int:
+        if self.codes is None:
+            return 0
+        return self.codes.nbytes + self.codebooks.nbytes
+
+
+CODECS = {
+    "float16": Float16Codec,
+    "int8": Int8Codec,
+    "pq": ProductQuantizationCodec,
+}
+
+
+class QuantizedCollection(NumpyCollection):
+    """NumpyCollection that searches compressed vectors and rescores exactly.
+
+    rescore_depth is how many candidates per query are rescored at full
+    precision; 0 returns the approximate ranking and distances as they are.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        embedding_function,
+        metadata: Optional[Dict] = None,
+        initial_capacity: int = 1024,
+        store_documents: bool = False,
+        quantization: str = "int8",
+        rescore_depth: int = 50,
+        vector_dir: str = None,
+    ):
+        if quantization not in CODECS:
+            raise ValueError(
+                f"Unknown quantization: {quantization} "
+                f"(choose from {', '.join(QUANTIZATION_SETTINGS)})"
+            )
+        super().__init__(
+            name, embedding_function, metadata, initial_capacity, store_documents
+        )
+        self.quantization = quantization
+        self.rescore_depth = rescore_depth
+        self.configuration["backend"] = f"numpy-{quantization}"
+        self._vector_dir = vector_dir
+        self._codec = CODECS[quantization]()
+        self._encoded = False
+        # The search service queries from several threads; encode once
+        self._encode_lock = threading.Lock()
+
+    def _allocate(self, capacity: int, dimensions: int) -> np.ndarray:
+        """Full-precision rows live in a memory-mapped temporary file"""
+        return np.memmap(
+            tempfile.TemporaryFile(dir=self._vector_dir),
+            dtype=np.float32,
+            mode="w+",
+            shape=(capacity, dimensions),
+        )
+
+    def _invalidate(self):
+        # Under the lock, so an encoding in progress cannot mark it current
+        with self._encode_lock:
+            self._encoded = False
+
+    def attach_embeddings(self, *args, **kwargs):
+        super().attach_embeddings(*args, **kwargs)
+        self._invalidate()
+
+    def add(self, *args, **kwargs):
+        super().add(*args, **kwargs)
+        self._invalidate()
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._invalidate()
+
+    def delete(self, *args, **kwargs):
+        super().delete(*args, **kwargs)
+        self._invalidate()
+
+    def _ensure_encoded(self):
+        """Re-encode after writes; retrain PQ codebooks once the data doubles"""
+        if self._encoded or not self._size:
+            return
+        with self._encode_lock:
+            # Another thread may have encoded while this one waited
+            if self._encoded or not self._size:
+                return
+            vectors = self.embeddings
+            trained_rows = getattr(self._codec, "trained_rows", None)
+            if trained_rows is not None:
+                if self._codec.codebooks is None or len(vectors) >= 2 * trained_rows:
+                    self._codec.fit(vectors)
+            self._codec.encode(vectors)
+            self._encoded = True
+
+    def _rank(self, query_embeddings, candidate_rows, n_results: int):
+        if not self._size or (candidate_rows is not None and not len(candidate_rows)):
+            return super()._rank(query_embeddings, candidate_rows, n_results)
+        self._ensure_encoded()
+
+        queries = normalize_rows(query_embeddings)
+        approximate = self._codec.scores(queries, candidate_rows)
+        depth = max(n_results, self.rescore_depth) if self.rescore_depth else n_results
+
+        ranked = []
+        for query, scores in zip(queries, approximate):
+            best = top_k_indices(scores, depth)
+            rows = best if candidate_rows is None else candidate_rows[best]
+            if not self.rescore_depth:
+                ranked.append((rows, (1.0 - scores[best]).tolist()))
+                continue
+
+            # Rescore the shortlist against the full-precision vectors
+            order = np.sort(rows)
+            [(top, distances)] = score_candidates(
+                query[None, :],
+                self._matrix[order],
+                n_results,
+                candidates_normalized=True,
+            )
+            ranked.append((order[top], distances))
+        return ranked
+
+    def memory_report(self) -> Dict[str, int]:
+        """Bytes held in RAM for vectors and documents versus a float32 matrix"""
+        self._ensure_encoded()
+        items = self._size
+        dimensions = self._matrix.shape[1] if self._matrix is not None else 0
+        float32_bytes = items * dimensions * 4
+        return {
+            "items": items,
+            "dimensions": dimensions,
+            "quantization": self.quantization,
+            "float32_bytes": float32_bytes,
+            "vector_bytes": self._codec.nbytes,
+            "bytes_per_vector": self._codec.nbytes / items if items else 0,
+            "compression": (
+                float32_bytes / self._codec.nbytes if self._codec.nbytes else 0
+            ),
+            "document_bytes": sum(
+                len(document.encode("utf-8")) for document in self._documents
+            ),
+        }
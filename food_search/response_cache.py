@@ -0,0 +1,228 @@
+"""
+Semantic cache for RAG chatbot answers.
+
+Most chatbot traffic is paraphrases of a few requests, and each one costs a
+full LLM generation. An answer depends on the question and on the foods that
+retrieval handed the LLM, so entries are keyed by both: a lookup reuses a
+stored answer when retrieval returned exactly the same food ids and the new
+query embedding is within similarity_threshold (cosine) of the stored one.
+
+Entries are bounded by an LRU and a time-to-live, and with a cache_path they
+are kept in SQLite, so answers survive restarts.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+RESPONSE_CACHE_SIZE = int(os.getenv("FOOD_SEARCH_RESPONSE_CACHE_SIZE", "512"))
+RESPONSE_CACHE_TTL = float(os.getenv("FOOD_SEARCH_RESPONSE_CACHE_TTL", "86400"))
+RESPONSE_CACHE_THRESHOLD = float(
+    os.getenv("FOOD_SEARCH_RESPONSE_CACHE_THRESHOLD", "0.9")
+)
+# Set to an empty string to keep answers in memory only
+RESPONSE_CACHE_PATH = os.getenv(
+    "FOOD_SEARCH_RESPONSE_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "food_search", "responses.db"),
+)
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def result_ids_key(food_ids: List[str]) -> str:
+    """Order-independent key for the set of retrieved food ids"""
+    return "\n".join(sorted(set(food_ids)))
+
+
+class SemanticResponseCache:
+    """LRU + TTL cache of answers, matched by query similarity and result ids.
+
+    Entries are keyed by (namespace, result ids, normalized query); the
+    namespace separates answers from different LLMs, prompts or catalogs.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = RESPONSE_CACHE_SIZE,
+        ttl_seconds: float = RESPONSE_CACHE_TTL,
+        similarity_threshold: float = RESPONSE_CACHE_THRESHOLD,
+        cache_path: str = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.cache_path = cache_path
+        # key -> (embedding, response, stored_at); stored_at is wall-clock
+        # time, so the TTL still holds after a restart
+        self._entries = OrderedDict()
+        # (namespace, result ids) -> keys of the entries retrieved with them
+        self._groups = {}
+        self._lock = threading.Lock()
+        self._connection = None
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+
+        if cache_path and max_entries > 0:
+            self._open(cache_path)
+
+    def _open(self, cache_path: str):
+        directory = os.path.dirname(cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(cache_path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "namespace TEXT, result_ids TEXT, query TEXT, embedding BLOB, "
+            "response TEXT, stored_at REAL, last_used REAL, "
+            "PRIMARY KEY (namespace, result_ids, query))"
+        )
+        self._connection.execute(
+            "DELETE FROM responses WHERE stored_at < ?", (self._oldest_valid(),)
+        )
+        self._connection.commit()
+
+        import numpy as np
+
+        # Reload the most recently used entries, oldest first to keep LRU order
+        rows = self._connection.execute(
+            "SELECT namespace, result_ids, query, embedding, response, stored_at "
+            "FROM responses ORDER BY last_used DESC LIMIT ?",
+            (self.max_entries,),
+        ).fetchall()
+        for namespace, ids_key, query, embedding, response, stored_at in reversed(rows):
+            embedding = np.frombuffer(embedding, dtype=np.float32)
+            self._remember((namespace, ids_key, query), embedding, response, stored_at)
+
+    def _oldest_valid(self) -> float:
+        return time.time() - self.ttl_seconds if self.ttl_seconds else 0.0
+
+    def get(
+        self, namespace: str, query_embedding, food_ids: List[str]
+    ) -> Optional[str]:
+        """The stored answer for a similar query over the same results, if any"""
+        import numpy as np
+
+        query_embedding = self._normalize(query_embedding)
+        group = (namespace, result_ids_key(food_ids))
+        with self._lock:
+            best_key, best_score = None, -1.0
+            for key in list(self._groups.get(group, ())):
+                embedding, response, stored_at = self._entries[key]
+                if stored_at < self._oldest_valid():
+                    self._forget(key)
+                    self.expirations += 1
+                    continue
+                score = float(np.dot(embedding, query_embedding))
+                if score > best_score:
+                    best_key, best_score = key, score
+
+            if best_key is None or best_score < self.similarity_threshold:
+                self.misses += 1
+                return None
+
+            if best_score >= 1.0 - 1e-6:
+                self.exact_hits += 1
+            else:
+                self.semantic_hits += 1
+            self._entries.move_to_end(best_key)
+            if self._connection is not None:
+                self._connection.execute(
+                    "UPDATE responses SET last_used = ? "
+                    "WHERE namespace = ? AND result_ids = ? AND query = ?",
+                    (time.time(), *best_key),
+                )
+                self._connection.commit()
+            return self._entries[best_key][1]
+
+    def put(
+        self,
+        namespace: str,
+        query: str,
+        query_embedding,
+        food_ids: List[str],
+        response: str,
+    ):
+        if self.max_entries <= 0:
+            return
+        key = (namespace, result_ids_key(food_ids), normalize_query(query))
+        embedding = self._normalize(query_embedding)
+        stored_at = time.time()
+        with self._lock:
+            self._remember(key, embedding, response, stored_at)
+            if self._connection is not None:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (*key, embedding.tobytes(), response, stored_at, stored_at),
+                )
+                self._connection.commit()
+
+    @staticmethod
+    def _normalize(embedding):
+        import numpy as np
+
+        embedding = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm else embedding
+
+    def _remember(self, key, embedding, response, stored_at):
+        self._entries[key] = (embedding, response, stored_at)
+        self._entries.move_to_end(key)
+        self._groups.setdefault(key[:2], set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._forget(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _forget(self, key):
+        del self._entries[key]
+        group = self._groups[key[:2]]
+        group.discard(key)
+        if not group:
+            del self._groups[key[:2]]
+        if self._connection is not None:
+            self._connection.execute(
+                "DELETE FROM responses "
+                "WHERE namespace = ? AND result_ids = ? AND query = ?",
+                key,
+            )
+            self._connection.commit()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._groups.clear()
+            if self._connection is not None:
+                self._connection.execute("DELETE FROM responses")
+                self._connection.commit()
+            self.exact_hits = self.semantic_hits = self.misses = 0
+            self.expirations = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.exact_hits + self.semantic_hits
+        lookups = hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "expirations": self.expirations,
+            "evictions": self.evictions,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "similarity_threshold": self.similarity_threshold,
+        }
+
+
+def format_response_cache_stats(stats: Dict[str, Any]) -> str:
+    hits = stats["exact_hits"] + stats["semantic_hits"]
+    return (
+        f"💬 Answer cache: {hits} hits ({stats['semantic_hits']} paraphrases), "
+        f"{stats['misses']} misses ({stats['hit_rate']*100:.1f}% hit rate), "
+        f"{stats['entries']} answers stored"
+    )
@@ -0,0 +1,451 @@
+"""
+Reproducible search benchmark for the food search helpers.
+
+Runs the fixed, versioned query set in benchmark_queries.json (plain,
+cuisine-filtered, calorie-filtered and combined searches) through
+perform_filtered_similarity_search and reports, overall and per category:
+
+- p50/p95/p99 latency and queries per second, for cold runs (query embedding
+  cache cleared before every query) and warm runs (cache populated); the
+  result cache is cleared before every query in both
+- recall@k against an exact brute-force search over the same embeddings
+
+Filtered queries normally go through the metadata index, which scores the
+matching items exactly, so their recall is always 1.0. With --filter-path
+hnsw the index is detached and filters run as a where clause on the HNSW
+index (use the chroma backend), which measures recall under filters.
+
+With --concurrency N, the query set is also replayed from N threads with both
+caches disabled, once per --batch-windows value, to measure the throughput
+gained and the latency added by micro-batching query embeddings (a window of
+0 is the unbatched reference).
+
+Results are written as JSON. When a baseline file is given, the run fails
+with exit code 1 if warm p95 latency regresses by more than --tolerance or
+recall drops by more than --recall-tolerance. Latency depends on the
+machine, so no baseline is shipped: record one with --update-baseline on the
+machine that runs the comparisons, with the same backend and filter path.
+
+Usage:
+    python food_search/search_benchmark.py --output benchmark_results.json
+    python food_search/search_benchmark.py --update-baseline benchmark_baseline.json
+    python food_search/search_benchmark.py --baseline benchmark_baseline.json
+    python food_search/search_benchmark.py --filter-path hnsw
+    python food_search/search_benchmark.py --concurrency 8 --batch-windows 0,1,2,5
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, List
+
+import chromadb
+import numpy as np
+
+from embedding_artifacts import file_sha256
+from numpy_backend import NumpyCollection
+from shared_functions import (
+    EMBEDDING_MODEL_NAME,
+    QUERY_BATCH_MAX_SIZE,
+    build_where_clause,
+    configure_query_batching,
+    create_similarity_search_collection,
+    drop_metadata_index,
+    embed_query_texts,
+    format_registry_stats,
+    get_query_batching_stats,
+    latency_recorder,
+    load_food_data,
+    perform_filtered_similarity_search,
+    populate_similarity_collection,
+    query_embedding_cache,
+    registry,
+    search_result_cache,
+)
+
+QUERY_SET_PATH = os.path.join(os.path.dirname(__file__), "benchmark_queries.json")
+DATA_PATH = "files/FoodDataSet.json"
+PERCENTILES = (50, 95, 99)
+
+
+def load_query_set(path: str = QUERY_SET_PATH) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as file:
+        query_set = json.load(file)
+    for query in query_set["queries"]:
+        query.setdefault("filters", {})
+    return query_set
+
+
+def compute_ground_truth(collection, queries: List[Dict]) -> Dict[str, List[str]]:
+    """Exact top-k ids for every query by brute force over all stored embeddings"""
+    exact = NumpyCollection.from_collection(
+        collection, registry.get(EMBEDDING_MODEL_NAME)
+    )
+    query_embeddings = embed_query_texts(collection, [q["query"] for q in queries])
+
+    ground_truth = {}
+    for query, embedding in zip(queries, query_embeddings):
+        results = exact.query(
+            query_embeddings=[embedding],
+            n_results=query["k"],
+            where=build_where_clause(**query["filters"]),
+            include=["distances"],
+        )
+        ground_truth[query["id"]] = results["ids"][0]
+    return ground_truth
+
+
+def recall_at_k(returned_ids: List[str], true_ids: List[str]) -> float:
+    if not true_ids:
+        return 1.0
+    return len(set(returned_ids) & set(true_ids)) / len(true_ids)
+
+
+def time_query(collection, query: Dict, cold: bool):
+    """Run one benchmark query and return (elapsed milliseconds, returned ids)"""
+    # Measure the search itself, never a result cache hit
+    search_result_cache.clear()
+    if cold:
+        query_embedding_cache.clear()
+    started = time.perf_counter_ns()
+    results = perform_filtered_similarity_search(
+        collection, query["query"], n_results=query["k"], **query["filters"]
+    )
+    elapsed_ms = (time.perf_counter_ns() - started) / 1e6
+    return elapsed_ms, [result["food_id"] for result in results]
+
+
+def summarize_latencies(latencies_ms: List[float]) -> Dict[str, float]:
+    if not latencies_ms:
+        return {}
+    values = np.asarray(latencies_ms)
+    summary = {f"p{p}_ms": float(np.percentile(values, p)) for p in PERCENTILES}
+    summary["mean_ms"] = float(values.mean())
+    summary["qps"] = float(len(values) / (values.sum() / 1000)) if values.sum() else 0.0
+    summary["samples"] = len(values)
+    return summary
+
+
+def run_benchmark(
+    collection,
+    query_set: Dict[str, Any],
+    repeats: int = 5,
+    warmup: int = 1,
+    filter_path: str = "index",
+) -> Dict[str, Any]:
+    """Measure cold and warm latency and recall@k for every query in the set.
+
+    filter_path "hnsw" detaches the metadata index, so filtered queries are
+    answered by the vector index with a where clause instead of exactly.
+    """
+    if filter_path == "hnsw":
+        drop_metadata_index(collection)
+    queries = query_set["queries"]
+    ground_truth = compute_ground_truth(collection, queries)
+
+    # Untimed passes load the model and warm the collection
+    for _ in range(warmup):
+        for query in queries:
+            time_query(collection, query, cold=False)
+    latency_recorder.reset()
+
+    per_query = {}
+    for query in queries:
+        cold_ms, returned_ids = time_query(collection, query, cold=True)
+        warm_ms = [time_query(collection, query, cold=False)[0] for _ in range(repeats)]
+        per_query[query["id"]] = {
+            "category": query["category"],
+            "k": query["k"],
+            "cold_ms": [cold_ms],
+            "warm_ms": warm_ms,
+            "recall": recall_at_k(returned_ids, ground_truth[query["id"]]),
+            "returned_ids": returned_ids,
+            "expected_ids": ground_truth[query["id"]],
+        }
+
+    def aggregate(entries: List[Dict]) -> Dict[str, Any]:
+        return {
+            "queries": len(entries),
+            "cold": summarize_latencies([ms for e in entries for ms in e["cold_ms"]]),
+            "warm": summarize_latencies([ms for e in entries for ms in e["warm_ms"]]),
+            "recall_at_k": float(np.mean([e["recall"] for e in entries])),
+        }
+
+    categories = sorted({entry["category"] for entry in per_query.values()})
+    return {
+        "query_set_version": query_set["version"],
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "chromadb": chromadb.__version__,
+            "numpy": np.__version__,
+            "embedding_model": EMBEDDING_MODEL_NAME,
+            "backend": collection.configuration.get("backend", "chroma"),
+            "filter_path": filter_path,
+        },
+        "settings": {"repeats": repeats, "warmup": warmup},
+        "overall": aggregate(list(per_query.values())),
+        "categories": {
+            category: aggregate(
+                [e for e in per_query.values() if e["category"] == category]
+            )
+            for category in categories
+        },
+        "stages": {
+            name: {key: hist[key] for key in ("count", "mean_ms", "p95_ms")}
+            for name, hist in latency_recorder.to_dict().items()
+        },
+        "queries": per_query,
+    }
+
+
+@contextmanager
+def caches_disabled():
+    """Turn off the in-memory query embedding and result caches"""
+    sizes = (query_embedding_cache.max_entries, search_result_cache.max_entries)
+    query_embedding_cache.clear()
+    search_result_cache.clear()
+    query_embedding_cache.max_entries = search_result_cache.max_entries = 0
+    try:
+        yield
+    finally:
+        query_embedding_cache.max_entries, search_result_cache.max_entries = sizes
+
+
+def run_concurrency_benchmark(
+    collection,
+    query_set: Dict[str, Any],
+    concurrency: int = 8,
+    windows_ms: List[float] = (0.0, 2.0),
+    max_batch_size: int = QUERY_BATCH_MAX_SIZE,
+    rounds: int = 3,
+) -> Dict[str, Any]:
+    """Throughput and latency of concurrent uncached searches per batch window.
+
+    Every query is embedded, since both caches are off. Window 0 runs without
+    micro-batching; added latency is relative to it.
+    """
+    requests = query_set["queries"] * rounds
+
+    def timed_search(query: Dict) -> float:
+        started = time.perf_counter_ns()
+        perform_filtered_similarity_search(
+            collection, query["query"], n_results=query["k"], **query["filters"]
+        )
+        return (time.perf_counter_ns() - started) / 1e6
+
+    runs = {}
+    with caches_disabled(), ThreadPoolExecutor(concurrency) as pool:
+        for window_ms in windows_ms:
+            configure_query_batching(window_ms, max_batch_size)
+            list(pool.map(timed_search, query_set["queries"]))  # warm up
+            # A fresh batcher, so its statistics cover only the timed run
+            configure_query_batching(window_ms, max_batch_size)
+
+            started = time.perf_counter()
+            latencies = list(pool.map(timed_search, requests))
+            elapsed = time.perf_counter() - started
+
+            summary = summarize_latencies(latencies)
+            summary["qps"] = len(requests) / elapsed if elapsed else 0.0
+            batching = get_query_batching_stats().get(EMBEDDING_MODEL_NAME, {})
+            summary["batches"] = batching.get("batches", len(requests))
+            summary["mean_batch_size"] = batching.get("mean_batch_size", 1.0)
+            runs[f"{window_ms:g}"] = summary
+    configure_query_batching(0)
+
+    reference = runs.get("0")
+    if reference:
+        for summary in runs.values():
+            summary["added_p50_ms"] = summary["p50_ms"] - reference["p50_ms"]
+            summary["added_p95_ms"] = summary["p95_ms"] - reference["p95_ms"]
+            summary["qps_gain"] = summary["qps"] / reference["qps"]
+
+    return {
+        "concurrency": concurrency,
+        "max_batch_size": max_batch_size,
+        "requests": len(requests),
+        "windows": runs,
+    }
+
+
+def format_concurrency_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"{'window':>8} {'qps':>8} {'p50':>10} {'p95':>10} "
+        f"{'+p50':>9} {'+p95':>9} {'batch':>6}"
+    ]
+    for window, summary in report["windows"].items():
+        lines.append(
+            f"{window + 'ms':>8} {summary['qps']:>8.1f} {summary['p50_ms']:>8.2f}ms "
+            f"{summary['p95_ms']:>8.2f}ms {summary.get('added_p50_ms', 0):>7.2f}ms "
+            f"{summary.get('added_p95_ms', 0):>7.2f}ms "
+            f"{summary['mean_batch_size']:>6.1f}"
+        )
+    return "\n".join(lines)
+
+
+def compare_to_baseline(
+    report: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float,
+    recall_tolerance: float,
+) -> List[str]:
+    """Return a description of every regression against the baseline"""
+    if baseline.get("query_set_version") != report["query_set_version"]:
+        return [
+            f"query set version {report['query_set_version']} does not match "
+            f"baseline version {baseline.get('query_set_version')}"
+        ]
+
+    # Recall and latency are only comparable on the same search path
+    # (baselines recorded before --filter-path existed used the index)
+    environment = baseline.get("environment", {})
+    for key, default in (("backend", None), ("filter_path", "index")):
+        current = report["environment"].get(key)
+        previous = environment.get(key, default)
+        if current != previous:
+            return [f"{key} {current} does not match baseline {key} {previous}"]
+
+    regressions = []
+    scopes = {"overall": (report["overall"], baseline["overall"])}
+    for category, summary in report["categories"].items():
+        if category in baseline.get("categories", {}):
+            scopes[category] = (summary, baseline["categories"][category])
+
+    for scope, (current, previous) in scopes.items():
+        current_p95 = current["warm"]["p95_ms"]
+        previous_p95 = previous["warm"]["p95_ms"]
+        if previous_p95 and current_p95 > previous_p95 * (1 + tolerance):
+            regressions.append(
+                f"{scope}: warm p95 {current_p95:.2f}ms vs baseline "
+                f"{previous_p95:.2f}ms (+{(current_p95 / previous_p95 - 1) * 100:.0f}%)"
+            )
+        if current["recall_at_k"] < previous["recall_at_k"] - recall_tolerance:
+            regressions.append(
+                f"{scope}: recall@k {current['recall_at_k']:.3f} vs baseline "
+                f"{previous['recall_at_k']:.3f}"
+            )
+    return regressions
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"{'scope':<10} {'recall':>7} {'cold p50':>10} {'warm p50':>10} "
+        f"{'warm p95':>10} {'warm p99':>10} {'warm qps':>10}"
+    ]
+    scopes = [("overall", report["overall"]), *report["categories"].items()]
+    for scope, summary in scopes:
+        cold, warm = summary["cold"], summary["warm"]
+        lines.append(
+            f"{scope:<10} {summary['recall_at_k']:>7.3f} {cold['p50_ms']:>8.2f}ms "
+            f"{warm['p50_ms']:>8.2f}ms {warm['p95_ms']:>8.2f}ms "
+            f"{warm['p99_ms']:>8.2f}ms {warm['qps']:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark food similarity search")
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--queries", default=QUERY_SET_PATH)
+    parser.add_argument("--backend", choices=["chroma", "numpy"], default="chroma")
+    parser.add_argument(
+        "--filter-path",
+        choices=["index", "hnsw"],
+        default="index",
+        help="Answer filtered queries via the metadata index or the HNSW index",
+    )
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--output", default=None, help="Write results as JSON")
+    parser.add_argument("--baseline", default=None, help="Fail on regressions")
+    parser.add_argument("--update-baseline", default=None, metavar="PATH")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--recall-tolerance", type=float, default=0.02)
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=0,
+        help="Also replay the queries from this many threads (0 skips it)",
+    )
+    parser.add_argument(
+        "--batch-windows",
+        default="0,1,2,5",
+        help="Comma-separated micro-batching windows in ms for --concurrency",
+    )
+    parser.add_argument("--batch-max-size", type=int, default=QUERY_BATCH_MAX_SIZE)
+    args = parser.parse_args(argv)
+
+    print("🔬 FOOD SEARCH BENCHMARK")
+    print("=" * 50)
+
+    query_set = load_query_set(args.queries)
+    food_items = load_food_data(args.data)
+    collection = create_similarity_search_collection(
+        "search_benchmark", backend=args.backend
+    )
+    populate_similarity_collection(collection, food_items)
+
+    report = run_benchmark(
+        collection, query_set, args.repeats, args.warmup, args.filter_path
+    )
+    report["environment"]["dataset_sha256"] = file_sha256(args.data)
+
+    print(
+        f"\n📊 Query set v{query_set['version']}, {len(query_set['queries'])} queries"
+    )
+    print(format_report(report))
+    if args.concurrency > 0:
+        windows = [float(window) for window in args.batch_windows.split(",")]
+        report["micro_batching"] = run_concurrency_benchmark(
+            collection,
+            query_set,
+            args.concurrency,
+            windows,
+            args.batch_max_size,
+        )
+        print(f"\n🧵 Micro-batching with {args.concurrency} concurrent clients")
+        print(format_concurrency_report(report["micro_batching"]))
+
+    print(f"\n🧠 Embedding models:")
+    print(format_registry_stats())
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+
+    if args.update_baseline:
+        with open(args.update_baseline, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        print(f"💾 Baseline updated: {args.update_baseline}")
+
+    if args.baseline:
+        if not os.path.exists(args.baseline):
+            print(
+                f"\n❌ Baseline {args.baseline} not found; "
+                "record one with --update-baseline"
+            )
+            return 1
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+        regressions = compare_to_baseline(
+            report, baseline, args.tolerance, args.recall_tolerance
+        )
+        if regressions:
+            print("\n❌ Regressions against baseline:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            return 1
+        print("\n✅ No regressions against baseline")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
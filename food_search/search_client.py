@@ -0,0 +1,115 @@
+"""
+Thin client for the local food search service (search_service.py).
+
+RemoteCollection stands in for a collection in the CLIs: the perform_*
+search helpers in shared_functions hand it the request, and it forwards the
+request over one keep-alive HTTP connection per thread instead of searching
+locally. Results come back as plain result dicts.
+"""
+
+import http.client
+import json
+import threading
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+
+class SearchServiceError(Exception):
+    """The search service could not be reached or rejected a request"""
+
+
+class RemoteCollection:
+    """Collection-like handle that runs searches on a search service"""
+
+    def __init__(self, url: str, timeout: float = 30.0):
+        parsed = urlparse(url if "://" in url else f"http://{url}")
+        self.url = f"{parsed.scheme}://{parsed.netloc}"
+        self.host = parsed.hostname
+        self.port = parsed.port or 80
+        self.timeout = timeout
+        self.name = f"remote:{parsed.netloc}"
+        self.configuration = {"backend": "remote"}
+        self._local = threading.local()
+        self._catalog = None
+
+    def _connection(self) -> http.client.HTTPConnection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = http.client.HTTPConnection(
+                self.host, self.port, timeout=self.timeout
+            )
+            self._local.connection = connection
+        return connection
+
+    def _request(self, method: str, path: str, payload: Dict = None) -> Dict:
+        body = json.dumps(payload).encode("utf-8") if payload is not None else None
+        headers = {"Content-Type": "application/json"} if body else {}
+
+        # Retry once on a fresh connection if the kept-alive one went stale
+        for attempt in range(2):
+            connection = self._connection()
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                raw = response.read()
+            except (http.client.HTTPException, ConnectionError, OSError) as e:
+                connection.close()
+                self._local.connection = None
+                if attempt:
+                    raise SearchServiceError(f"{self.url}{path}: {e}") from e
+                continue
+
+            try:
+                data = json.loads(raw or b"{}")
+            except ValueError as e:
+                # A non-JSON or truncated body; don't reuse the connection
+                connection.close()
+                self._local.connection = None
+                raise SearchServiceError(
+                    f"{self.url}{path}: invalid response: {e}"
+                ) from e
+
+            if response.status != 200:
+                raise SearchServiceError(data.get("error", f"HTTP {response.status}"))
+            return data
+
+    def health(self) -> Dict[str, Any]:
+        return self._request("GET", "/health")
+
+    def count(self) -> int:
+        return self.health()["items"]
+
+    def stats(self) -> Dict[str, Any]:
+        return self._request("GET", "/stats")
+
+    def catalog_fingerprint(self) -> Optional[str]:
+        """The service's catalog fingerprint, fetched once"""
+        if self._catalog is None:
+            self._catalog = self.health().get("catalog")
+        return self._catalog
+
+    def search(
+        self, query: str, n_results: int = 5, filters: Optional[Dict] = None
+    ) -> List[Dict]:
+        payload = {"query": query, "n_results": n_results, "filters": filters or {}}
+        return self._request("POST", "/search", payload)["results"]
+
+    def hybrid_search(self, query: str, n_results: int = 5) -> List[Dict]:
+        payload = {"query": query, "n_results": n_results}
+        return self._request("POST", "/hybrid_search", payload)["results"]
+
+    def batch_search(self, search_requests: List[tuple]) -> List[List[Dict]]:
+        payload = {
+            "requests": [
+                {"query": query, "filters": filters or {}, "n_results": n_results}
+                for query, filters, n_results in search_requests
+            ]
+        }
+        return self._request("POST", "/batch_search", payload)["results"]
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Query embeddings computed (and cached) by the service's model"""
+        return self._request("POST", "/embed", {"texts": texts})["embeddings"]
+
+    def __repr__(self) -> str:
+        return f"RemoteCollection({self.url!r})"
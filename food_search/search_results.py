@@ -0,0 +1,169 @@
+"""
+Compact, lazily materialized search results.
+
+A ResultSet keeps a reference to one row of the raw query response (ids,
+distances and metadatas) instead of copying fields into a new dict per hit.
+Indexing it yields SearchHit objects, which read fields from the response
+only when they are accessed and behave like the result dicts the CLIs
+already use (hit["food_name"], hit.get("taste_profile"), dict(hit)).
+"""
+
+from typing import Any, Dict, Iterator, List
+
+# Result field name -> metadata key it is read from
+FIELD_SOURCES = {
+    "food_name": "name",
+    "food_description": "description",
+    "cuisine_type": "cuisine_type",
+    "food_calories_per_serving": "calories",
+    "food_ingredients": "ingredients",
+    "food_health_benefits": "health_benefits",
+    "cooking_method": "cooking_method",
+    "taste_profile": "taste_profile",
+}
+
+COMPUTED_FIELDS = ("food_id", "similarity_score", "distance")
+# Only present when the response has "match_scores" (hybrid searches)
+MATCH_SCORE_FIELD = "match_score"
+
+
+class SearchHit:
+    """One search result that reads its fields from the raw response on access"""
+
+    __slots__ = ("_response", "_row", "_column")
+
+    def __init__(self, response: Dict[str, Any], row: int, column: int):
+        self._response = response
+        self._row = row
+        self._column = column
+
+    @property
+    def food_id(self) -> str:
+        return self._response["ids"][self._row][self._column]
+
+    @property
+    def distance(self) -> float:
+        return self._response["distances"][self._row][self._column]
+
+    @property
+    def similarity_score(self) -> float:
+        # Calculate similarity score (1 - distance)
+        return 1 - self.distance
+
+    @property
+    def match_score(self) -> float:
+        """Score to show: the ranker's own score, where it differs from the rank"""
+        match_scores = self._response.get("match_scores")
+        if match_scores is None:
+            return self.similarity_score
+        return match_scores[self._row][self._column]
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return self._response["metadatas"][self._row][self._column] or {}
+
+    def __getitem__(self, key: str):
+        if key in COMPUTED_FIELDS or key == MATCH_SCORE_FIELD:
+            return getattr(self, key)
+        source = FIELD_SOURCES.get(key)
+        if source is None or source not in self.metadata:
+            raise KeyError(key)
+
+        value = self.metadata[source]
+        if key == "food_ingredients":
+            # Ingredients are stored joined with ", "; hand back the list
+            return [part for part in value.split(", ") if part] if value else []
+        return value
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self) -> List[str]:
+        metadata = self.metadata
+        present = [
+            field for field, source in FIELD_SOURCES.items() if source in metadata
+        ]
+        keys = [COMPUTED_FIELDS[0], *present, *COMPUTED_FIELDS[1:]]
+        if "match_scores" in self._response:
+            keys.append(MATCH_SCORE_FIELD)
+        return keys
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.keys()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def values(self):
+        return [self[key] for key in self.keys()]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (SearchHit, dict)):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"SearchHit({self.to_dict()!r})"
+
+
+class ResultSet:
+    """Columnar view over one row of a query response, sized to at most limit hits"""
+
+    __slots__ = ("_response", "_row", "_count")
+
+    def __init__(self, response: Dict[str, Any], row: int = 0, limit: int = None):
+        self._response = response
+        self._row = row
+        count = len(response["ids"][row]) if response and response["ids"] else 0
+        self._count = count if limit is None else min(count, limit)
+
+    @property
+    def ids(self) -> List[str]:
+        return self._response["ids"][self._row][: self._count] if self._count else []
+
+    @property
+    def distances(self) -> List[float]:
+        if not self._count:
+            return []
+        return list(self._response["distances"][self._row][: self._count])
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("result index out of range")
+        return SearchHit(self._response, self._row, index)
+
+    def __iter__(self) -> Iterator[SearchHit]:
+        for index in range(self._count):
+            yield SearchHit(self._response, self._row, index)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (ResultSet, list)):
+            return len(self) == len(other) and all(
+                hit == other_hit for hit, other_hit in zip(self, other)
+            )
+        return NotImplemented
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return [hit.to_dict() for hit in self]
+
+    def __repr__(self) -> str:
+        return f"ResultSet({len(self)} hits)"
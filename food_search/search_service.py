@@ -0,0 +1,209 @@
+"""
+Long-lived local food search service.
+
+Loads the dataset, the embedding model and one collection once, then serves
+searches over HTTP so every CLI session on the host shares a single warm
+model and index. Micro-batching of concurrent query embeddings
+(--batch-window-ms) is off by default: at low concurrency the collection window
+added more latency than the shared forward passes saved, so only enable it for
+heavily concurrent load. Start it, then point the CLIs at it:
+
+    python food_search/search_service.py --port 8765
+    FOOD_SEARCH_SERVICE_URL=http://127.0.0.1:8765 python food_search/interactive_search.py
+
+Endpoints (JSON in, JSON out):
+    GET  /health         item count and backend
+    GET  /stats          cache, hybrid search, latency and model statistics
+    POST /search         {"query", "n_results", "filters"}
+    POST /hybrid_search  {"query", "n_results"}
+    POST /batch_search   {"requests": [{"query", "filters", "n_results"}, ...]}
+    POST /embed          {"texts": [...]}, query embeddings from the shared cache
+"""
+
+import argparse
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict
+
+from shared_functions import (
+    EMBEDDING_MODEL_NAME,
+    QUERY_BATCH_MAX_SIZE,
+    QUERY_BATCH_WINDOW_MS,
+    configure_query_batching,
+    embed_query_texts,
+    get_catalog_fingerprint,
+    get_search_stats,
+    latency_recorder,
+    perform_batch_similarity_search,
+    perform_filtered_similarity_search,
+    perform_hybrid_search,
+    perform_similarity_search,
+    prepare_food_collection,
+    registry,
+)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+def to_dicts(results):
+    return [dict(result) for result in results]
+
+
+class FoodSearchHandler(BaseHTTPRequestHandler):
+    """JSON request handler; the collection is set on the server"""
+
+    # Keep-alive, so a client reuses one connection for a whole session
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; don't let Nagle delay the body
+    disable_nagle_algorithm = True
+
+    def _send_json(self, status: int, payload: Dict[str, Any]):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        collection = self.server.collection
+        if self.path == "/health":
+            self._send_json(
+                200,
+                {
+                    "status": "ok",
+                    "items": collection.count(),
+                    "backend": collection.configuration.get("backend", "chroma"),
+                    "catalog": get_catalog_fingerprint(collection),
+                    "uptime_seconds": time.time() - self.server.started_at,
+                },
+            )
+        elif self.path == "/stats":
+            stats = get_search_stats()
+            stats["latency"] = latency_recorder.to_dict()
+            stats["models"] = registry.stats()
+            self._send_json(200, stats)
+        else:
+            self._send_json(404, {"error": f"Unknown path: {self.path}"})
+
+    def do_POST(self):
+        collection = self.server.collection
+        try:
+            request = self._read_json()
+        except ValueError as e:
+            self._send_json(400, {"error": f"Invalid JSON: {e}"})
+            return
+
+        try:
+            if self.path == "/search":
+                filters = request.get("filters") or {}
+                n_results = int(request.get("n_results", 5))
+                if filters:
+                    results = perform_filtered_similarity_search(
+                        collection, request["query"], n_results=n_results, **filters
+                    )
+                else:
+                    results = perform_similarity_search(
+                        collection, request["query"], n_results
+                    )
+                self._send_json(200, {"results": to_dicts(results)})
+
+            elif self.path == "/hybrid_search":
+                results = perform_hybrid_search(
+                    collection, request["query"], int(request.get("n_results", 5))
+                )
+                self._send_json(200, {"results": to_dicts(results)})
+
+            elif self.path == "/batch_search":
+                search_requests = [
+                    (item["query"], item.get("filters"), int(item.get("n_results", 5)))
+                    for item in request.get("requests", [])
+                ]
+                batch_results = perform_batch_similarity_search(
+                    collection, search_requests
+                )
+                self._send_json(
+                    200, {"results": [to_dicts(results) for results in batch_results]}
+                )
+
+            elif self.path == "/embed":
+                embeddings = embed_query_texts(collection, list(request["texts"]))
+                self._send_json(
+                    200,
+                    {"embeddings": [embedding.tolist() for embedding in embeddings]},
+                )
+
+            else:
+                self._send_json(404, {"error": f"Unknown path: {self.path}"})
+
+        except (KeyError, TypeError, ValueError) as e:
+            self._send_json(400, {"error": f"Bad request: {e}"})
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def create_search_server(
+    collection, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, verbose=False
+) -> ThreadingHTTPServer:
+    """HTTP server answering searches against collection on its own threads"""
+    server = ThreadingHTTPServer((host, port), FoodSearchHandler)
+    server.daemon_threads = True
+    server.collection = collection
+    server.started_at = time.time()
+    server.verbose = verbose
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve food search over HTTP")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--data", default="files/FoodDataSet.json")
+    parser.add_argument(
+        "--batch-window-ms",
+        type=float,
+        default=QUERY_BATCH_WINDOW_MS,
+        help="Micro-batch query embeddings arriving within this window (default 0, off)",
+    )
+    parser.add_argument("--batch-max-size", type=int, default=QUERY_BATCH_MAX_SIZE)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    configure_query_batching(args.batch_window_ms, args.batch_max_size)
+
+    print("🛰️ Food Search Service")
+    print("=" * 50)
+    registry.warmup(EMBEDDING_MODEL_NAME)
+    # The service never needs the raw items, so stream them from the file
+    collection = prepare_food_collection(
+        "food_search_service",
+        {"description": "Shared collection served to the food search CLIs"},
+        None,
+        data_path=args.data,
+    )
+    registry.wait_until_ready(EMBEDDING_MODEL_NAME)
+
+    server = create_search_server(collection, args.host, args.port, args.verbose)
+    print(
+        f"✅ Serving {collection.count()} food items on http://{args.host}:{args.port}"
+    )
+    print("   Set FOOD_SEARCH_SERVICE_URL to this address to use it from the CLIs")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Search service stopped")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
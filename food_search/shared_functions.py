@@ -1,47 +1,447 @@
-import chromadb
-from chromadb.utils import embedding_functions
+import hashlib
 import json
+import os
 import re
-import numpy as np
-from typing import List, Dict, Any, Optional
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, List, Dict, Any, Iterable, Iterator, Optional, Union
+from embedding_registry import registry, format_registry_stats
+from micro_batching import MicroBatcher
+from search_results import ResultSet, SearchHit
+from search_client import RemoteCollection, SearchServiceError
+from instrumentation import (
+    latency_recorder,
+    stage_timer,
+    format_latency_breakdown,
+)
 
-# Initialize ChromaDB client
-client = chromadb.Client()
+# chromadb, numpy and the NumPy-based backends and indexes take most of the
+# import time, so they are imported on first use rather than here
+if TYPE_CHECKING:
+    from embedding_artifacts import EmbeddingArtifact
+    from lexical_index import BM25Index
+    from metadata_index import FoodMetadataIndex
+    from numpy_backend import NumpyCollection
+
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+
+# Set FOOD_SEARCH_PERSIST_DIR to keep the food collection on disk between runs
+PERSIST_DIRECTORY = os.getenv("FOOD_SEARCH_PERSIST_DIR", "")
+DEFAULT_PERSIST_DIRECTORY = "chroma_food_db"
+SYNC_BATCH_SIZE = 1000
+
+# "chroma" for the HNSW index, "numpy" for exact search over an embedding matrix
+SEARCH_BACKEND = os.getenv("FOOD_SEARCH_BACKEND", "chroma")
+
+# NumPy backend vector storage: "" for float32, or "float16", "int8" or "pq"
+VECTOR_QUANTIZATION = os.getenv("FOOD_SEARCH_QUANTIZATION", "")
+
+# Query embedding cache: in-process LRU size and optional SQLite file
+QUERY_CACHE_SIZE = int(os.getenv("FOOD_SEARCH_QUERY_CACHE_SIZE", "1024"))
+QUERY_CACHE_PATH = os.getenv("FOOD_SEARCH_QUERY_CACHE_PATH", "")
+
+# Search result cache: LRU size (0 disables it) and time-to-live in seconds
+RESULT_CACHE_SIZE = int(os.getenv("FOOD_SEARCH_RESULT_CACHE_SIZE", "256"))
+RESULT_CACHE_TTL = float(os.getenv("FOOD_SEARCH_RESULT_CACHE_TTL", "600"))
+
+# Micro-batching of concurrent query embeddings: collection window in
+# milliseconds and the most texts embedded in one pass. Off by default: at
+# low concurrency the window costs more latency than shared passes save
+QUERY_BATCH_WINDOW_MS = float(os.getenv("FOOD_SEARCH_BATCH_WINDOW_MS", "0"))
+QUERY_BATCH_MAX_SIZE = int(os.getenv("FOOD_SEARCH_BATCH_MAX_SIZE", "32"))
+
+# Filtered searches with at most this many candidates are scored exactly
+EXACT_CANDIDATE_LIMIT = 5000
+
+# Set FOOD_SEARCH_SERVICE_URL to search through a running search_service.py
+SEARCH_SERVICE_URL = os.getenv("FOOD_SEARCH_SERVICE_URL", "")
+
+# Set FOOD_SEARCH_SHOW_LATENCY=1 to print a latency breakdown after each search
+SHOW_LATENCY = os.getenv("FOOD_SEARCH_SHOW_LATENCY", "").lower() in ("1", "true", "yes")
+
+# HNSW index parameters that can be set per collection ("M" is max_neighbors)
+HNSW_PARAMETERS = ("max_neighbors", "ef_construction", "ef_search")
+HNSW_ALIASES = {"M": "max_neighbors", "m": "max_neighbors"}
+# Collection metadata keys a tuned HNSW setting is recorded under
+HNSW_METADATA_PREFIX = "hnsw_"
+
+# Hybrid search: ranked candidates taken from each side, and the RRF constant
+HYBRID_CANDIDATES = 20
+RRF_K = 60
+
+# Search results are read from metadata, so documents are not fetched
+RESULT_INCLUDE = ["metadatas", "distances"]
+
+# Metadata keys that hold fingerprints rather than food data
+FINGERPRINT_KEYS = ("content_hash", "metadata_hash")
+
+# The in-memory ChromaDB client is created by get_client() on first use
+_client = None
+_persistent_clients = {}
+_metadata_indexes = {}
+_lexical_indexes = {}
+_collection_versions = {}
+_catalog_fingerprints = {}
+_query_batchers = {}
+_query_batchers_lock = threading.Lock()
+_query_batching = {"window_ms": QUERY_BATCH_WINDOW_MS, "max_size": QUERY_BATCH_MAX_SIZE}
+hybrid_search_stats = {"lexical_fast_path": 0, "fused": 0}
+
+
+class QueryEmbeddingCache:
+    """LRU cache of query embeddings with an optional SQLite store on disk.
+
+    Entries are keyed by embedding model name, embedding backend and
+    normalized query text, so "Healthy  Meal" and "healthy meal" share one
+    embedding, but the torch and ONNX runs of a model never share vectors.
+    """
+
+    def __init__(self, max_entries: int = QUERY_CACHE_SIZE, cache_path: str = None):
+        self.max_entries = max_entries
+        self.cache_path = cache_path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if cache_path:
+            self._connection = sqlite3.connect(cache_path, check_same_thread=False)
+            columns = [
+                row[1]
+                for row in self._connection.execute(
+                    "PRAGMA table_info(query_embeddings)"
+                )
+            ]
+            if columns and "backend" not in columns:
+                # Stored before entries were keyed by backend: drop them, as
+                # they could come from any backend
+                self._connection.execute("DROP TABLE query_embeddings")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS query_embeddings ("
+                "model_name TEXT, backend TEXT, query TEXT, embedding BLOB, "
+                "PRIMARY KEY (model_name, backend, query))"
+            )
+            self._connection.commit()
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        return " ".join(query.lower().split())
+
+    def get(self, query: str, model_name: str, backend: str):
+        key = (model_name, backend, self.normalize_query(query))
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return self._entries[key]
+
+            if self._connection is not None:
+                row = self._connection.execute(
+                    "SELECT embedding FROM query_embeddings "
+                    "WHERE model_name = ? AND backend = ? AND query = ?",
+                    key,
+                ).fetchone()
+                if row is not None:
+                    import numpy as np
+
+                    embedding = np.frombuffer(row[0], dtype=np.float32)
+                    self._remember(key, embedding)
+                    self.disk_hits += 1
+                    return embedding
+
+            self.misses += 1
+            return None
+
+    def put(self, query: str, model_name: str, backend: str, embedding):
+        import numpy as np
+
+        key = (model_name, backend, self.normalize_query(query))
+        embedding = np.asarray(embedding, dtype=np.float32)
+        with self._lock:
+            self._remember(key, embedding)
+            if self._connection is not None:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO query_embeddings VALUES (?, ?, ?, ?)",
+                    (*key, embedding.tobytes()),
+                )
+                self._connection.commit()
+
+    def _remember(self, key, embedding):
+        self._entries[key] = embedding
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.memory_hits = self.disk_hits = self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (
+                (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+            ),
+        }
+
+
+query_embedding_cache = QueryEmbeddingCache(QUERY_CACHE_SIZE, QUERY_CACHE_PATH or None)
+
+
+def get_query_cache_stats() -> Dict[str, Any]:
+    """Return hit/miss counters for the query embedding cache"""
+    return query_embedding_cache.stats()
+
+
+def bump_collection_version(collection) -> int:
+    """Mark collection as changed so cached results for it are no longer served"""
+    _collection_versions[collection.name] = (
+        _collection_versions.get(collection.name, 0) + 1
+    )
+    return _collection_versions[collection.name]
+
+
+def get_collection_version(collection) -> int:
+    return _collection_versions.get(collection.name, 0)
+
+
+def register_catalog_fingerprint(collection, ids: List[str], metadatas: List[Dict]):
+    """Fingerprint the items in collection from their content and metadata hashes.
+
+    Unlike the version counter, the fingerprint is the same in every process
+    that holds the same catalog, so caches kept on disk can be keyed by it.
+    """
+    digest = hashlib.sha256()
+    for item_id, content_hash, metadata_hash in sorted(
+        (item_id, metadata["content_hash"], metadata["metadata_hash"])
+        for item_id, metadata in zip(ids, metadatas)
+    ):
+        digest.update(f"{item_id}\n{content_hash}\n{metadata_hash}\n".encode("utf-8"))
+    _catalog_fingerprints[collection.name] = digest.hexdigest()
+
+
+def get_catalog_fingerprint(collection) -> Optional[str]:
+    """The catalog fingerprint of collection, or None when it is unknown"""
+    if isinstance(collection, RemoteCollection):
+        try:
+            return collection.catalog_fingerprint()
+        except SearchServiceError:
+            return None
+    return _catalog_fingerprints.get(collection.name)
+
+
+class SearchResultCache:
+    """LRU cache of search results with an optional time-to-live.
+
+    Keys include the collection's version counter, which populate and sync
+    bump, so results computed before the collection changed are never served.
+    """
+
+    def __init__(self, max_entries: int = RESULT_CACHE_SIZE, ttl_seconds: float = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(
+        collection, query: str, filters: Optional[Dict], n_results: int
+    ) -> tuple:
+        filters = {
+            key: sorted(value) if isinstance(value, (list, tuple)) else value
+            for key, value in normalize_filters(filters).items()
+        }
+        return (
+            collection.name,
+            get_collection_version(collection),
+            QueryEmbeddingCache.normalize_query(query),
+            json.dumps(filters, sort_keys=True, default=str),
+            n_results,
+        )
+
+    def get(self, key: tuple):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            stored_at, results = entry
+            if self.ttl_seconds and time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return results
+
+    def put(self, key: tuple, results):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.expirations = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "expirations": self.expirations,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+search_result_cache = SearchResultCache(RESULT_CACHE_SIZE, RESULT_CACHE_TTL)
+
+
+def get_result_cache_stats() -> Dict[str, Any]:
+    """Return hit/miss counters for the search result cache"""
+    return search_result_cache.stats()
+
+
+def normalize_food_item(item: Dict, position: int) -> Dict:
+    """Ensure a food item has the required fields and a flat taste profile"""
+    # Normalize food_id to string
+    if "food_id" not in item:
+        item["food_id"] = str(position + 1)
+    else:
+        item["food_id"] = str(item["food_id"])
+
+    # Ensure required fields exist
+    if "food_ingredients" not in item:
+        item["food_ingredients"] = []
+    if "food_description" not in item:
+        item["food_description"] = ""
+    if "cuisine_type" not in item:
+        item["cuisine_type"] = "Unknown"
+    if "food_calories_per_serving" not in item:
+        item["food_calories_per_serving"] = 0
+
+    # Extract taste features from nested food_features if available
+    if "food_features" in item and isinstance(item["food_features"], dict):
+        taste_features = []
+        for key, value in item["food_features"].items():
+            if value:
+                taste_features.append(str(value))
+        item["taste_profile"] = ", ".join(taste_features)
+    else:
+        item["taste_profile"] = ""
+
+    return item
+
+
+def _iter_json_array(file, chunk_size: int) -> Iterator[Any]:
+    """Yield the elements of a top-level JSON array without reading it all"""
+    decoder = json.JSONDecoder()
+    buffer = file.read(chunk_size)
+    eof = not buffer
+    position = 0
+    opened = False
+
+    while True:
+        # Skip whitespace, and the commas between elements
+        while position < len(buffer) and (
+            buffer[position].isspace() or (opened and buffer[position] == ",")
+        ):
+            position += 1
+
+        complete = False
+        if position < len(buffer):
+            if not opened:
+                if buffer[position] != "[":
+                    raise ValueError("Expected a JSON array of food items")
+                opened = True
+                position += 1
+                continue
+            if buffer[position] == "]":
+                return
+
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+                # A value that ends at the buffer edge may continue in the next chunk
+                complete = end < len(buffer) or eof
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+        elif eof:
+            if opened:
+                raise ValueError("Unexpected end of JSON array")
+            return
+
+        if not complete:
+            chunk = file.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+
+        yield item
+        position = end
+
+
+def iter_food_data(file_path: str, chunk_size: int = 1 << 16) -> Iterator[Dict]:
+    """Stream normalized food items from a JSON array or NDJSON file.
+
+    Files ending in .ndjson or .jsonl, or whose first character is not "[",
+    are read one JSON object per line.
+    """
+    with open(file_path, "r", encoding="utf-8") as file:
+        first_char = file.read(1)
+        while first_char.isspace():
+            first_char = file.read(1)
+        file.seek(0)
+
+        if file_path.endswith((".ndjson", ".jsonl")) or first_char != "[":
+            raw_items = (json.loads(line) for line in file if line.strip())
+        else:
+            raw_items = _iter_json_array(file, chunk_size)
+
+        for position, item in enumerate(raw_items):
+            yield normalize_food_item(item, position)
+
+
+def iter_batches(items: Iterable, batch_size: int) -> Iterator[List]:
+    """Group an iterable into lists of at most batch_size items"""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
 
 
 def load_food_data(file_path: str) -> List[Dict]:
     """Load food data from JSON file"""
     try:
-        with open(file_path, "r", encoding="utf-8") as file:
-            food_data = json.load(file)
-
-        # Ensure each item has required fields and normalize the structure
-        for i, item in enumerate(food_data):
-            # Normalize food_id to string
-            if "food_id" not in item:
-                item["food_id"] = str(i + 1)
-            else:
-                item["food_id"] = str(item["food_id"])
-
-            # Ensure required fields exist
-            if "food_ingredients" not in item:
-                item["food_ingredients"] = []
-            if "food_description" not in item:
-                item["food_description"] = ""
-            if "cuisine_type" not in item:
-                item["cuisine_type"] = "Unknown"
-            if "food_calories_per_serving" not in item:
-                item["food_calories_per_serving"] = 0
-
-            # Extract taste features from nested food_features if available
-            if "food_features" in item and isinstance(item["food_features"], dict):
-                taste_features = []
-                for key, value in item["food_features"].items():
-                    if value:
-                        taste_features.append(str(value))
-                item["taste_profile"] = ", ".join(taste_features)
-            else:
-                item["taste_profile"] = ""
+        food_data = list(iter_food_data(file_path))
 
         print(f"Successfully loaded {len(food_data)} food items from {file_path}")
         return food_data
@@ -51,60 +451,151 @@ def load_food_data(file_path: str) -> List[Dict]:
         return []
 
 
+def build_hnsw_configuration(
+    hnsw_params: Dict = None, collection_metadata: dict = None
+) -> Dict:
+    """HNSW configuration in cosine space with tuned or explicit parameters.
+
+    Parameters recorded in collection_metadata by the HNSW tuner are applied
+    first; hnsw_params (max_neighbors/M, ef_construction, ef_search) override
+    them. Anything left unset keeps Chroma's default.
+    """
+    hnsw_configuration = {"space": "cosine"}
+    for parameter in HNSW_PARAMETERS:
+        value = (collection_metadata or {}).get(HNSW_METADATA_PREFIX + parameter)
+        if value:
+            hnsw_configuration[parameter] = int(value)
+
+    for parameter, value in (hnsw_params or {}).items():
+        parameter = HNSW_ALIASES.get(parameter, parameter)
+        if parameter not in HNSW_PARAMETERS:
+            raise ValueError(f"Unknown HNSW parameter: {parameter}")
+        if value:
+            hnsw_configuration[parameter] = int(value)
+    return hnsw_configuration
+
+
+def build_numpy_collection(
+    collection_name: str, collection_metadata: dict = None, source=None
+) -> "NumpyCollection":
+    """NumPy-backed collection, quantized when FOOD_SEARCH_QUANTIZATION is set.
+
+    With source, ids, embeddings and metadatas are copied out of that
+    collection instead of starting empty.
+    """
+    from numpy_backend import NumpyCollection
+    from quantized_backend import QuantizedCollection
+
+    embedding_function = registry.get(EMBEDDING_MODEL_NAME)
+    collection_class, options = NumpyCollection, {}
+    if VECTOR_QUANTIZATION:
+        collection_class = QuantizedCollection
+        options = {"quantization": VECTOR_QUANTIZATION}
+
+    if source is not None:
+        return collection_class.from_collection(source, embedding_function, **options)
+    return collection_class(
+        collection_name, embedding_function, collection_metadata, **options
+    )
+
+
+def get_client():
+    """The shared in-memory ChromaDB client, created on first use"""
+    global _client
+    if _client is None:
+        import chromadb
+
+        _client = chromadb.Client()
+    return _client
+
+
 def create_similarity_search_collection(
-    collection_name: str, collection_metadata: dict = None
+    collection_name: str,
+    collection_metadata: dict = None,
+    backend: str = None,
+    hnsw_params: Dict = None,
 ):
+    backend = backend or SEARCH_BACKEND
+    sentence_transformer_ef = registry.get(EMBEDDING_MODEL_NAME)
+
+    if backend == "numpy":
+        collection = build_numpy_collection(collection_name, collection_metadata)
+        bump_collection_version(collection)
+        return collection
+    if backend != "chroma":
+        raise ValueError(f"Unknown search backend: {backend}")
+
     try:
-        client.delete_collection(collection_name)
+        get_client().delete_collection(collection_name)
     except:
         pass
 
-    sentence_transformer_ef = embedding_functions.SentenceTransformerEmbeddingFunction(
-        model_name="all-MiniLM-L6-v2"
-    )
-
-    return client.create_collection(
+    collection = get_client().create_collection(
         name=collection_name,
         metadata=collection_metadata,
         configuration={
-            "hnsw": {"space": "cosine"},
+            "hnsw": build_hnsw_configuration(hnsw_params, collection_metadata),
             "embedding_function": sentence_transformer_ef,
         },
     )
 
+    # A recreated collection must not serve results cached for the old one
+    bump_collection_version(collection)
+    return collection
 
-def populate_similarity_collection(collection, food_items: List[Dict]):
-    documents = []
-    metadatas = []
-    ids = []
 
-    used_ids = set()
+def build_food_document(food: Dict) -> str:
+    """Build the text that gets embedded for a food item"""
+    # Create comprehensive text for embedding using rich JSON structure
+    text = f"Name: {food['food_name']}. "
+    text += f"Description: {food.get('food_description', '')}. "
+    text += f"Ingredients: {', '.join(food.get('food_ingredients', []))}. "
+    text += f"Cuisine: {food.get('cuisine_type', 'Unknown')}. "
+    text += f"Cooking method: {food.get('cooking_method', '')}. "
 
-    for i, food in enumerate(food_items):
-        # Create comprehensive text for embedding using rich JSON structure
-        text = f"Name: {food['food_name']}. "
-        text += f"Description: {food.get('food_description', '')}. "
-        text += f"Ingredients: {', '.join(food.get('food_ingredients', []))}. "
-        text += f"Cuisine: {food.get('cuisine_type', 'Unknown')}. "
-        text += f"Cooking method: {food.get('cooking_method', '')}. "
-
-        # Add taste profile from food_features
-        taste_profile = food.get("taste_profile", "")
-        if taste_profile:
-            text += f"Taste and features: {taste_profile}. "
-
-        # Add health benefits if available
-        health_benefits = food.get("food_health_benefits", "")
-        if health_benefits:
-            text += f"Health benefits: {health_benefits}. "
-
-        # Add nutritional information
-        if "food_nutritional_factors" in food:
-            nutrition = food["food_nutritional_factors"]
-            if isinstance(nutrition, dict):
-                nutrition_text = ", ".join([f"{k}: {v}" for k, v in nutrition.items()])
-                text += f"Nutrition: {nutrition_text}."
+    # Add taste profile from food_features
+    taste_profile = food.get("taste_profile", "")
+    if taste_profile:
+        text += f"Taste and features: {taste_profile}. "
+
+    # Add health benefits if available
+    health_benefits = food.get("food_health_benefits", "")
+    if health_benefits:
+        text += f"Health benefits: {health_benefits}. "
+
+    # Add nutritional information
+    if "food_nutritional_factors" in food:
+        nutrition = food["food_nutritional_factors"]
+        if isinstance(nutrition, dict):
+            nutrition_text = ", ".join([f"{k}: {v}" for k, v in nutrition.items()])
+            text += f"Nutrition: {nutrition_text}."
+
+    return text
+
+
+def build_food_metadata(food: Dict) -> Dict:
+    """Build the metadata stored alongside a food item's embedding"""
+    return {
+        "name": food["food_name"],
+        "cuisine_type": food.get("cuisine_type", "Unknown"),
+        "ingredients": ", ".join(food.get("food_ingredients", [])),
+        "calories": food.get("food_calories_per_serving", 0),
+        "description": food.get("food_description", ""),
+        "cooking_method": food.get("cooking_method", ""),
+        "health_benefits": food.get("food_health_benefits", ""),
+        "taste_profile": food.get("taste_profile", ""),
+    }
+
+
+def assign_unique_ids(food_items: List[Dict], used_ids: set = None) -> List[str]:
+    """Generate one unique collection ID per food item.
+
+    Pass the same used_ids set across calls to keep IDs unique between batches.
+    """
+    ids = []
+    used_ids = set() if used_ids is None else used_ids
 
+    for i, food in enumerate(food_items):
         # Generate unique ID to avoid duplicates
         base_id = str(food.get("food_id", i))
         unique_id = base_id
@@ -113,74 +604,424 @@ def populate_similarity_collection(collection, food_items: List[Dict]):
             unique_id = f"{base_id}_{counter}"
             counter += 1
         used_ids.add(unique_id)
+        ids.append(unique_id)
+
+    return ids
+
+
+def compute_content_hash(text: str) -> str:
+    """Fingerprint an item's text together with the embedding model that encodes it.
+
+    The embedding backend is part of the model: switching it changes every
+    hash, so a persistent collection is re-embedded on its next sync.
+    """
+    salt = f"{EMBEDDING_MODEL_NAME}\n{registry.backend}"
+    return hashlib.sha256(f"{salt}\n{text}".encode("utf-8")).hexdigest()
+
+
+def compute_metadata_hash(metadata: Dict) -> str:
+    """Fingerprint the metadata fields that are stored but not embedded"""
+    payload = {k: v for k, v in metadata.items() if k not in FINGERPRINT_KEYS}
+    return compute_content_hash(json.dumps(payload, sort_keys=True, default=str))
+
+
+def build_collection_records(food_items: List[Dict]):
+    """Build documents and fingerprinted metadatas for a list of food items"""
+    documents = []
+    metadatas = []
+
+    for food in food_items:
+        text = build_food_document(food)
+        metadata = build_food_metadata(food)
+        metadata["metadata_hash"] = compute_metadata_hash(metadata)
+        metadata["content_hash"] = compute_content_hash(text)
 
         documents.append(text)
-        ids.append(unique_id)
-        metadatas.append(
-            {
-                "name": food["food_name"],
-                "cuisine_type": food.get("cuisine_type", "Unknown"),
-                "ingredients": ", ".join(food.get("food_ingredients", [])),
-                "calories": food.get("food_calories_per_serving", 0),
-                "description": food.get("food_description", ""),
-                "cooking_method": food.get("cooking_method", ""),
-                "health_benefits": food.get("food_health_benefits", ""),
-                "taste_profile": food.get("taste_profile", ""),
-            }
-        )
+        metadatas.append(metadata)
+
+    return documents, metadatas
+
+
+def prepare_collection_records(food_items: List[Dict], used_ids: set = None):
+    """Build documents, fingerprinted metadatas and ids for a list of food items"""
+    ids = assign_unique_ids(food_items, used_ids)
+    documents, metadatas = build_collection_records(food_items)
+    return documents, metadatas, ids
+
+
+def populate_similarity_collection(
+    collection, food_items: List[Dict], artifact: "EmbeddingArtifact" = None
+):
+    """Add food_items to an empty collection.
+
+    With an embedding artifact that matches the items, its embeddings are used
+    instead of running the model, and a NumPy collection maps them in place.
+    """
+    from numpy_backend import NumpyCollection
+
+    documents, metadatas, ids = prepare_collection_records(food_items)
+    embeddings = matching_artifact_embeddings(artifact, ids, metadatas)
 
     # Add all data to collection
-    collection.add(documents=documents, metadatas=metadatas, ids=ids)
+    if embeddings is not None and isinstance(collection, NumpyCollection):
+        collection.attach_embeddings(ids, embeddings, metadatas, documents)
+    else:
+        collection.add(
+            documents=documents, metadatas=metadatas, ids=ids, embeddings=embeddings
+        )
+    register_metadata_index(collection, ids, food_items)
+    register_lexical_index(collection, ids, food_items)
+    register_catalog_fingerprint(collection, ids, metadatas)
+    bump_collection_version(collection)
 
     print(f"Added {len(food_items)} food items to collection")
 
 
-def perform_similarity_search(collection, query: str, n_results: int = 5) -> List[Dict]:
-    """Perform similarity search and return formatted results"""
-    try:
-        results = collection.query(query_texts=[query], n_results=n_results)
+def matching_artifact_embeddings(artifact, ids: List[str], metadatas: List[Dict]):
+    """The artifact's embedding matrix if it holds exactly these items, else None"""
+    if artifact is None:
+        return None
+    if not artifact.matches(ids, [metadata["content_hash"] for metadata in metadatas]):
+        print("⚠️ Embedding artifact does not match the food items; re-embedding")
+        return None
+    return artifact.embeddings
 
-        if not results or not results["ids"] or len(results["ids"][0]) == 0:
-            return []
 
-        formatted_results = []
-        for i in range(len(results["ids"][0])):
-            # Calculate similarity score (1 - distance)
-            similarity_score = 1 - results["distances"][0][i]
-
-            result = {
-                "food_id": results["ids"][0][i],
-                "food_name": results["metadatas"][0][i]["name"],
-                "food_description": results["metadatas"][0][i]["description"],
-                "cuisine_type": results["metadatas"][0][i]["cuisine_type"],
-                "food_calories_per_serving": results["metadatas"][0][i]["calories"],
-                "similarity_score": similarity_score,
-                "distance": results["distances"][0][i],
-            }
-            formatted_results.append(result)
+def populate_similarity_collection_streaming(
+    collection, food_items: Iterable[Dict], batch_size: int = SYNC_BATCH_SIZE
+) -> int:
+    """Add food items from any iterable in bounded batches.
 
-        return formatted_results
+    Only one batch of items, documents and embeddings is held at a time, so
+    memory stays flat however large the catalog is. Pair with iter_food_data.
+    """
+    from lexical_index import BM25Index
+    from metadata_index import FoodMetadataIndex
 
-    except Exception as e:
-        print(f"Error in similarity search: {e}")
-        return []
+    used_ids = set()
+    metadata_index = FoodMetadataIndex()
+    lexical_index = BM25Index()
+    # Only the hashes are kept, for the catalog fingerprint
+    all_ids, fingerprints = [], []
+    total = 0
 
+    for batch in iter_batches(food_items, batch_size):
+        documents, metadatas, ids = prepare_collection_records(batch, used_ids)
+        collection.add(documents=documents, metadatas=metadatas, ids=ids)
+        bump_collection_version(collection)
 
-def perform_filtered_similarity_search(
+        for item_id, food in zip(ids, batch):
+            metadata_index.add(item_id, food)
+            lexical_index.add(item_id, food)
+        all_ids.extend(ids)
+        fingerprints.extend(
+            {key: metadata[key] for key in FINGERPRINT_KEYS} for metadata in metadatas
+        )
+        total += len(batch)
+        print(f"  ...added {total} food items")
+
+    metadata_index.finalize()
+    set_metadata_index(collection, metadata_index)
+    lexical_index.finalize()
+    set_lexical_index(collection, lexical_index)
+    register_catalog_fingerprint(collection, all_ids, fingerprints)
+
+    print(f"Added {total} food items to collection")
+    return total
+
+
+def register_metadata_index(collection, ids: List[str], food_items: List[Dict]):
+    """Build the columnar metadata index used by filtered searches on collection"""
+    from metadata_index import FoodMetadataIndex
+
+    _metadata_indexes[collection.name] = FoodMetadataIndex(ids, food_items)
+
+
+def set_metadata_index(collection, metadata_index: "FoodMetadataIndex"):
+    """Attach an already built metadata index to collection"""
+    _metadata_indexes[collection.name] = metadata_index
+
+
+def get_metadata_index(collection) -> Optional["FoodMetadataIndex"]:
+    return _metadata_indexes.get(collection.name)
+
+
+def drop_metadata_index(collection):
+    """Detach collection's metadata index, so filters run as a where clause"""
+    _metadata_indexes.pop(collection.name, None)
+
+
+def register_lexical_index(collection, ids: List[str], food_items: List[Dict]):
+    """Build the BM25 index used by hybrid searches on collection"""
+    from lexical_index import BM25Index
+
+    _lexical_indexes[collection.name] = BM25Index(ids, food_items)
+
+
+def set_lexical_index(collection, lexical_index: "BM25Index"):
+    """Attach an already built BM25 index to collection"""
+    _lexical_indexes[collection.name] = lexical_index
+
+
+def get_lexical_index(collection) -> Optional["BM25Index"]:
+    return _lexical_indexes.get(collection.name)
+
+
+def get_persistent_client(persist_directory: str = PERSIST_DIRECTORY):
+    """Return a cached on-disk ChromaDB client for the given directory"""
+    persist_directory = persist_directory or DEFAULT_PERSIST_DIRECTORY
+    if persist_directory not in _persistent_clients:
+        import chromadb
+
+        # Registers the ONNX embedding function, so collections embedded with
+        # it can be opened whichever backend is configured now
+        import onnx_embedding  # noqa: F401
+
+        _persistent_clients[persist_directory] = chromadb.PersistentClient(
+            path=persist_directory
+        )
+    return _persistent_clients[persist_directory]
+
+
+def open_persistent_collection(
+    collection_name: str,
+    collection_metadata: dict = None,
+    persist_directory: str = PERSIST_DIRECTORY,
+    hnsw_params: Dict = None,
+):
+    """Open (or create) a collection that survives between runs.
+
+    hnsw_params only apply when the collection is created; an existing
+    collection keeps the index it was built with.
+    """
+    persistent_client = get_persistent_client(persist_directory)
+
+    sentence_transformer_ef = registry.get(EMBEDDING_MODEL_NAME)
+    configuration = {
+        "hnsw": build_hnsw_configuration(hnsw_params, collection_metadata),
+        "embedding_function": sentence_transformer_ef,
+    }
+
+    collection = persistent_client.get_or_create_collection(
+        name=collection_name, metadata=collection_metadata, configuration=configuration
+    )
+
+    # Chroma keeps the embedding function a collection was created with. After
+    # an embedding backend switch every content hash changes anyway, so start
+    # over with the new function rather than re-embed with the old one.
+    stored_ef = collection.configuration.get("embedding_function")
+    if stored_ef is not None and (
+        stored_ef.name() != sentence_transformer_ef.name()
+        or stored_ef.get_config() != sentence_transformer_ef.get_config()
+    ):
+        print(
+            f"⚠️ {collection_name} was embedded with {stored_ef.name()}; "
+            f"rebuilding it with the {registry.backend} backend"
+        )
+        persistent_client.delete_collection(collection_name)
+        collection = persistent_client.create_collection(
+            name=collection_name,
+            metadata=collection_metadata,
+            configuration=configuration,
+        )
+    return collection
+
+
+def get_stored_fingerprints(collection, page_size: int = SYNC_BATCH_SIZE) -> Dict:
+    """Read (content_hash, metadata_hash) for every item already in the collection"""
+    fingerprints = {}
+    offset = 0
+
+    while True:
+        page = collection.get(include=["metadatas"], limit=page_size, offset=offset)
+        if not page["ids"]:
+            break
+
+        for item_id, metadata in zip(page["ids"], page["metadatas"]):
+            metadata = metadata or {}
+            fingerprints[item_id] = (
+                metadata.get("content_hash"),
+                metadata.get("metadata_hash"),
+            )
+
+        offset += len(page["ids"])
+
+    return fingerprints
+
+
+def sync_similarity_collection(
     collection,
-    query: str,
-    cuisine_filter: str = None,
+    food_items: List[Dict],
+    batch_size: int = SYNC_BATCH_SIZE,
+    artifact: "EmbeddingArtifact" = None,
+) -> Dict[str, int]:
+    """Bring a persistent collection in line with food_items, re-embedding only changes.
+
+    Changed items take their embeddings from a matching artifact when given.
+    """
+    documents, metadatas, ids = prepare_collection_records(food_items)
+    embeddings = matching_artifact_embeddings(artifact, ids, metadatas)
+    stored = get_stored_fingerprints(collection)
+
+    to_embed = []
+    metadata_only = []
+    for i, item_id in enumerate(ids):
+        fingerprint = (metadatas[i]["content_hash"], metadatas[i]["metadata_hash"])
+        if item_id not in stored or stored[item_id][0] != fingerprint[0]:
+            to_embed.append(i)
+        elif stored[item_id][1] != fingerprint[1]:
+            metadata_only.append(i)
+
+    current_ids = set(ids)
+    removed = [item_id for item_id in stored if item_id not in current_ids]
+
+    for start in range(0, len(removed), batch_size):
+        collection.delete(ids=removed[start : start + batch_size])
+
+    for start in range(0, len(to_embed), batch_size):
+        batch = to_embed[start : start + batch_size]
+        collection.upsert(
+            documents=[documents[i] for i in batch],
+            metadatas=[metadatas[i] for i in batch],
+            ids=[ids[i] for i in batch],
+            embeddings=None if embeddings is None else embeddings[batch],
+        )
+
+    # Metadata-only changes keep their stored embedding
+    for start in range(0, len(metadata_only), batch_size):
+        batch = metadata_only[start : start + batch_size]
+        collection.update(
+            metadatas=[metadatas[i] for i in batch],
+            ids=[ids[i] for i in batch],
+        )
+
+    register_metadata_index(collection, ids, food_items)
+    register_lexical_index(collection, ids, food_items)
+    register_catalog_fingerprint(collection, ids, metadatas)
+    if to_embed or metadata_only or removed:
+        bump_collection_version(collection)
+
+    added = len([i for i in to_embed if ids[i] not in stored])
+    summary = {
+        "added": added,
+        "changed": len(to_embed) - added,
+        "metadata_updated": len(metadata_only),
+        "removed": len(removed),
+        "unchanged": len(ids) - len(to_embed) - len(metadata_only),
+    }
+
+    print(
+        f"Synced {len(ids)} food items: {summary['added']} added, "
+        f"{summary['changed']} changed, {summary['metadata_updated']} metadata-only, "
+        f"{summary['removed']} removed, {summary['unchanged']} unchanged"
+    )
+    return summary
+
+
+def prepare_food_collection(
+    collection_name: str,
+    collection_metadata: dict,
+    food_items: Optional[List[Dict]],
+    persist_directory: str = PERSIST_DIRECTORY,
+    backend: str = None,
+    hnsw_params: Dict = None,
+    data_path: str = None,
+):
+    """Build a fresh in-memory collection, or sync a persistent one when configured.
+
+    With the numpy backend and a persist directory, the persistent Chroma
+    collection is synced first and its stored embeddings are loaded into the
+    NumPy matrix, so nothing is re-embedded. data_path is the file food_items
+    were loaded from; a prebuilt embedding artifact for it is used when current.
+
+    Pass food_items=None to read data_path instead: an in-memory collection
+    without an artifact is then filled in batches straight from the file, so
+    the whole dataset is never held in memory.
+    """
+    if food_items is None and not data_path:
+        raise ValueError("prepare_food_collection needs food_items or a data_path")
+    backend = backend or SEARCH_BACKEND
+    artifact = None
+    if data_path:
+        from embedding_artifacts import load_embedding_artifact
+
+        artifact = load_embedding_artifact(
+            data_path, EMBEDDING_MODEL_NAME, registry.backend
+        )
+        if artifact is not None:
+            print(f"📦 Using prebuilt embeddings from {artifact.directory}")
+
+    # Syncing and matching an artifact compare against every item at once
+    if food_items is None and (persist_directory or artifact is not None):
+        food_items = load_food_data(data_path)
+
+    if persist_directory:
+        collection = open_persistent_collection(
+            collection_name, collection_metadata, persist_directory, hnsw_params
+        )
+        sync_similarity_collection(collection, food_items, artifact=artifact)
+        if backend == "numpy":
+            collection = build_numpy_collection(collection_name, source=collection)
+    else:
+        collection = create_similarity_search_collection(
+            collection_name, collection_metadata, backend, hnsw_params
+        )
+        if food_items is None:
+            populate_similarity_collection_streaming(
+                collection, iter_food_data(data_path)
+            )
+        else:
+            populate_similarity_collection(collection, food_items, artifact)
+    return collection
+
+
+def connect_search_service(
+    url: str = SEARCH_SERVICE_URL,
+) -> Optional[RemoteCollection]:
+    """Client for the search service at url, or None when none is set or answering"""
+    if not url:
+        return None
+
+    remote = RemoteCollection(url)
+    try:
+        health = remote.health()
+    except SearchServiceError as e:
+        print(f"⚠️ Search service unavailable ({e}); searching locally")
+        return None
+
+    print(f"✅ Connected to search service at {remote.url} ({health['items']} items)")
+    return remote
+
+
+def build_where_clause(
+    cuisine_filter: Union[str, List[str]] = None,
     max_calories: int = None,
-    n_results: int = 5,
-) -> List[Dict]:
-    """Perform filtered similarity search with metadata constraints"""
+    min_calories: int = None,
+    cooking_method: Union[str, List[str]] = None,
+    include_ingredients: List[str] = None,
+    exclude_ingredients: List[str] = None,
+) -> Optional[Dict]:
+    """Translate search filters into a ChromaDB where clause"""
+    if include_ingredients or exclude_ingredients:
+        raise ValueError("Ingredient filters require a metadata index")
+
     where_clause = None
 
     # Build filters list
     filters = []
-    if cuisine_filter:
+    if isinstance(cuisine_filter, (list, tuple)):
+        filters.append({"cuisine_type": {"$in": list(cuisine_filter)}})
+    elif cuisine_filter:
         filters.append({"cuisine_type": cuisine_filter})
 
+    if isinstance(cooking_method, (list, tuple)):
+        filters.append({"cooking_method": {"$in": list(cooking_method)}})
+    elif cooking_method:
+        filters.append({"cooking_method": cooking_method})
+
+    if min_calories:
+        filters.append({"calories": {"$gte": min_calories}})
+
     if max_calories:
         filters.append({"calories": {"$lte": max_calories}})
 
@@ -190,31 +1031,446 @@ def perform_filtered_similarity_search(
     elif len(filters) > 1:
         where_clause = {"$and": filters}
 
+    return where_clause
+
+
+def normalize_filters(filters: Optional[Dict]) -> Dict:
+    """Drop unset filters so equivalent requests compare equal"""
+    return {key: value for key, value in (filters or {}).items() if value}
+
+
+def empty_query_response(query_count: int) -> Dict[str, List]:
+    return {
+        "ids": [[] for _ in range(query_count)],
+        "distances": [[] for _ in range(query_count)],
+        "metadatas": [[] for _ in range(query_count)],
+    }
+
+
+def query_candidates(
+    collection, query_embeddings, candidate_ids: List[str], n_results: int
+):
+    """Score only candidate_ids against the queries, exactly when the set is small"""
+    from numpy_backend import NumpyCollection, score_candidates
+
+    if isinstance(collection, NumpyCollection) or (
+        len(candidate_ids) > EXACT_CANDIDATE_LIMIT
+    ):
+        return collection.query(
+            query_embeddings=query_embeddings,
+            n_results=n_results,
+            ids=candidate_ids,
+            include=RESULT_INCLUDE,
+        )
+
+    candidates = collection.get(ids=candidate_ids, include=["embeddings", "metadatas"])
+    results = empty_query_response(0)
+    for best, distances in score_candidates(
+        query_embeddings, candidates["embeddings"], n_results
+    ):
+        results["ids"].append([candidates["ids"][i] for i in best])
+        results["metadatas"].append([candidates["metadatas"][i] for i in best])
+        results["distances"].append(distances)
+    return results
+
+
+def query_collection(
+    collection, query_embeddings, n_results: int, filters: Optional[Dict] = None
+):
+    """Query with optional filters, narrowing through the metadata index if built"""
+    filters = normalize_filters(filters)
+    metadata_index = get_metadata_index(collection)
+
+    with stage_timer("search"):
+        if filters and metadata_index is not None:
+            candidate_ids = metadata_index.candidate_ids(**filters)
+            if not candidate_ids:
+                return empty_query_response(len(query_embeddings))
+            return query_candidates(
+                collection, query_embeddings, candidate_ids, n_results
+            )
+
+        return collection.query(
+            query_embeddings=query_embeddings,
+            n_results=n_results,
+            where=build_where_clause(**filters),
+            include=RESULT_INCLUDE,
+        )
+
+
+def format_search_results(results, row: int = 0, limit: int = None) -> ResultSet:
+    """Wrap one row of a query response as lazily materialized results"""
+    with stage_timer("format"):
+        return ResultSet(results, row, limit)
+
+
+def configure_query_batching(window_ms: float, max_batch_size: int = None):
+    """Batch concurrent query embeddings within window_ms (0 turns it off)"""
+    with _query_batchers_lock:
+        _query_batching["window_ms"] = window_ms
+        if max_batch_size is not None:
+            _query_batching["max_size"] = max_batch_size
+        old_batchers = list(_query_batchers.values())
+        _query_batchers.clear()
+    # Stop the old batchers' worker threads outside the lock
+    for batcher in old_batchers:
+        batcher.close()
+
+
+def get_query_batcher(model_name: str) -> Optional[MicroBatcher]:
+    """The micro-batcher for model_name, or None when batching is off"""
+    if _query_batching["window_ms"] <= 0:
+        return None
+    batcher = _query_batchers.get(model_name)
+    if batcher is None:
+        with _query_batchers_lock:
+            if _query_batching["window_ms"] <= 0:
+                return None
+            batcher = _query_batchers.get(model_name)
+            if batcher is None:
+                batcher = MicroBatcher(
+                    registry.get(model_name),
+                    _query_batching["window_ms"],
+                    _query_batching["max_size"],
+                )
+                _query_batchers[model_name] = batcher
+    return batcher
+
+
+def get_query_batching_stats() -> Dict[str, Any]:
+    """Batch counts and sizes of the query embedding micro-batchers"""
+    with _query_batchers_lock:
+        batchers = list(_query_batchers.items())
+    return {model_name: batcher.stats() for model_name, batcher in batchers}
+
+
+def embed_query_texts(collection, query_texts: List[str]):
+    """Embed query texts with the collection's model, reusing cached embeddings.
+
+    Cache misses are embedded together in one forward pass.
+    """
+    import numpy as np
+
+    collection_ef = collection.configuration.get("embedding_function")
+    model_name = getattr(collection_ef, "model_name", EMBEDDING_MODEL_NAME)
+
+    with stage_timer("embed"):
+        embeddings = [
+            query_embedding_cache.get(text, model_name, registry.backend)
+            for text in query_texts
+        ]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+
+        if missing:
+            batcher = get_query_batcher(model_name)
+            missing_texts = [query_texts[i] for i in missing]
+            if batcher is not None:
+                computed = batcher.embed(missing_texts)
+            else:
+                computed = registry.get(model_name)(missing_texts)
+            for i, embedding in zip(missing, computed):
+                query_embedding_cache.put(
+                    query_texts[i], model_name, registry.backend, embedding
+                )
+                embeddings[i] = np.asarray(embedding, dtype=np.float32)
+
+    return embeddings
+
+
+def embed_query(collection, query: str):
+    """The query's embedding, from the search service when collection is remote"""
+    import numpy as np
+
+    if isinstance(collection, RemoteCollection):
+        return np.asarray(collection.embed([query])[0], dtype=np.float32)
+    return embed_query_texts(collection, [query])[0]
+
+
+def perform_batch_similarity_search(
+    collection, search_requests: List[tuple]
+) -> List[List[Dict]]:
+    """Run many (query, filters, n_results) searches with one embedding pass.
+
+    filters is None or a dict of perform_filtered_similarity_search keyword
+    arguments. Requests that share the same filters are sent to the collection
+    as a single query. Results come back in the same order as search_requests.
+    """
+    if not search_requests:
+        return []
+
+    if isinstance(collection, RemoteCollection):
+        try:
+            return collection.batch_search(search_requests)
+        except SearchServiceError as e:
+            print(f"Error in batch similarity search: {e}")
+            return [[] for _ in search_requests]
+
+    # Only requests missing from the result cache are embedded and searched
+    cache_keys = [
+        SearchResultCache.make_key(collection, query, filters, n_results)
+        for query, filters, n_results in search_requests
+    ]
+    batch_results = [search_result_cache.get(key) for key in cache_keys]
+    pending = [p for p, results in enumerate(batch_results) if results is None]
+    if not pending:
+        return batch_results
+
     try:
-        results = collection.query(
-            query_texts=[query], n_results=n_results, where=where_clause
+        query_embeddings = dict(
+            zip(
+                pending,
+                embed_query_texts(collection, [search_requests[p][0] for p in pending]),
+            )
         )
 
-        if not results or not results["ids"] or len(results["ids"][0]) == 0:
+        # Group request positions by their filters
+        groups = {}
+        for position in pending:
+            filters = normalize_filters(search_requests[position][1])
+            group_key = json.dumps(filters, sort_keys=True)
+            groups.setdefault(group_key, (filters, []))[1].append(position)
+
+        for filters, positions in groups.values():
+            results = query_collection(
+                collection,
+                [query_embeddings[p] for p in positions],
+                max(search_requests[p][2] for p in positions),
+                filters,
+            )
+            for row, position in enumerate(positions):
+                batch_results[position] = format_search_results(
+                    results, row, limit=search_requests[position][2]
+                )
+                search_result_cache.put(cache_keys[position], batch_results[position])
+
+        return batch_results
+
+    except Exception as e:
+        print(f"Error in batch similarity search: {e}")
+        return [results if results is not None else [] for results in batch_results]
+
+
+def perform_similarity_search(collection, query: str, n_results: int = 5) -> List[Dict]:
+    """Perform similarity search and return formatted results"""
+    try:
+        if isinstance(collection, RemoteCollection):
+            return collection.search(query, n_results)
+
+        query_embeddings = embed_query_texts(collection, [query])
+        results = query_collection(collection, query_embeddings, n_results)
+        return format_search_results(results)
+
+    except Exception as e:
+        print(f"Error in similarity search: {e}")
+        return []
+
+
+def perform_filtered_similarity_search(
+    collection,
+    query: str,
+    cuisine_filter: Union[str, List[str]] = None,
+    max_calories: int = None,
+    n_results: int = 5,
+    min_calories: int = None,
+    cooking_method: Union[str, List[str]] = None,
+    include_ingredients: List[str] = None,
+    exclude_ingredients: List[str] = None,
+) -> List[Dict]:
+    """Perform filtered similarity search with metadata constraints.
+
+    cuisine_filter and cooking_method accept one value or a list of allowed
+    values. include_ingredients must all be present and exclude_ingredients
+    must all be absent; both need the metadata index built at populate time.
+    Results are served from the result cache until the collection changes.
+    """
+    filters = {
+        "cuisine_filter": cuisine_filter,
+        "max_calories": max_calories,
+        "min_calories": min_calories,
+        "cooking_method": cooking_method,
+        "include_ingredients": include_ingredients,
+        "exclude_ingredients": exclude_ingredients,
+    }
+
+    if isinstance(collection, RemoteCollection):
+        try:
+            return collection.search(query, n_results, normalize_filters(filters))
+        except SearchServiceError as e:
+            print(f"Error in filtered search: {e}")
             return []
 
-        formatted_results = []
-        for i in range(len(results["ids"][0])):
-            similarity_score = 1 - results["distances"][0][i]
-
-            result = {
-                "food_id": results["ids"][0][i],
-                "food_name": results["metadatas"][0][i]["name"],
-                "food_description": results["metadatas"][0][i]["description"],
-                "cuisine_type": results["metadatas"][0][i]["cuisine_type"],
-                "food_calories_per_serving": results["metadatas"][0][i]["calories"],
-                "similarity_score": similarity_score,
-                "distance": results["distances"][0][i],
-            }
-            formatted_results.append(result)
+    cache_key = SearchResultCache.make_key(collection, query, filters, n_results)
+    cached_results = search_result_cache.get(cache_key)
+    if cached_results is not None:
+        return cached_results
 
+    try:
+        query_embeddings = embed_query_texts(collection, [query])
+        results = query_collection(collection, query_embeddings, n_results, filters)
+        formatted_results = format_search_results(results)
+        search_result_cache.put(cache_key, formatted_results)
         return formatted_results
 
     except Exception as e:
         print(f"Error in filtered search: {e}")
         return []
+
+
+def build_ranked_response(
+    ranked: List[tuple],
+    metadatas_by_id: Dict[str, Dict],
+    best_score: float,
+    match_scores: List[float] = None,
+) -> Dict[str, List]:
+    """Query response for (id, score) pairs, with distance 1 - score / best_score.
+
+    match_scores, when given, are the scores shown for the results instead.
+    """
+    response = {
+        "ids": [[item_id for item_id, _ in ranked]],
+        "distances": [[1 - score / best_score for _, score in ranked]],
+        "metadatas": [[metadatas_by_id.get(item_id) for item_id, _ in ranked]],
+    }
+    if match_scores is not None:
+        response["match_scores"] = [match_scores]
+    return response
+
+
+def cosine_similarities(query_embedding, embeddings) -> List[float]:
+    """Cosine similarity of query_embedding to each row of embeddings"""
+    from numpy_backend import normalize_rows
+
+    return (normalize_rows(embeddings) @ normalize_rows(query_embedding)[0]).tolist()
+
+
+def perform_hybrid_search(collection, query: str, n_results: int = 5) -> List[Dict]:
+    """Search with BM25 and vectors together, fused by reciprocal rank fusion.
+
+    When the lexical match is confident (the query is a food name, or enough
+    items name every query term in their name or ingredients) the BM25
+    results are returned directly and the embedding model is never run.
+    similarity_score is the reciprocal rank fusion score, scaled so first
+    place in both the BM25 and the vector ranking is 1.0. Fast-path results
+    are scored as the BM25 ranking alone, so scores from both paths are
+    comparable and never rise down the list. As a rank score it is not a
+    match percentage, so each result also has a match_score for display:
+    the cosine similarity to the query on the fused path, and the BM25 score
+    relative to the best result on the fast path.
+    """
+    from lexical_index import reciprocal_rank_fusion
+
+    if isinstance(collection, RemoteCollection):
+        try:
+            return collection.hybrid_search(query, n_results)
+        except SearchServiceError as e:
+            print(f"Error in hybrid search: {e}")
+            return []
+
+    lexical_index = get_lexical_index(collection)
+    if lexical_index is None:
+        return perform_similarity_search(collection, query, n_results)
+
+    try:
+        with stage_timer("lexical"):
+            confident = lexical_index.confident_search(query, n_results)
+            if confident is None:
+                lexical = lexical_index.search(query, HYBRID_CANDIDATES)
+
+        metadatas_by_id = {}
+        similarities = {}
+        if confident is not None:
+            hybrid_search_stats["lexical_fast_path"] += 1
+            # Score by rank, as the BM25 ranking would count in the fusion
+            ranked = [
+                (item_id, 1.0 / (RRF_K + rank))
+                for rank, (item_id, _) in enumerate(confident, 1)
+            ]
+            best_bm25 = max((score for _, score in confident), default=0.0)
+            match_scores = [
+                score / best_bm25 if best_bm25 else 0.0 for _, score in confident
+            ]
+        else:
+            hybrid_search_stats["fused"] += 1
+            query_embeddings = embed_query_texts(collection, [query])
+            vector = query_collection(
+                collection, query_embeddings, max(n_results, HYBRID_CANDIDATES)
+            )
+            metadatas_by_id = dict(zip(vector["ids"][0], vector["metadatas"][0]))
+            similarities = {
+                item_id: 1 - distance
+                for item_id, distance in zip(vector["ids"][0], vector["distances"][0])
+            }
+            ranked = reciprocal_rank_fusion(
+                [vector["ids"][0], [item_id for item_id, _ in lexical]], RRF_K
+            )[:n_results]
+
+        # Fetching the metadata of hits the vector search did not return
+        with stage_timer("hydrate"):
+            missing = [
+                item_id for item_id, _ in ranked if item_id not in metadatas_by_id
+            ]
+            if missing:
+                include = ["metadatas"]
+                if confident is None:
+                    # Lexical-only hits need their embeddings for a cosine score
+                    include.append("embeddings")
+                found = collection.get(ids=missing, include=include)
+                metadatas_by_id.update(zip(found["ids"], found["metadatas"]))
+                if confident is None:
+                    similarities.update(
+                        zip(
+                            found["ids"],
+                            cosine_similarities(
+                                query_embeddings[0], found["embeddings"]
+                            ),
+                        )
+                    )
+
+        if confident is None:
+            match_scores = [similarities.get(item_id, 0.0) for item_id, _ in ranked]
+
+        # First place in both rankings
+        best_score = 2.0 / (RRF_K + 1)
+        return format_search_results(
+            build_ranked_response(ranked, metadatas_by_id, best_score, match_scores)
+        )
+
+    except Exception as e:
+        print(f"Error in hybrid search: {e}")
+        return []
+
+
+def get_search_stats() -> Dict[str, Any]:
+    """Counters for every search cache and the hybrid search fast path"""
+    return {
+        "query_embedding_cache": get_query_cache_stats(),
+        "result_cache": get_result_cache_stats(),
+        "hybrid_search": get_hybrid_search_stats(),
+        "query_batching": get_query_batching_stats(),
+    }
+
+
+def get_collection_search_stats(collection) -> Optional[Dict[str, Any]]:
+    """get_search_stats() from wherever collection's searches run.
+
+    For a RemoteCollection these are the search service's counters (shared by
+    every client of the service), or None if the service cannot be reached.
+    """
+    if isinstance(collection, RemoteCollection):
+        try:
+            return collection.stats()
+        except SearchServiceError as e:
+            print(f"Could not fetch search service stats: {e}")
+            return None
+    return get_search_stats()
+
+
+def get_hybrid_search_stats() -> Dict[str, Any]:
+    """How many hybrid searches took the lexical fast path vs were fused"""
+    total = hybrid_search_stats["lexical_fast_path"] + hybrid_search_stats["fused"]
+    return {
+        **hybrid_search_stats,
+        "fast_path_rate": (
+            hybrid_search_stats["lexical_fast_path"] / total if total else 0.0
+        ),
+    }
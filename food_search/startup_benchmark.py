@@ -0,0 +1,197 @@
+"""
+Startup-time benchmark for the food search CLIs.
+
+For each CLI, in fresh interpreters, measures:
+
+- import time: how long importing the CLI module takes
+- time to first output: process start until the banner is printed
+- time to first prompt: process start until the CLI asks for input
+
+The CLIs run exactly as configured by the environment, so set
+FOOD_SEARCH_SERVICE_URL to measure the thin-client path or
+FOOD_SEARCH_PERSIST_DIR to measure reopening a persisted collection. The run
+fails with exit code 1 when a median import time or time to first prompt
+misses its target.
+
+Usage (from the repository root):
+    python food_search/startup_benchmark.py
+    python food_search/startup_benchmark.py --cli interactive_search --repeats 5 --output startup.json
+"""
+
+import argparse
+import json
+import os
+import selectors
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+FOOD_SEARCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(FOOD_SEARCH_DIR)
+
+# Text each CLI prints when it first waits for input
+CLI_PROMPTS = {
+    "interactive_search": "🔍 Search for food:",
+    "advanced_food_search": "📋 Select option",
+    "enhanced_rag_chatbot": "👤 You:",
+    "async_rag_chatbot": "👤 You:",
+}
+
+IMPORT_TARGET_SECONDS = 0.5
+PROMPT_TARGET_SECONDS = 1.0
+
+
+def child_environment() -> Dict[str, str]:
+    env = dict(os.environ)
+    path = [FOOD_SEARCH_DIR, REPO_ROOT, env.get("PYTHONPATH", "")]
+    env["PYTHONPATH"] = os.pathsep.join(p for p in path if p)
+    env["PYTHONUNBUFFERED"] = "1"
+    return env
+
+
+def measure_import(module: str) -> float:
+    """Seconds to import module in a fresh interpreter"""
+    code = (
+        "import time; started = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - started)"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=REPO_ROOT,
+        env=child_environment(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def measure_first_prompt(module: str, timeout: float) -> Dict[str, Optional[float]]:
+    """Seconds from process start to the first output and to the input prompt.
+
+    The prompt time is None if the CLI exits or times out before asking.
+    """
+    prompt = CLI_PROMPTS[module].encode("utf-8")
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(FOOD_SEARCH_DIR, f"{module}.py")],
+        cwd=REPO_ROOT,
+        env=child_environment(),
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+    first_output = first_prompt = None
+    output = b""
+    selector = selectors.DefaultSelector()
+    selector.register(process.stdout, selectors.EVENT_READ)
+    try:
+        while time.perf_counter() - started < timeout:
+            if not selector.select(timeout=0.05):
+                continue
+            chunk = os.read(process.stdout.fileno(), 65536)
+            if not chunk:
+                break
+            if first_output is None:
+                first_output = time.perf_counter() - started
+            output += chunk
+            if prompt in output:
+                first_prompt = time.perf_counter() - started
+                break
+    finally:
+        selector.close()
+        process.kill()
+        process.wait()
+    return {"first_output_seconds": first_output, "first_prompt_seconds": first_prompt}
+
+
+def median(values: List[Optional[float]]) -> Optional[float]:
+    values = [value for value in values if value is not None]
+    return statistics.median(values) if values else None
+
+
+def run_startup_benchmark(
+    modules: List[str], repeats: int = 3, timeout: float = 120.0
+) -> Dict[str, Any]:
+    report = {"repeats": repeats, "clis": {}}
+    for module in modules:
+        print(f"⏱️ {module}...")
+        imports = [measure_import(module) for _ in range(repeats)]
+        runs = [measure_first_prompt(module, timeout) for _ in range(repeats)]
+        report["clis"][module] = {
+            "import_seconds": median(imports),
+            "first_output_seconds": median([r["first_output_seconds"] for r in runs]),
+            "first_prompt_seconds": median([r["first_prompt_seconds"] for r in runs]),
+            "prompted_runs": sum(r["first_prompt_seconds"] is not None for r in runs),
+        }
+    return report
+
+
+def format_seconds(value: Optional[float]) -> str:
+    return "   never" if value is None else f"{value:>7.3f}s"
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [f"{'cli':<22} {'import':>8} {'output':>8} {'prompt':>8}"]
+    for module, result in report["clis"].items():
+        lines.append(
+            f"{module:<22} {format_seconds(result['import_seconds'])} "
+            f"{format_seconds(result['first_output_seconds'])} "
+            f"{format_seconds(result['first_prompt_seconds'])}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark CLI startup time")
+    parser.add_argument(
+        "--cli", action="append", choices=sorted(CLI_PROMPTS), help="Repeatable"
+    )
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--import-target", type=float, default=IMPORT_TARGET_SECONDS)
+    parser.add_argument("--prompt-target", type=float, default=PROMPT_TARGET_SECONDS)
+    parser.add_argument("--output", default=None, help="Write results as JSON")
+    args = parser.parse_args(argv)
+
+    print("🚀 CLI STARTUP BENCHMARK")
+    print("=" * 50)
+    report = run_startup_benchmark(
+        args.cli or list(CLI_PROMPTS), args.repeats, args.timeout
+    )
+    report["targets"] = {
+        "import_seconds": args.import_target,
+        "first_prompt_seconds": args.prompt_target,
+    }
+    print(f"\n📊 Median of {args.repeats} runs")
+    print(format_report(report))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+
+    misses = []
+    for module, result in report["clis"].items():
+        if result["import_seconds"] > args.import_target:
+            misses.append(
+                f"{module}: import {result['import_seconds']:.3f}s "
+                f"> {args.import_target}s"
+            )
+        prompt_seconds = result["first_prompt_seconds"]
+        if prompt_seconds is None or prompt_seconds > args.prompt_target:
+            shown = "never" if prompt_seconds is None else f"{prompt_seconds:.3f}s"
+            misses.append(f"{module}: first prompt {shown} > {args.prompt_target}s")
+    if misses:
+        print("\n❌ Startup targets missed:")
+        for miss in misses:
+            print(f"  - {miss}")
+        return 1
+    print("\n✅ All CLIs within startup targets")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,7 +2,6 @@
 Utility functions for the AI applications.
 """
 
-from openai import OpenAI
 from .config import config
 
 
@@ -16,6 +15,9 @@ def get_openai_client():
     Raises:
         ValueError: If API key is not configured
     """
+    # Imported here so that loading utils.config does not pay for openai
+    from openai import OpenAI
+
     config.validate()
     return OpenAI(api_key=config.OPENAI_API_KEY)
 